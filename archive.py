@@ -0,0 +1,398 @@
+import argparse
+import fcntl
+import glob
+import hashlib
+import json
+import mmap
+import os
+import shutil
+import struct
+import sys
+import threading
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Iterable, Iterator
+
+from urls import normalize_url
+
+# Block: magic, compressed size, record count, then the zlib-compressed JSON lines
+BLOCK_HEADER = struct.Struct("<4sII")
+BLOCK_MAGIC = b"SBK1"
+# Index segment: magic, entry count, committed data size, then the entries sorted by key hash
+INDEX_HEADER = struct.Struct("<8sQQ")
+INDEX_MAGIC = b"SBIDX001"
+INDEX_ENTRY = struct.Struct("<8sQI")
+
+DATA_FILE = "data.bin"
+LOCK_FILE = "LOCK"
+# Held shared by readers while they open the archive, exclusive while a compaction is swapped in
+SWAP_LOCK_FILE = "SWAP"
+# Names the index segment a finished compaction swaps in
+COMPACTED_SEGMENT_FILE = "SEGMENT"
+DEFAULT_BLOCK_RECORDS = 1000
+
+
+def archive_key(url: str) -> bytes:
+    """8-byte hash of the normalized URL, the order the index is sorted in."""
+    return hashlib.blake2b(normalize_url(url).encode("utf-8"), digest_size=8).digest()
+
+
+def _segments(path: str) -> list[str]:
+    return sorted(glob.glob(os.path.join(glob.escape(path), "index-*.idx")))
+
+
+def _compaction_dirs(path: str) -> tuple[str, str]:
+    # Being built, and built but not yet swapped in
+    base = path.rstrip(os.sep)
+    return f"{base}.compacting", f"{base}.compacted"
+
+
+@contextmanager
+def _swap_lock(path: str, operation: int) -> Iterator[None]:
+    # A lock of its own, as writers hold LOCK for as long as they are open
+    with open(os.path.join(path, SWAP_LOCK_FILE), "a") as lock:
+        fcntl.flock(lock, operation)
+        yield
+
+
+def _finish_compaction(path: str) -> None:
+    """
+    Swaps in a compaction that was built completely, finishing one that was
+    interrupted half-way. The caller holds the archive's lock.
+
+    Every step can be repeated: the new data file goes first, then its index
+    segment, which is numbered above every old one so it wins as soon as it
+    is in place, then the old segments are removed. Readers wait for the
+    swap, so none opens the new data file with the old segments.
+    """
+    _, done = _compaction_dirs(path)
+    if not os.path.isdir(done):
+        return
+    with open(os.path.join(done, COMPACTED_SEGMENT_FILE)) as f:
+        segment = f.read().strip()
+    with _swap_lock(path, fcntl.LOCK_EX):
+        if os.path.exists(os.path.join(done, DATA_FILE)):
+            os.replace(os.path.join(done, DATA_FILE), os.path.join(path, DATA_FILE))
+        if os.path.exists(os.path.join(done, segment)):
+            os.replace(os.path.join(done, segment), os.path.join(path, segment))
+        for old in _segments(path):
+            if os.path.basename(old) < segment:
+                os.remove(old)
+    shutil.rmtree(done)
+
+
+class ArchiveWriter:
+    """
+    Appends filtered records to an archive directory.
+
+    Records are written to `data.bin` in zlib-compressed blocks of
+    `block_records` JSON lines. Closing (or `commit`) writes an index segment
+    `index-NNNNNN.idx` of the new records sorted by URL hash; data is only
+    visible to readers once its segment exists, so a crash loses at most the
+    uncommitted records. One writer at a time holds the archive's lock.
+    """
+
+    def __init__(self, path: str, block_records: int = DEFAULT_BLOCK_RECORDS, level: int = 6):
+        self.path = path
+        self.block_records = block_records
+        self.level = level
+        os.makedirs(path, exist_ok=True)
+        self._lock_file = open(os.path.join(path, LOCK_FILE), "w")
+        fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+        _finish_compaction(path)
+        self._data = open(os.path.join(path, DATA_FILE), "ab")
+        # Drop any block written after the last commit by a writer that crashed
+        self._data.truncate(self._committed_size())
+        self._data.seek(0, os.SEEK_END)
+        self._lock = threading.Lock()
+        self._block: list[bytes] = []
+        self._block_keys: list[bytes] = []
+        self._entries: list[tuple[bytes, int, int]] = []
+
+    def _committed_size(self) -> int:
+        segments = _segments(self.path)
+        if not segments:
+            return 0
+        with open(segments[-1], "rb") as f:
+            _, _, size = INDEX_HEADER.unpack(f.read(INDEX_HEADER.size))
+        return size
+
+    def add(self, url: str, record: dict) -> None:
+        line = json.dumps({"url": url, "record": record}, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        with self._lock:
+            self._block.append(line)
+            self._block_keys.append(archive_key(url))
+            if len(self._block) >= self.block_records:
+                self._write_block()
+
+    def add_many(self, records: Iterable[tuple[str | None, dict]]) -> int:
+        """
+        Adds `(url, record)` pairs, skipping empty records and errors. The URL
+        defaults to the record's "job_url", as for search results.
+
+        Returns:
+            int: The number of records added.
+        """
+        added = 0
+        for url, record in records:
+            url = url or (record or {}).get("job_url")
+            if not url or not record or "error" in record:
+                continue
+            self.add(url, record)
+            added += 1
+        return added
+
+    def _write_block(self) -> None:
+        if not self._block:
+            return
+        payload = zlib.compress(b"\n".join(self._block), self.level)
+        offset = self._data.tell()
+        self._data.write(BLOCK_HEADER.pack(BLOCK_MAGIC, len(payload), len(self._block)))
+        self._data.write(payload)
+        self._entries.extend((key, offset, i) for i, key in enumerate(self._block_keys))
+        self._block, self._block_keys = [], []
+
+    def commit(self) -> None:
+        """Writes the pending block and an index segment for everything added since the last commit."""
+        with self._lock:
+            self._write_block()
+            if not self._entries:
+                return
+            self._data.flush()
+            os.fsync(self._data.fileno())
+            # Stable sort: a URL added twice keeps its later entry last
+            self._entries.sort(key=lambda entry: entry[0])
+            segments = _segments(self.path)
+            number = int(os.path.basename(segments[-1])[6:12]) + 1 if segments else 0
+            segment = os.path.join(self.path, f"index-{number:06d}.idx")
+            tmp = f"{segment}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(INDEX_HEADER.pack(INDEX_MAGIC, len(self._entries), self._data.tell()))
+                f.write(b"".join(INDEX_ENTRY.pack(*entry) for entry in self._entries))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, segment)
+            self._entries = []
+
+    def close(self) -> None:
+        if self._data.closed:
+            return
+        self.commit()
+        self._data.close()
+        fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+        self._lock_file.close()
+
+    def __enter__(self) -> "ArchiveWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class _Segment:
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            magic, self.count, self.data_size = INDEX_HEADER.unpack(f.read(INDEX_HEADER.size))
+            if magic != INDEX_MAGIC:
+                raise ValueError(f"Not an archive index segment: {path}")
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if self.count else None
+
+    def _key(self, i: int) -> bytes:
+        start = INDEX_HEADER.size + i * INDEX_ENTRY.size
+        return self._map[start:start + 8]
+
+    def find(self, key: bytes) -> list[tuple[int, int]]:
+        """Returns the `(block offset, position)` of every entry for `key`, latest last."""
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        found = []
+        while lo < self.count and self._key(lo) == key:
+            _, offset, position = INDEX_ENTRY.unpack_from(self._map, INDEX_HEADER.size + lo * INDEX_ENTRY.size)
+            found.append((offset, position))
+            lo += 1
+        return found
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+
+
+class ArchiveReader:
+    """
+    Reads an archive without loading it.
+
+    The index segments and the data file are memory-mapped; `get` binary
+    searches the segments, newest first, and decompresses only the block
+    holding the record, so a lookup is O(log n) in the archive size. Iterating
+    decodes one block at a time. The reader sees what was committed when it
+    was opened.
+    """
+
+    def __init__(self, path: str, cache_blocks: int = 8):
+        self.path = path
+        if os.path.isdir(_compaction_dirs(path)[1]):
+            with open(os.path.join(path, LOCK_FILE), "w") as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                _finish_compaction(path)
+        self._segments: list[_Segment] = []
+        self.data_size = 0
+        self._data = None
+        if os.path.isdir(path):
+            # Open the segments and the data file they point into with no compaction swapping them
+            with _swap_lock(path, fcntl.LOCK_SH):
+                self._segments = [_Segment(segment) for segment in _segments(path)]
+                self.data_size = self._segments[-1].data_size if self._segments else 0
+                if self.data_size:
+                    with open(os.path.join(path, DATA_FILE), "rb") as f:
+                        self._data = mmap.mmap(f.fileno(), self.data_size, access=mmap.ACCESS_READ)
+        self._cache_blocks = cache_blocks
+        self._blocks: OrderedDict[int, list[bytes]] = OrderedDict()
+
+    def _block(self, offset: int) -> tuple[list[bytes], int]:
+        magic, size, count = BLOCK_HEADER.unpack_from(self._data, offset)
+        if magic != BLOCK_MAGIC:
+            raise ValueError(f"Corrupt archive block at offset {offset}")
+        start = offset + BLOCK_HEADER.size
+        lines = zlib.decompress(self._data[start:start + size]).split(b"\n")
+        if len(lines) != count:
+            raise ValueError(f"Corrupt archive block at offset {offset}")
+        return lines, start + size
+
+    def _cached_block(self, offset: int) -> list[bytes]:
+        lines = self._blocks.get(offset)
+        if lines is None:
+            lines, _ = self._block(offset)
+            self._blocks[offset] = lines
+            if len(self._blocks) > self._cache_blocks:
+                self._blocks.popitem(last=False)
+        else:
+            self._blocks.move_to_end(offset)
+        return lines
+
+    def get(self, url: str) -> dict | None:
+        """Returns the latest record stored for `url`, or None."""
+        key = archive_key(url)
+        wanted = normalize_url(url)
+        for segment in reversed(self._segments):
+            for offset, position in reversed(segment.find(key)):
+                row = json.loads(self._cached_block(offset)[position])
+                # Guards against the (unlikely) collision of two URLs' hashes
+                if normalize_url(row["url"]) == wanted:
+                    return row["record"]
+        return None
+
+    def __contains__(self, url: str) -> bool:
+        return self.get(url) is not None
+
+    def __len__(self) -> int:
+        """Index entries, counting a URL once per time it was written."""
+        return sum(segment.count for segment in self._segments)
+
+    def __iter__(self) -> Iterator[tuple[str, dict]]:
+        """Yields every `(url, record)` in write order, decoding one block at a time."""
+        offset = 0
+        while offset < self.data_size:
+            lines, offset = self._block(offset)
+            for line in lines:
+                row = json.loads(line)
+                yield row["url"], row["record"]
+
+    def close(self) -> None:
+        for segment in self._segments:
+            segment.close()
+        if self._data is not None:
+            self._data.close()
+
+    def __enter__(self) -> "ArchiveReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def archived(records: Iterable[dict], archive: ArchiveWriter | None) -> Iterator[dict]:
+    """Passes search results through, adding each to `archive` (keyed by its "job_url") as it goes by."""
+    for record in records:
+        if archive is not None:
+            archive.add_many([(None, record)])
+        yield record
+
+
+def compact(path: str) -> None:
+    """
+    Rewrites an archive keeping only the latest record per URL, with a single index segment.
+
+    The compacted files are built in a sibling `<path>.compacting` directory,
+    which is renamed to `<path>.compacted` once complete. Only then are they
+    swapped in (see `_finish_compaction`), so a crash leaves either the old
+    archive or a compaction the next writer or reader finishes.
+    """
+    building, done = _compaction_dirs(path)
+    # Hold the writer lock throughout so no append lands between the copy and the swap
+    with open(os.path.join(path, LOCK_FILE), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        _finish_compaction(path)
+        # Left by a compaction that crashed while building
+        shutil.rmtree(building, ignore_errors=True)
+
+        latest: dict[bytes, int] = {}
+        with ArchiveReader(path) as reader:
+            for i, (url, _) in enumerate(reader):
+                latest[archive_key(url)] = i
+            with ArchiveWriter(building) as writer:
+                for i, (url, record) in enumerate(reader):
+                    if latest[archive_key(url)] == i:
+                        writer.add(url, record)
+
+        segments = _segments(path)
+        segment = f"index-{int(os.path.basename(segments[-1])[6:12]) + 1 if segments else 0:06d}.idx"
+        for built in _segments(building):
+            os.replace(built, os.path.join(building, segment))
+        with open(os.path.join(building, COMPACTED_SEGMENT_FILE), "w") as f:
+            f.write(segment)
+            f.flush()
+            os.fsync(f.fileno())
+        os.rename(building, done)
+        _finish_compaction(path)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Compact archive of scraped records")
+    parser.add_argument("archive")
+    commands = parser.add_subparsers(dest="command", required=True)
+    get = commands.add_parser("get", help="Print the record stored for a URL")
+    get.add_argument("url")
+    commands.add_parser("dump", help="Write every record as JSON lines")
+    commands.add_parser("import", help="Add {\"url\", \"result\"} JSON lines from stdin, as written by the scrapbook CLI")
+    commands.add_parser("compact", help="Drop superseded records and merge the index segments")
+    args = parser.parse_args(argv)
+
+    if args.command == "get":
+        with ArchiveReader(args.archive) as reader:
+            record = reader.get(args.url)
+        if record is None:
+            sys.exit(f"Not in archive: {args.url}")
+        print(json.dumps(record, indent=2, ensure_ascii=False))
+    elif args.command == "dump":
+        with ArchiveReader(args.archive) as reader:
+            for url, record in reader:
+                print(json.dumps({"url": url, "result": record}, ensure_ascii=False))
+    elif args.command == "import":
+        with ArchiveWriter(args.archive) as writer:
+            for line in sys.stdin:
+                if line.strip():
+                    row = json.loads(line)
+                    if "result" in row:
+                        writer.add(row["url"], row["result"])
+    elif args.command == "compact":
+        compact(args.archive)
+
+
+if __name__ == "__main__":
+    main()
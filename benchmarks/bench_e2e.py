@@ -0,0 +1,205 @@
+"""
+End-to-end benchmark of the fetchers against the local Bright Data stand-in.
+
+Reports p50/p99 latency per call, requests per snapshot and items per second
+for single, batch and concurrent fetching. Nothing leaves the machine.
+
+    python benchmarks/bench_e2e.py [--calls 20] [--ready-after 0.2] [--latency 0.01]
+        [--poll fixed] [--poll-interval 0.05] [--throttle-rate 0] [--no-rate-limit] [--json results.json]
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import itertools
+import json
+import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_brightdata import FakeBrightData, FakeSettings  # noqa: E402
+
+_run_ids = itertools.count()
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile; 0 for no values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def unique_urls(kind: str, n: int) -> list[str]:
+    # Fresh URLs (or keywords) every scenario so the result cache never answers
+    run = next(_run_ids)
+    if kind == "search":
+        return [f"bench keyword {run} {i}" for i in range(n)]
+    if kind == "profile":
+        return [f"https://www.linkedin.com/in/bench-{run}-{i}" for i in range(n)]
+    return [f"https://www.linkedin.com/jobs/view/{run:04d}{i:06d}" for i in range(n)]
+
+
+def configure(base_url: str, args) -> None:
+    """Points every fetcher at the stand-in, with no persistent caches or indexes."""
+    os.environ.update({
+        "BRIGHTDATA_API_TOKEN": "bench",
+        "BRIGHTDATA_PROFILE_DATASET_ID": "gd_bench_profile",
+        "BRIGHTDATA_JOB_DATASET_ID": "gd_bench_job",
+        "BRIGHTDATA_BASE_URL": base_url,
+        "BRIGHTDATA_POLL_STRATEGY": args.poll,
+        "BRIGHTDATA_POLL_INTERVAL": str(args.poll_interval),
+        "BRIGHTDATA_POLL_STATS": "",
+        "BRIGHTDATA_CACHE_PATH": "",
+        "BRIGHTDATA_JOB_INDEX_PATH": "",
+        "BRIGHTDATA_COMPLETION": "poll",
+        "BRIGHTDATA_POOL_SIZE": str(max(10, args.concurrency)),
+    })
+    if args.no_rate_limit:
+        for endpoint in ("TRIGGER", "STATUS", "DOWNLOAD"):
+            os.environ[f"BRIGHTDATA_{endpoint}_RATE"] = "0"
+            os.environ[f"BRIGHTDATA_{endpoint}_CONCURRENCY"] = "0"
+
+
+def measure(server: FakeBrightData, name: str, run) -> dict:
+    """
+    Runs one scenario and summarises it.
+
+    `run()` returns `(latencies, items, errors)`: the seconds each call took,
+    how many records came back and how many calls or records failed.
+    """
+    server.reset()
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        latencies, items, errors = run()
+    elapsed = time.perf_counter() - started
+    return {
+        "scenario": name,
+        "calls": len(latencies),
+        "items": items,
+        "errors": errors,
+        "p50": percentile(latencies, 50),
+        "p99": percentile(latencies, 99),
+        "requests_per_snapshot": server.requests_per_snapshot(),
+        "throttled": server.stats["throttled"],
+        "items_per_second": items / elapsed if elapsed else 0.0,
+        "seconds": elapsed,
+    }
+
+
+def single(fetch, kind: str, n: int):
+    def run():
+        latencies, items, errors = [], 0, 0
+        for url in unique_urls(kind, n):
+            start = time.perf_counter()
+            try:
+                result = fetch(url)
+                items += len(result) if isinstance(result, list) else 1
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+        return latencies, items, errors
+    return run
+
+
+def batch(fetch_many, kind: str, n: int, batches: int, chunk_size: int):
+    def run():
+        latencies, items, errors = [], 0, 0
+        for _ in range(batches):
+            start = time.perf_counter()
+            try:
+                results = fetch_many(unique_urls(kind, n), chunk_size=chunk_size)
+            except Exception:
+                latencies.append(time.perf_counter() - start)
+                errors += n
+                continue
+            latencies.append(time.perf_counter() - start)
+            failed = sum(1 for result in results.values() if "error_code" in result)
+            errors += failed
+            items += len(results) - failed
+        return latencies, items, errors
+    return run
+
+
+def concurrent(fetch_async, kind: str, n: int):
+    async def timed(url):
+        start = time.perf_counter()
+        try:
+            await fetch_async(url)
+            return time.perf_counter() - start, True
+        except Exception:
+            return time.perf_counter() - start, False
+
+    async def gather(urls):
+        return await asyncio.gather(*(timed(url) for url in urls))
+
+    def run():
+        outcomes = asyncio.run(gather(unique_urls(kind, n)))
+        ok = sum(1 for _, success in outcomes if success)
+        return [latency for latency, _ in outcomes], ok, len(outcomes) - ok
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=20, help="Sequential single fetches per scenario")
+    parser.add_argument("--batch-size", type=int, default=200, help="URLs per batch call")
+    parser.add_argument("--batches", type=int, default=3)
+    parser.add_argument("--chunk-size", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=200, help="Concurrent async fetches")
+    parser.add_argument("--ready-after", type=float, default=0.2)
+    parser.add_argument("--latency", type=float, default=0.01)
+    parser.add_argument("--jitter", type=float, default=0.005)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--payload-bytes", type=int, default=2048)
+    parser.add_argument("--poll", default="fixed", choices=["fixed", "exponential", "adaptive"])
+    parser.add_argument("--poll-interval", type=float, default=0.05)
+    parser.add_argument("--no-rate-limit", action="store_true", help="Turn off the client-side rate limiter")
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    settings = FakeSettings(
+        latency=args.latency, jitter=args.jitter, ready_after=args.ready_after,
+        failure_rate=args.failure_rate, throttle_rate=args.throttle_rate,
+        retry_after=0.1, payload_bytes=args.payload_bytes, seed=1,
+    )
+    with FakeBrightData(settings) as server:
+        configure(server.base_url, args)
+        # Imported after configuring so module-level setup sees the stand-in
+        from get_job_listing import async_get_job_listing, get_job_listing, get_job_listings
+        from get_linkedin_profile import async_get_linkedin_profile, get_linkedin_profile, get_linkedin_profiles
+        from search_jobs import search_jobs
+
+        scenarios = [
+            ("single profile", single(get_linkedin_profile, "profile", args.calls)),
+            ("single job", single(get_job_listing, "job", args.calls)),
+            ("single search", single(lambda url: search_jobs(url, use_index=False), "search", args.calls)),
+            ("batch profiles", batch(get_linkedin_profiles, "profile", args.batch_size, args.batches, args.chunk_size)),
+            ("batch jobs", batch(get_job_listings, "job", args.batch_size, args.batches, args.chunk_size)),
+            ("concurrent profiles", concurrent(async_get_linkedin_profile, "profile", args.concurrency)),
+            ("concurrent jobs", concurrent(async_get_job_listing, "job", args.concurrency)),
+        ]
+        results = [measure(server, name, run) for name, run in scenarios]
+
+    print(
+        f"ready_after={args.ready_after}s latency={args.latency}s poll={args.poll}/{args.poll_interval}s "
+        f"throttle={args.throttle_rate} failures={args.failure_rate} payload={args.payload_bytes}B"
+    )
+    print(f"{'scenario':<22}{'calls':>7}{'p50 ms':>10}{'p99 ms':>10}{'req/snap':>10}{'items/s':>10}{'errors':>8}{'429s':>7}")
+    for r in results:
+        print(
+            f"{r['scenario']:<22}{r['calls']:>7}{r['p50'] * 1000:>10.1f}{r['p99'] * 1000:>10.1f}"
+            f"{r['requests_per_snapshot']:>10.2f}{r['items_per_second']:>10.1f}{r['errors']:>8}{r['throttled']:>7}"
+        )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"settings": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
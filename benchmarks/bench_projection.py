@@ -0,0 +1,219 @@
+"""
+Micro-benchmark: compiled projections against the hand-written filters they replaced.
+
+    python benchmarks/bench_projection.py [--records 20000] [--repeat 5]
+"""
+import argparse
+import copy
+import gc
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from projection import project_all, project_job, project_profile, project_search_job  # noqa: E402
+
+
+def legacy_filter_profile_data(data: dict) -> dict:
+    if not data:
+        return {}
+
+    direct_fields = {
+        "name", "city", "country_code", "about",
+        "educations_details", "languages", "recommendations",
+        "current_company_name", "publications", "organizations",
+        "honors_and_awards", "bio_links", "first_name", "last_name",
+        "education", "certifications", "projects", "experience"
+    }
+
+    keys_to_remove = [k for k in data.keys() if k not in direct_fields]
+    for k in keys_to_remove:
+        data.pop(k, None)
+
+    education = data.get("education", [])
+    if isinstance(education, list):
+        if len(education) > 0:
+            edu_first = education[0]
+            if isinstance(edu_first, dict):
+                for key in ["description", "description_html", "institute_logo_url"]:
+                    edu_first.pop(key, None)
+            data["education"] = [edu_first]
+        else:
+            data.pop("education", None)
+
+    certifications = data.get("certifications", [])
+    if isinstance(certifications, list):
+        new_certs = []
+        for cert in certifications:
+            if isinstance(cert, dict):
+                for key in ["credential_url", "credential_id"]:
+                    cert.pop(key, None)
+                if "subtitle" in cert:
+                    cert["issuer"] = cert.pop("subtitle")
+                if "meta" in cert:
+                    cert["notes"] = cert.pop("meta")
+                new_certs.append(cert)
+        if new_certs:
+            data["certifications"] = new_certs
+        else:
+            data.pop("certifications", None)
+
+    projects = data.get("projects", [])
+    if isinstance(projects, list):
+        new_projects = [p for p in projects if p is not None]
+        if new_projects:
+            data["projects"] = new_projects
+        else:
+            data.pop("projects", None)
+
+    orgs = data.get("organizations", [])
+    if isinstance(orgs, list):
+        for org in orgs:
+            if isinstance(org, dict):
+                org.pop("membership_number", None)
+
+    return data
+
+
+def legacy_filter_job(raw_job: dict) -> dict:
+    if not raw_job:
+        return {}
+
+    direct_fields = {
+        "job_title", "company_name", "job_location", "job_summary",
+        "job_seniority_level", "job_employment_type", "job_industries",
+        "job_base_pay_range", "job_description_formatted", "base_salary"
+    }
+
+    keys_to_remove = [k for k in raw_job.keys() if k not in direct_fields]
+    for k in keys_to_remove:
+        raw_job.pop(k, None)
+
+    return raw_job
+
+
+def legacy_filter_search(data: list[dict]) -> list[dict]:
+    keep_fields = {
+        "job_title", "company_name", "job_location", "job_url",
+        "job_summary", "job_seniority_level", "job_employment_type",
+        "job_industries", "job_base_pay_range", "base_salary",
+    }
+
+    results = []
+    for raw_job in data:
+        filtered = {k: v for k, v in raw_job.items() if k in keep_fields}
+        if filtered:
+            results.append(filtered)
+
+    return results
+
+
+def make_profile(rng: random.Random) -> dict:
+    """A raw profile record shaped like the Bright Data profile dataset."""
+    return {
+        "id": f"user-{rng.randrange(10**9)}",
+        "name": "Jane Doe", "first_name": "Jane", "last_name": "Doe",
+        "city": "New York, NY", "country_code": "US",
+        "about": "Engineer. " * rng.randrange(5, 40),
+        "followers": rng.randrange(10_000), "connections": 500,
+        "avatar": "https://media.licdn.com/avatar.jpg", "banner_image": "https://media.licdn.com/banner.jpg",
+        "current_company_name": "Acme", "current_company": {"name": "Acme", "link": "https://linkedin.com/company/acme"},
+        "activity": [{"title": "Post " * 10, "link": "https://linkedin.com/posts/1", "interaction": "Liked"} for _ in range(rng.randrange(20))],
+        "people_also_viewed": [{"name": "Someone", "profile_link": "https://linkedin.com/in/x"} for _ in range(10)],
+        "education": [
+            {"title": "State University", "degree": "BSc", "description": "Studied " * 20,
+             "description_html": "<p>Studied</p>", "institute_logo_url": "https://logo", "start_year": "2015"}
+            for _ in range(rng.randrange(0, 4))
+        ],
+        "certifications": [
+            {"title": "Cloud Practitioner", "subtitle": "AWS", "meta": "Issued 2023",
+             "credential_url": "https://cred", "credential_id": "ABC123"}
+            for _ in range(rng.randrange(0, 6))
+        ] + ["not a dict"] * rng.randrange(0, 2),
+        "projects": [None if rng.random() < 0.2 else {"title": "Project", "description": "Built " * 10} for _ in range(rng.randrange(0, 6))],
+        "organizations": [{"title": "IEEE", "membership_number": "123", "start_date": "2020"} for _ in range(rng.randrange(0, 3))],
+        "languages": [{"title": "English", "subtitle": "Native"}],
+        "recommendations": ["Great colleague. " * 5 for _ in range(rng.randrange(0, 4))],
+        "experience": None,
+        "input_url": "https://www.linkedin.com/in/jane", "url": "https://www.linkedin.com/in/jane",
+        "timestamp": "2025-01-01T00:00:00Z",
+    }
+
+
+def make_job(rng: random.Random) -> dict:
+    """A raw job record shaped like the Bright Data job dataset."""
+    return {
+        "url": f"https://www.linkedin.com/jobs/view/{rng.randrange(10**10)}",
+        "job_posting_id": str(rng.randrange(10**10)),
+        "job_title": "Senior Python Engineer", "company_name": "Acme", "company_id": "123",
+        "company_url": "https://linkedin.com/company/acme", "company_logo": "https://logo",
+        "job_location": "Remote", "job_summary": "We are hiring. " * 30,
+        "job_seniority_level": "Mid-Senior level", "job_employment_type": "Full-time",
+        "job_industries": "Software Development", "job_function": "Engineering",
+        "job_base_pay_range": "$150,000.00/yr - $200,000.00/yr", "base_salary": {"min_amount": 150000, "max_amount": 200000},
+        "job_description_formatted": "<p>" + "Responsibilities include things. " * 60 + "</p>",
+        "job_num_applicants": rng.randrange(200), "apply_link": "https://apply", "job_posted_date": "2025-01-01",
+        "discovery_input": {"url": "https://www.linkedin.com/jobs/search/?keywords=python"},
+        "job_url": f"https://www.linkedin.com/jobs/view/{rng.randrange(10**10)}",
+        "timestamp": "2025-01-01T00:00:00Z",
+    }
+
+
+def bench(name: str, fn, make_inputs, repeat: int, count: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        inputs = make_inputs()
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            fn(inputs)
+            best = min(best, time.perf_counter() - start)
+        finally:
+            gc.enable()
+    rate = count / best
+    print(f"  {name:<10} {rate:>14,.0f} records/s")
+    return rate
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    profiles = [make_profile(rng) for _ in range(args.records)]
+    jobs = [make_job(rng) for _ in range(args.records)]
+
+    # The projections must produce exactly what the old filters did
+    for record in profiles[:500]:
+        assert project_profile(record) == legacy_filter_profile_data(copy.deepcopy(record))
+    for record in jobs[:500]:
+        assert project_job(record) == legacy_filter_job(copy.deepcopy(record))
+    assert list(project_all(project_search_job, jobs[:500], drop_empty=True)) == legacy_filter_search(jobs[:500])
+
+    # The old filters edit records in place, so every run of either side gets
+    # fresh copies (copying is not timed) to keep cache effects comparable
+    cases = [
+        ("profile", profiles,
+         lambda records: [legacy_filter_profile_data(r) for r in records],
+         lambda records: [project_profile(r) for r in records]),
+        ("job", jobs,
+         lambda records: [legacy_filter_job(r) for r in records],
+         lambda records: [project_job(r) for r in records]),
+        ("search", jobs,
+         legacy_filter_search,
+         lambda records: list(project_all(project_search_job, records, drop_empty=True))),
+    ]
+    for name, records, legacy, compiled in cases:
+        print(f"{name} ({len(records):,} records)")
+        before = bench("legacy", legacy, lambda: copy.deepcopy(records), args.repeat, len(records))
+        after = bench("compiled", compiled, lambda: copy.deepcopy(records), args.repeat, len(records))
+        print(f"  speedup    {after / before:>14.2f}x")
+
+
+if __name__ == "__main__":
+    main()
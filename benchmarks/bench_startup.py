@@ -0,0 +1,122 @@
+"""
+Import-time and cold-start benchmark for short-lived invocations.
+
+Every target is imported in a fresh interpreter under `python -X importtime`,
+reporting the cumulative import time of the target, the wall-clock time of
+the whole process (median over --runs) and the slowest modules it pulled in.
+With --budget, exits with status 1 when a target's median import time goes
+over its budget, so CI catches a heavy import creeping back in.
+
+    python benchmarks/bench_startup.py [--runs 5] [--top 5] [--target scrapbook]
+        [--budget scrapbook=30] [--json results.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_TARGETS = [
+    "scrapbook", "config", "urls", "archive", "job_dedup", "profile_changes",
+    "search_jobs", "get_linkedin_profile", "get_job_listing", "snapshot_queue", "main",
+]
+
+
+def parse_importtime(stderr: str) -> dict[str, int]:
+    """Maps every module in `-X importtime` output to its cumulative import time in microseconds."""
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            # Nested imports are indented; the outermost entry for a name is the one that counts
+            times.setdefault(name.strip(), int(cumulative))
+    return times
+
+
+def run_once(target: str) -> tuple[float, dict[str, int]]:
+    """Imports `target` in a fresh interpreter and returns the wall time in seconds and the import times."""
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    elapsed = time.perf_counter() - started
+    if proc.returncode:
+        raise RuntimeError(f"import {target} failed:\n{proc.stderr[-2000:]}")
+    return elapsed, parse_importtime(proc.stderr)
+
+
+def measure(target: str, runs: int, top: int, startup: frozenset = frozenset()) -> dict:
+    walls, imports, last = [], [], {}
+    for _ in range(runs):
+        wall, times = run_once(target)
+        walls.append(wall)
+        imports.append(times.get(target, 0) / 1e6)
+        last = times
+    # Packages only count once, at their top-level entry; `startup` holds what the bare interpreter imports
+    offenders = sorted(
+        ((t, name) for name, t in last.items() if name != target and "." not in name and name not in startup),
+        reverse=True,
+    )
+    return {
+        "target": target,
+        "import_ms": statistics.median(imports) * 1000,
+        "cold_start_ms": statistics.median(walls) * 1000,
+        "modules": len(last),
+        "top": [{"module": name, "ms": t / 1000} for t, name in offenders[:top]],
+    }
+
+
+def parse_budget(value: str) -> tuple[str, float]:
+    target, _, ms = value.partition("=")
+    try:
+        return target, float(ms)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected TARGET=MS, got {value!r}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per target")
+    parser.add_argument("--top", type=int, default=5, help="Slowest imported modules to show per target")
+    parser.add_argument("--target", action="append", help="Module to import; repeatable (default: the main entry points)")
+    parser.add_argument("--budget", action="append", type=parse_budget, default=[],
+                        help="TARGET=MS: fail when the median import time of TARGET exceeds MS")
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    budgets = dict(args.budget)
+    targets = args.target or DEFAULT_TARGETS
+    targets += [t for t in budgets if t not in targets]
+    baseline = measure("sys", args.runs, 0)
+    startup = frozenset(run_once("sys")[1])
+    results = [measure(target, args.runs, args.top, startup) for target in targets]
+
+    print(f"interpreter start {baseline['cold_start_ms']:.1f} ms, median of {args.runs} runs")
+    print(f"{'target':<24}{'import ms':>11}{'cold ms':>10}{'modules':>9}  slowest imports")
+    failures = []
+    for r in results:
+        slowest = ", ".join(f"{t['module']} {t['ms']:.1f}" for t in r["top"])
+        budget = budgets.get(r["target"])
+        over = budget is not None and r["import_ms"] > budget
+        if over:
+            failures.append(f"{r['target']}: {r['import_ms']:.1f} ms > {budget:.1f} ms")
+        print(f"{r['target']:<24}{r['import_ms']:>11.1f}{r['cold_start_ms']:>10.1f}{r['modules']:>9}  {slowest}{'  OVER BUDGET' if over else ''}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"settings": vars(args), "interpreter_ms": baseline["cold_start_ms"], "results": results}, f, indent=2)
+
+    if failures:
+        print("import time over budget:\n  " + "\n  ".join(failures), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
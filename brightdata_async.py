@@ -0,0 +1,159 @@
+import asyncio
+import os
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from brightdata_client import BrightDataClient, SnapshotFailed, get_client, is_ready
+from config import load_env
+from polling import PollStrategy, PollTimeoutError, PollTimer
+
+load_env()
+
+
+class SnapshotScheduler:
+    """
+    Runs many Bright Data collections concurrently on one event loop.
+
+    At most `max_concurrency` snapshots are in flight at once. Waiting
+    snapshots are not polled one by one: a single poll loop checks every
+    pending snapshot id that is due, as decided by the poll strategy or an
+    incoming webhook, and wakes the callers whose data is ready. HTTP calls reuse the pooled client
+    on a small thread pool.
+    """
+
+    def __init__(
+        self,
+        client: BrightDataClient | None = None,
+        max_concurrency: int | None = None,
+        poll_strategy: PollStrategy | None = None,
+    ):
+        self.client = client or get_client()
+        self.max_concurrency = max_concurrency or int(os.environ.get("BRIGHTDATA_MAX_CONCURRENCY", 100))
+        self.poll_strategy = poll_strategy or self.client.poll_strategy
+
+        self._executor = ThreadPoolExecutor(max_workers=self.client.pool_size, thread_name_prefix="brightdata")
+        self._semaphore: asyncio.Semaphore | None = None
+        self._pending: dict[str, tuple[asyncio.Future, str | None, PollTimer]] = {}
+        self._due: dict[str, float] = {}
+        self._wakeup: asyncio.Event | None = None
+        self._poller: asyncio.Task | None = None
+        self._listener = None
+
+    async def _call(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(fn, *args, **kwargs))
+
+    async def collect(
+        self,
+        dataset_id: str,
+        payload: list[dict],
+        ready_field: str | None = None,
+        dataset: str = "",
+    ) -> list:
+        """Triggers a collection, waits for it and downloads the records."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async with self._semaphore:
+            snapshot_id = await self._call(self.client.trigger, dataset_id, payload)
+            await self.wait(snapshot_id, ready_field, dataset)
+            return await self._call(self.client.download, snapshot_id)
+
+    async def wait(self, snapshot_id: str, ready_field: str | None = None, dataset: str = "") -> dict:
+        """Waits until the shared poll loop sees the snapshot ready."""
+        future = asyncio.get_running_loop().create_future()
+        self._pending[snapshot_id] = (future, ready_field, self.poll_strategy.start(dataset, snapshot_id))
+        self._due[snapshot_id] = time.monotonic()
+
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        if self.client.receiver and self._listener is None:
+            self._listen(asyncio.get_running_loop())
+        self._wakeup.set()
+        if self._poller is None or self._poller.done():
+            self._poller = asyncio.create_task(self._poll_loop())
+        return await future
+
+    async def _poll_loop(self) -> None:
+        while self._pending:
+            wait_for = min(self._due.values()) - time.monotonic()
+            if wait_for > 0:
+                # Sleep until the next snapshot is due, or a new one arrives
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), wait_for)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            now = time.monotonic()
+            snapshot_ids = [s for s, at in self._due.items() if at <= now]
+            infos = await asyncio.gather(
+                *(self._call(self.client.poll, snapshot_id) for snapshot_id in snapshot_ids),
+                return_exceptions=True,
+            )
+
+            for snapshot_id, info in zip(snapshot_ids, infos):
+                future, ready_field, timer = self._pending[snapshot_id]
+                if future.done():
+                    # The caller was cancelled
+                    self._forget(snapshot_id)
+                elif isinstance(info, BaseException):
+                    self._forget(snapshot_id)
+                    future.set_exception(info)
+                elif is_ready(info, ready_field):
+                    timer.done()
+                    self._forget(snapshot_id)
+                    future.set_result(info)
+                elif info.get("status") == "failed":
+                    self._forget(snapshot_id)
+                    future.set_exception(SnapshotFailed(f"Snapshot failed: {info}"))
+                else:
+                    try:
+                        self._due[snapshot_id] = time.monotonic() + self.client.next_poll_delay(timer)
+                    except PollTimeoutError as e:
+                        self._forget(snapshot_id)
+                        future.set_exception(e)
+
+    def _listen(self, loop: asyncio.AbstractEventLoop) -> None:
+        def on_webhook(snapshot_id: str) -> None:
+            try:
+                loop.call_soon_threadsafe(self._notified, snapshot_id)
+            except RuntimeError:
+                # The loop has been closed
+                pass
+
+        self.client.receiver.add_listener(on_webhook)
+        self._listener = on_webhook
+
+    def _notified(self, snapshot_id: str) -> None:
+        if snapshot_id in self._due:
+            self._due[snapshot_id] = 0
+            self._wakeup.set()
+
+    def _forget(self, snapshot_id: str) -> None:
+        self._pending.pop(snapshot_id, None)
+        self._due.pop(snapshot_id, None)
+
+    def close(self) -> None:
+        if self._listener is not None:
+            self.client.receiver.remove_listener(self._listener)
+            self._listener = None
+        self._executor.shutdown(wait=False)
+
+
+_schedulers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, SnapshotScheduler]" = weakref.WeakKeyDictionary()
+
+
+def get_scheduler() -> SnapshotScheduler:
+    """Returns the scheduler for the running event loop, creating it on first use."""
+    loop = asyncio.get_running_loop()
+    scheduler = _schedulers.get(loop)
+    if scheduler is None or scheduler.client is not get_client():
+        if scheduler is not None:
+            scheduler.close()
+        scheduler = SnapshotScheduler()
+        _schedulers[loop] = scheduler
+    return scheduler
@@ -0,0 +1,199 @@
+import time
+from typing import Callable, Iterable, Iterator
+
+from brightdata_client import get_client, is_ready, require_dataset_id
+from config import load_env
+from metrics import get_metrics
+from polling import PollTimeoutError, PollTimer
+from urls import normalize_url, record_input_url
+
+load_env()
+
+DEFAULT_CHUNK_SIZE = 100
+
+
+def chunked(items: list, size: int) -> Iterable[list]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def fetch_batch(
+    urls: Iterable[str],
+    dataset_env: str,
+    filter_fn: Callable[[dict], dict],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    dataset: str = "",
+    stream: bool = False,
+) -> dict[str, dict]:
+    """
+    Fetches many URLs from a Bright Data dataset, packing up to `chunk_size`
+    URLs into each trigger and polling all snapshots together.
+
+    Args:
+        urls (Iterable[str]): The URLs to collect.
+        dataset_env (str): Name of the environment variable holding the dataset id.
+        filter_fn (Callable): Applied to every downloaded record.
+        chunk_size (int): Maximum number of URLs per trigger.
+        dataset (str): Label the poll strategy learns completion times under.
+        stream (bool): Download as JSON lines, filtering records as they arrive.
+
+    Returns:
+        dict[str, dict]: Maps every input URL to its filtered record, or to
+        `{"error": ..., "error_code": ...}` when that URL failed.
+    """
+    urls = list(urls)
+    results = dict(iter_fetch_batch(urls, dataset_env, filter_fn, chunk_size, dataset, stream))
+    return {url: results[url] for url in urls}
+
+
+def iter_fetch_batch(
+    urls: Iterable[str],
+    dataset_env: str,
+    filter_fn: Callable[[dict], dict],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    dataset: str = "",
+    stream: bool = False,
+) -> Iterator[tuple[str, dict]]:
+    """
+    Like `fetch_batch`, but yields `(url, result)` pairs as each snapshot
+    completes instead of holding every result until the end.
+    """
+    # Several spellings of the same URL share one scrape
+    by_key: dict[str, list[str]] = {}
+    for url in urls:
+        by_key.setdefault(normalize_url(url), []).append(url)
+    unique = [group[0] for group in by_key.values()]
+
+    def settle(settled: Iterable[tuple[str, dict]]) -> Iterator[tuple[str, dict]]:
+        for key, value in settled:
+            for url in by_key[key]:
+                yield url, value
+
+    for chunk, records, error in iter_snapshots(unique, dataset_env, chunk_size, dataset, stream):
+        keys = [normalize_url(url) for url in chunk]
+        if error is not None:
+            yield from settle((key, error) for key in keys)
+            continue
+        # Map records back to their inputs
+        filter_time = [0.0]
+        yield from settle(match_records(keys, records, _timed(filter_fn, filter_time)))
+        get_metrics().record("filter", filter_time[0], dataset=dataset)
+
+
+def iter_snapshots(
+    urls: list[str],
+    dataset_env: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    dataset: str = "",
+    stream: bool = False,
+) -> Iterator[tuple[list[str], Iterable, dict | None]]:
+    """
+    Triggers one collection per chunk of up to `chunk_size` URLs and polls
+    all the snapshots together.
+
+    Yields:
+        tuple: `(chunk, records, None)` as each snapshot becomes ready, with its
+        records downloaded (lazily when `stream` is set), or `(chunk, (), error)`
+        when the snapshot failed or timed out.
+    """
+    dataset_id = require_dataset_id(dataset_env)
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1.")
+    client = get_client()
+
+    # 1) Trigger one collection per chunk
+    pending: dict[str, tuple[list[str], PollTimer]] = {}
+    due: dict[str, float] = {}
+    for chunk in chunked(urls, chunk_size):
+        snapshot_id = client.trigger(dataset_id, [{"url": url} for url in chunk])
+        pending[snapshot_id] = (chunk, client.poll_strategy.start(dataset, snapshot_id))
+        due[snapshot_id] = time.monotonic()
+
+    # 2) Poll every snapshot on its own schedule, downloading each one as it becomes ready
+    while pending:
+        wait_for = min(due.values()) - time.monotonic()
+        if wait_for > 0:
+            client.pause(list(pending), wait_for)
+
+        now = time.monotonic()
+        notified = client.receiver.notification if client.receiver else lambda snapshot_id: None
+        for snapshot_id in [s for s, at in due.items() if at <= now or notified(s)]:
+            chunk, timer = pending[snapshot_id]
+            info = client.poll(snapshot_id)
+
+            if info.get("status") == "failed":
+                _forget(snapshot_id, pending, due)
+                yield chunk, (), {"error": f"Snapshot failed: {info}", "error_code": "snapshot_failed"}
+            elif is_ready(info):
+                timer.done()
+                _forget(snapshot_id, pending, due)
+
+                # 3) Download
+                yield chunk, client.iter_download(snapshot_id) if stream else client.download(snapshot_id), None
+            else:
+                try:
+                    due[snapshot_id] = time.monotonic() + client.next_poll_delay(timer)
+                except PollTimeoutError as e:
+                    _forget(snapshot_id, pending, due)
+                    yield chunk, (), {"error": str(e), "error_code": "timeout"}
+
+
+def _timed(filter_fn: Callable[[dict], dict], total: list[float]) -> Callable[[dict], dict]:
+    # Adds each call's duration to total[0], so a snapshot records a single filter span
+    def timed(record: dict) -> dict:
+        started = time.perf_counter()
+        try:
+            return filter_fn(record)
+        finally:
+            total[0] += time.perf_counter() - started
+    return timed
+
+
+def _forget(snapshot_id: str, pending: dict, due: dict) -> None:
+    pending.pop(snapshot_id, None)
+    due.pop(snapshot_id, None)
+
+
+def match_records(
+    keys: list[str],
+    records: Iterable,
+    filter_fn: Callable[[dict], dict],
+) -> Iterator[tuple[str, dict]]:
+    """
+    Pairs downloaded records with the normalized input URLs they were triggered for.
+
+    Yields `(key, result)` for every key: the filtered record, or an error
+    dict when the record failed or never came back.
+    """
+    remaining = set(keys)
+    unmatched = 0
+    first_unmatched = None
+
+    for record in records:
+        url = record_input_url(record)
+        key = normalize_url(url) if url else None
+        if key not in remaining:
+            unmatched += 1
+            if first_unmatched is None:
+                first_unmatched = record
+            continue
+        remaining.discard(key)
+        yield key, _project(record, filter_fn)
+
+    # A lone record without a usable URL can only belong to the lone leftover input
+    if len(remaining) == 1 and unmatched == 1:
+        yield remaining.pop(), _project(first_unmatched, filter_fn)
+
+    for key in remaining:
+        yield key, {"error": "No record returned for URL", "error_code": "missing"}
+
+
+def _project(record, filter_fn: Callable[[dict], dict]) -> dict:
+    if not isinstance(record, dict):
+        return {"error": f"Unexpected record: {record!r}", "error_code": "invalid_record"}
+    if record.get("error"):
+        return {"error": record["error"], "error_code": record.get("error_code")}
+    try:
+        return filter_fn(record)
+    except Exception as e:
+        return {"error": f"Failed to filter record: {e}", "error_code": "filter_failed"}
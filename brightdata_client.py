@@ -0,0 +1,314 @@
+import json
+import os
+import random
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, Iterator
+from urllib.parse import urlencode
+
+from config import get_config, load_env
+from metrics import get_metrics
+from polling import FixedPolling, PollStrategy, PollTimer, get_poll_strategy
+from ratelimit import RateLimiter, get_rate_limiter, parse_retry_after
+from webhook import COMPLETION_MODES, WebhookReceiver, get_receiver
+
+if TYPE_CHECKING:
+    import requests
+
+load_env()
+
+# Seconds allowed for each kind of call; downloads can be large
+DEFAULT_TIMEOUTS = {"trigger": 30, "status": 30, "download": 60}
+CONNECT_TIMEOUT = 10
+
+
+def require_dataset_id(dataset_env: str) -> str:
+    """Returns the dataset id stored in `dataset_env`, checking credentials are present."""
+    return get_config().require_dataset_id(dataset_env)
+
+
+def is_ready(info: dict, ready_field: str | None = None) -> bool:
+    """
+    Tells whether a snapshot status response means the data can be downloaded.
+
+    Some datasets answer the status call with the record itself instead of a
+    status; `ready_field` names a key that identifies such a record.
+    """
+    status = info.get("status")
+    if status == "ready":
+        return True
+    return bool(ready_field) and status is None and bool(info.get(ready_field))
+
+
+class SnapshotFailed(RuntimeError):
+    """Raised when Bright Data reports that a snapshot failed."""
+
+
+class BrightDataClient:
+    """
+    Bright Data dataset API client sharing one pooled, keep-alive session.
+
+    Connection resets and 5xx responses are retried with jittered exponential
+    backoff; every other error is raised straight away. Every call first waits
+    for the rate limiter (see ratelimit.py), and a 429 makes the limiter hold
+    that endpoint for the Retry-After delay before the call is retried, up to
+    BRIGHTDATA_MAX_THROTTLE_RETRIES times.
+
+    Every call is timed into the metrics registry (see metrics.py) as a
+    trigger, poll, download or parse span, along with request, retry,
+    response size and record counts.
+
+    With `completion` set to "notify" or "deliver" (BRIGHTDATA_COMPLETION),
+    triggers ask Bright Data to call the local webhook receiver when a
+    snapshot is ready, or to post its records there. Waits then wake on the
+    webhook and only poll every BRIGHTDATA_WEBHOOK_FALLBACK seconds in case
+    the notification never arrives.
+    """
+
+    def __init__(
+        self,
+        api_token: str | None = None,
+        pool_size: int | None = None,
+        max_retries: int | None = None,
+        backoff: float | None = None,
+        timeouts: dict[str, float] | None = None,
+        poll_strategy: PollStrategy | None = None,
+        completion: str | None = None,
+        receiver: WebhookReceiver | None = None,
+        base_url: str | None = None,
+        limiter: RateLimiter | None = None,
+    ):
+        config = get_config()
+        self.api_token = api_token or config.api_token
+        if not self.api_token:
+            raise ValueError("Missing Bright Data API credentials in environment variables.")
+        # Overridable so the client can target a local stand-in (see fake_brightdata.py)
+        self.base_url = base_url.rstrip("/") if base_url else config.base_url
+
+        self.pool_size = pool_size or int(os.environ.get("BRIGHTDATA_POOL_SIZE", 10))
+        self.max_retries = max_retries if max_retries is not None else int(os.environ.get("BRIGHTDATA_MAX_RETRIES", 3))
+        self.backoff = backoff if backoff is not None else float(os.environ.get("BRIGHTDATA_RETRY_BACKOFF", 0.5))
+        self.backoff_cap = 30.0
+        self.max_throttle_retries = int(os.environ.get("BRIGHTDATA_MAX_THROTTLE_RETRIES", 10))
+        self.limiter = limiter or get_rate_limiter()
+        self.timeouts = {
+            phase: float(os.environ.get(f"BRIGHTDATA_{phase.upper()}_TIMEOUT", default))
+            for phase, default in DEFAULT_TIMEOUTS.items()
+        }
+        self.timeouts.update(timeouts or {})
+        self.completion = completion or os.environ.get("BRIGHTDATA_COMPLETION", "poll")
+        if self.completion not in COMPLETION_MODES:
+            raise ValueError(f"Unknown completion mode: {self.completion!r}")
+
+        self.receiver = None
+        if self.completion != "poll":
+            self.receiver = receiver or get_receiver()
+            fallback = float(os.environ.get("BRIGHTDATA_WEBHOOK_FALLBACK", 60))
+            self.poll_strategy = poll_strategy or FixedPolling(fallback)
+        else:
+            self.poll_strategy = poll_strategy or get_poll_strategy()
+
+        # requests is imported by the first client, so cached lookups never load the HTTP stack
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "Authorization": f"Bearer {self.api_token}",
+            "Content-Type": "application/json",
+        })
+
+    def request(self, method: str, url: str, phase: str, **kwargs) -> "requests.Response":
+        """Sends a request with the timeout for `phase`, retrying transient failures."""
+        import requests
+
+        kwargs.setdefault("timeout", (CONNECT_TIMEOUT, self.timeouts[phase]))
+        metrics = get_metrics()
+        attempt = throttled = 0
+        while True:
+            # Streamed downloads give their slot back once the headers have arrived
+            with self.limiter.slot(phase):
+                try:
+                    resp = self.session.request(method, url, **kwargs)
+                except requests.exceptions.ConnectionError:
+                    resp = None
+                    metrics.count("brightdata_requests_total", phase=phase, status=0)
+                    if attempt >= self.max_retries:
+                        raise
+
+            if resp is not None:
+                metrics.count("brightdata_requests_total", phase=phase, status=resp.status_code)
+                if resp.status_code == 429 and throttled < self.max_throttle_retries:
+                    delay = parse_retry_after(resp.headers.get("Retry-After"))
+                    if delay is None:
+                        delay = min(self.backoff_cap, self.backoff * 2 ** throttled)
+                    resp.close()
+                    # The limiter holds every caller of this endpoint until the delay has passed
+                    self.limiter.backoff(phase, delay)
+                    throttled += 1
+                    continue
+                if resp.status_code < 500 or attempt >= self.max_retries:
+                    resp.raise_for_status()
+                    return resp
+                resp.close()
+            metrics.count("brightdata_retries_total", phase=phase)
+            time.sleep(self._retry_delay(attempt))
+            attempt += 1
+
+    def _retry_delay(self, attempt: int) -> float:
+        # Full jitter keeps many workers from retrying in lockstep
+        return random.uniform(0, min(self.backoff_cap, self.backoff * 2 ** attempt))
+
+    def snapshot_url(self, snapshot_id: str) -> str:
+        return f"{self.base_url}/datasets/v3/snapshot/{snapshot_id}"
+
+    def trigger(self, dataset_id: str, payload: list[dict]) -> str:
+        """Starts a collection and returns its snapshot id."""
+        params = {"dataset_id": dataset_id}
+        if self.completion == "notify":
+            params["notify"] = self.receiver.notify_url
+        elif self.completion == "deliver":
+            params.update(endpoint=self.receiver.deliver_url, format="json", uncompressed_webhook="true")
+        if self.receiver and self.receiver.secret:
+            params["auth_header"] = self.receiver.secret
+
+        trigger_url = f"{self.base_url}/datasets/v3/trigger?{urlencode(params)}"
+        with get_metrics().span("trigger"):
+            resp = self.request("POST", trigger_url, "trigger", json=payload)
+        body = resp.json()
+        snapshot_id = body.get("snapshot_id")
+
+        if not snapshot_id:
+            raise RuntimeError(f"Failed to get snapshot_id from response: {body}")
+        return snapshot_id
+
+    def status(self, snapshot_id: str) -> dict:
+        with get_metrics().span("poll"):
+            return self.request("GET", self.snapshot_url(snapshot_id), "status").json()
+
+    def poll(self, snapshot_id: str) -> dict:
+        """Returns the webhook notice for a snapshot if one arrived, else asks the API."""
+        if self.receiver:
+            notification = self.receiver.notification(snapshot_id)
+            if notification:
+                return notification
+        return self.status(snapshot_id)
+
+    def next_poll_delay(self, timer: PollTimer) -> float:
+        """The timer's next poll delay, pushed back while the rate limiter holds status calls after a 429."""
+        return max(timer.next_delay(), self.limiter.delay("status"))
+
+    def pause(self, snapshot_ids: list[str], seconds: float) -> None:
+        """Sleeps up to `seconds`, returning early if a webhook arrives for one of the snapshots."""
+        if self.receiver:
+            self.receiver.wait(snapshot_ids, seconds)
+        else:
+            time.sleep(seconds)
+
+    def wait(
+        self,
+        snapshot_id: str,
+        ready_field: str | None = None,
+        on_status: Callable[[dict], None] | None = None,
+        dataset: str = "",
+    ) -> dict:
+        """
+        Polls a snapshot until it is ready and returns the last status response.
+
+        The poll strategy picks the interval for `dataset` and raises
+        `PollTimeoutError` once its deadline has passed.
+        """
+        timer = self.poll_strategy.start(dataset, snapshot_id)
+        while True:
+            info = self.poll(snapshot_id)
+            if on_status:
+                on_status(info)
+
+            if is_ready(info, ready_field):
+                timer.done()
+                return info
+            if info.get("status") == "failed":
+                raise SnapshotFailed(f"Snapshot failed: {info}")
+
+            self.pause([snapshot_id], self.next_poll_delay(timer))
+
+    def download(self, snapshot_id: str) -> list:
+        """Downloads a ready snapshot as a list of records."""
+        if self.receiver:
+            records = self.receiver.take_records(snapshot_id)
+            if records is not None:
+                return records
+
+        metrics = get_metrics()
+        with metrics.span("download"):
+            resp = self.request("GET", f"{self.snapshot_url(snapshot_id)}?format=json", "download")
+            metrics.observe("brightdata_response_bytes", len(resp.content), phase="download")
+        with metrics.span("parse"):
+            data = resp.json()
+        if not isinstance(data, list):
+            data = [data] if data else []
+        metrics.count("brightdata_records_total", len(data))
+        metrics.observe("brightdata_records_per_download", len(data))
+        return data
+
+    def iter_download(self, snapshot_id: str) -> Iterator[dict]:
+        """
+        Streams a ready snapshot as JSON lines, yielding one record at a time
+        so memory stays flat however large the snapshot is.
+        """
+        if self.receiver:
+            records = self.receiver.take_records(snapshot_id)
+            if records is not None:
+                yield from records
+                return
+
+        metrics = get_metrics()
+        started = time.perf_counter()
+        size = records = 0
+        parsing = 0.0
+        resp = self.request("GET", f"{self.snapshot_url(snapshot_id)}?format=jsonl", "download", stream=True)
+        try:
+            for line in resp.iter_lines():
+                size += len(line) + 1
+                if line.strip():
+                    parse_started = time.perf_counter()
+                    record = json.loads(line)
+                    parsing += time.perf_counter() - parse_started
+                    records += 1
+                    yield record
+        finally:
+            resp.close()
+            # The download span covers the whole stream, including the time the caller spent per record
+            metrics.record("download", time.perf_counter() - started - parsing)
+            metrics.record("parse", parsing)
+            metrics.observe("brightdata_response_bytes", size, phase="download")
+            metrics.count("brightdata_records_total", records)
+            metrics.observe("brightdata_records_per_download", records)
+
+    def collect(self, dataset_id: str, payload: list[dict], ready_field: str | None = None, dataset: str = "") -> list:
+        """Triggers a collection, waits for it and downloads the records."""
+        snapshot_id = self.trigger(dataset_id, payload)
+        self.wait(snapshot_id, ready_field, dataset=dataset)
+        return self.download(snapshot_id)
+
+    def close(self) -> None:
+        self.session.close()
+
+
+_client: BrightDataClient | None = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> BrightDataClient:
+    """Returns the process-wide client, creating it on first use."""
+    global _client
+    with _client_lock:
+        config = get_config()
+        if _client is None or (config.api_token and _client.api_token != config.api_token) or _client.base_url != config.base_url:
+            if _client is not None:
+                _client.close()
+            _client = BrightDataClient()
+        return _client
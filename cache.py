@@ -0,0 +1,267 @@
+import asyncio
+import copy
+import json
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from typing import Awaitable, Callable
+
+from config import load_env
+from urls import normalize_url
+
+load_env()
+
+# Seconds a cached result stays fresh, per entry type
+DEFAULT_TTLS = {"profile": 7 * 24 * 3600, "job": 24 * 3600, "search": 3600}
+DEFAULT_MAX_ENTRIES = 100_000
+
+
+def cache_key(kind: str, value: str) -> str:
+    """Normalizes a URL (or a search keyword) so equivalent requests share an entry."""
+    if kind == "search":
+        return " ".join(value.lower().split())
+    return normalize_url(value)
+
+
+class ResultCache:
+    """
+    On-disk SQLite cache of filtered fetch results.
+
+    Each entry type has its own TTL (BRIGHTDATA_CACHE_TTL_PROFILE, _JOB,
+    _SEARCH). When more than `max_entries` are stored the least recently
+    used ones are evicted.
+    """
+
+    def __init__(self, path: str, ttls: dict[str, float] | None = None, max_entries: int | None = None):
+        self.path = path
+        self.ttls = {
+            kind: float(os.environ.get(f"BRIGHTDATA_CACHE_TTL_{kind.upper()}", default))
+            for kind, default in DEFAULT_TTLS.items()
+        }
+        self.ttls.update(ttls or {})
+        self.max_entries = max_entries or int(os.environ.get("BRIGHTDATA_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES))
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " kind TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,"
+            " created REAL NOT NULL, accessed REAL NOT NULL,"
+            " PRIMARY KEY (kind, key)) WITHOUT ROWID"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+        self._count = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def get(self, kind: str, key: str):
+        """Returns the cached value, or None if it is missing or expired."""
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value, created FROM entries WHERE kind = ? AND key = ?", (kind, key)
+            ).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self.ttls.get(kind, 0):
+                self._db.execute("DELETE FROM entries WHERE kind = ? AND key = ?", (kind, key))
+                self._count -= 1
+                return None
+            self._db.execute("UPDATE entries SET accessed = ? WHERE kind = ? AND key = ?", (now, kind, key))
+        return json.loads(row[0])
+
+    def set(self, kind: str, key: str, value) -> None:
+        now = time.time()
+        encoded = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            cursor = self._db.execute(
+                "INSERT OR REPLACE INTO entries (kind, key, value, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (kind, key, encoded, now, now),
+            )
+            # Replacements count too, so this over-estimates until the next eviction recounts
+            self._count += cursor.rowcount
+            if self._count > self.max_entries:
+                self._evict()
+
+    def _evict(self) -> None:
+        # Drop expired entries first, then the least recently used tenth
+        now = time.time()
+        for kind, ttl in self.ttls.items():
+            self._db.execute("DELETE FROM entries WHERE kind = ? AND created < ?", (kind, now - ttl))
+        count = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        if count > self.max_entries:
+            excess = count - self.max_entries + self.max_entries // 10
+            self._db.execute(
+                "DELETE FROM entries WHERE (kind, key) IN (SELECT kind, key FROM entries ORDER BY accessed LIMIT ?)",
+                (excess,),
+            )
+            count = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        self._count = count
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class SingleFlight:
+    """Lets concurrent callers asking for the same key share one call."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[tuple, "_Call"] = {}
+
+    def do(self, key: tuple, fn: Callable[[], object]):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            # Followers get their own copy so callers can't see each other's edits
+            return copy.deepcopy(call.result)
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: BaseException | None = None
+
+
+class AsyncSingleFlight:
+    """`SingleFlight` for coroutines running on one event loop."""
+
+    def __init__(self):
+        self._calls: dict[tuple, asyncio.Future] = {}
+
+    async def do(self, key: tuple, fn: Callable[[], Awaitable]):
+        future = self._calls.get(key)
+        if future is not None:
+            return copy.deepcopy(await asyncio.shield(future))
+
+        future = asyncio.ensure_future(fn())
+        self._calls[key] = future
+        try:
+            return await asyncio.shield(future)
+        finally:
+            if future.done():
+                self._calls.pop(key, None)
+            else:
+                future.add_done_callback(lambda _: self._calls.pop(key, None))
+
+
+_cache: ResultCache | None = None
+_cache_lock = threading.Lock()
+_flight = SingleFlight()
+_async_flights: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncSingleFlight]" = weakref.WeakKeyDictionary()
+
+
+def get_cache() -> ResultCache | None:
+    """Returns the cache at BRIGHTDATA_CACHE_PATH, or None when caching is not configured."""
+    global _cache
+    path = os.environ.get("BRIGHTDATA_CACHE_PATH")
+    with _cache_lock:
+        if not path:
+            return None
+        if _cache is None or _cache.path != path:
+            _cache = ResultCache(path)
+        return _cache
+
+
+def cached_fetch(kind: str, value: str, fetch: Callable[[], object]):
+    """
+    Returns the cached result for `value`, or calls `fetch` to produce it.
+
+    Concurrent calls for the same key share a single `fetch`, whether or not
+    a persistent cache is configured. Empty results are not stored.
+    """
+    key = cache_key(kind, value)
+    cache = get_cache()
+    if cache is not None:
+        hit = cache.get(kind, key)
+        if hit is not None:
+            return hit
+
+    def load():
+        result = fetch()
+        if cache is not None and result:
+            cache.set(kind, key, result)
+        return result
+
+    return _flight.do((kind, key), load)
+
+
+async def async_cached_fetch(kind: str, value: str, fetch: Callable[[], Awaitable]):
+    """`cached_fetch` for coroutines."""
+    key = cache_key(kind, value)
+    cache = get_cache()
+    if cache is not None:
+        hit = cache.get(kind, key)
+        if hit is not None:
+            return hit
+
+    async def load():
+        result = await fetch()
+        if cache is not None and result:
+            cache.set(kind, key, result)
+        return result
+
+    loop = asyncio.get_running_loop()
+    flight = _async_flights.get(loop)
+    if flight is None:
+        flight = _async_flights[loop] = AsyncSingleFlight()
+    return await flight.do((kind, key), load)
+
+
+def cached_batch(kind: str, urls: list[str], fetch_many: Callable[[list[str]], dict[str, dict]]) -> dict[str, dict]:
+    """
+    Serves what it can of a batch from the cache and fetches only the misses.
+
+    `fetch_many` takes the missing URLs and returns a dict mapping each one to
+    its result; results carrying an "error" key are not stored.
+    """
+    urls = list(urls)
+    cache = get_cache()
+    if cache is None:
+        return fetch_many(urls)
+
+    results: dict[str, dict] = {}
+    misses = []
+    for url in urls:
+        hit = cache.get(kind, cache_key(kind, url))
+        if hit is None:
+            misses.append(url)
+        else:
+            results[url] = hit
+
+    if misses:
+        fetched = fetch_many(misses)
+        for url, result in fetched.items():
+            if result and "error" not in result:
+                cache.set(kind, cache_key(kind, url), result)
+        results.update(fetched)
+    return {url: results[url] for url in urls}
@@ -0,0 +1,105 @@
+import json
+import os
+import threading
+import time
+from importlib import metadata
+
+from config import load_env
+
+load_env()
+
+# Bump when the shape of cached entries changes
+CACHE_VERSION = 1
+DEFAULT_PATH = ".cache/composio_actions.json"
+DEFAULT_TTL = 7 * 24 * 3600
+
+
+def _sdk_version() -> str | None:
+    try:
+        return metadata.version("composio-core")
+    except metadata.PackageNotFoundError:
+        return None
+
+
+class ActionCache:
+    """
+    Persistent cache of what Composio schema discovery found for each app.
+
+    For every app it keeps the resolved HTML -> PDF action, its parameter
+    schema and the precomputed parameter mapping, plus the app's action
+    names for listing. Entries expire after `ttl` seconds
+    (PDF_ACTION_CACHE_TTL), and the whole file is ignored when it was
+    written by another cache version or Composio SDK version.
+    """
+
+    def __init__(self, path: str | None = None, ttl: float | None = None):
+        self.path = path if path is not None else os.environ.get("PDF_ACTION_CACHE", DEFAULT_PATH)
+        self.ttl = ttl if ttl is not None else float(os.environ.get("PDF_ACTION_CACHE_TTL", DEFAULT_TTL))
+        self.sdk_version = _sdk_version()
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict] | None = None
+
+    def _load(self) -> dict[str, dict]:
+        if self._entries is None:
+            self._entries = {}
+            if self.path and os.path.exists(self.path):
+                try:
+                    with open(self.path) as f:
+                        data = json.load(f)
+                except (OSError, ValueError):
+                    data = {}
+                # Valid JSON of the wrong shape is as unusable as a corrupt file
+                if not isinstance(data, dict):
+                    data = {}
+                entries = data.get("entries")
+                if data.get("version") == CACHE_VERSION and data.get("sdk") == self.sdk_version and isinstance(entries, dict):
+                    self._entries = entries
+        return self._entries
+
+    def _save(self) -> None:
+        if not self.path:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"version": CACHE_VERSION, "sdk": self.sdk_version, "entries": self._entries}, f)
+        os.replace(tmp, self.path)
+
+    def get(self, key: str) -> dict | None:
+        """Returns the fresh entry stored under `key`, or None."""
+        with self._lock:
+            entry = self._load().get(key)
+        if entry is None or time.time() - entry.get("cached_at", 0) > self.ttl:
+            return None
+        return entry["value"]
+
+    def set(self, key: str, value: dict | list) -> None:
+        with self._lock:
+            self._load()[key] = {"value": value, "cached_at": time.time()}
+            self._save()
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            if self._load().pop(key, None) is not None:
+                self._save()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries = {}
+            self._save()
+
+
+_cache: ActionCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_action_cache() -> ActionCache:
+    """Returns the process-wide cache at PDF_ACTION_CACHE (set it empty to disable persistence)."""
+    global _cache
+    path = os.environ.get("PDF_ACTION_CACHE", DEFAULT_PATH)
+    with _cache_lock:
+        if _cache is None or _cache.path != path:
+            _cache = ActionCache(path)
+        return _cache
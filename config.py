@@ -0,0 +1,89 @@
+import os
+import threading
+from dataclasses import astuple, dataclass
+
+API_BASE_URL = "https://api.brightdata.com"
+
+_env_loaded = False
+_env_lock = threading.Lock()
+
+
+def load_env() -> None:
+    """
+    Loads the .env file into os.environ once per process; variables already set win.
+
+    Modules call this when imported instead of `load_dotenv()`, so the file is
+    found and parsed once rather than once per module, and python-dotenv is
+    only imported by the first caller.
+    """
+    global _env_loaded
+    if _env_loaded:
+        return
+    with _env_lock:
+        if not _env_loaded:
+            from dotenv import load_dotenv
+            load_dotenv()
+            _env_loaded = True
+
+
+@dataclass(frozen=True)
+class Config:
+    """
+    Credentials and endpoints resolved from the environment (and .env).
+
+    Args:
+        api_token (str): BRIGHTDATA_API_TOKEN.
+        profile_dataset_id (str): BRIGHTDATA_PROFILE_DATASET_ID.
+        job_dataset_id (str): BRIGHTDATA_JOB_DATASET_ID.
+        base_url (str): BRIGHTDATA_BASE_URL, without a trailing slash.
+        composio_api_key (str): COMPOSIO_API_KEY.
+    """
+
+    api_token: str | None
+    profile_dataset_id: str | None
+    job_dataset_id: str | None
+    base_url: str
+    composio_api_key: str | None
+
+    @classmethod
+    def from_env(cls) -> "Config":
+        load_env()
+        return cls(*_raw_env())
+
+    def require_dataset_id(self, dataset_env: str) -> str:
+        """Returns the dataset id named by `dataset_env`, checking credentials are present."""
+        known = {"BRIGHTDATA_PROFILE_DATASET_ID": self.profile_dataset_id, "BRIGHTDATA_JOB_DATASET_ID": self.job_dataset_id}
+        dataset_id = known[dataset_env] if dataset_env in known else os.environ.get(dataset_env)
+        if not self.api_token or not dataset_id:
+            raise ValueError("Missing Bright Data API credentials in environment variables.")
+        return dataset_id
+
+
+def _raw_env() -> tuple:
+    return (
+        os.environ.get("BRIGHTDATA_API_TOKEN"),
+        os.environ.get("BRIGHTDATA_PROFILE_DATASET_ID"),
+        os.environ.get("BRIGHTDATA_JOB_DATASET_ID"),
+        (os.environ.get("BRIGHTDATA_BASE_URL") or API_BASE_URL).rstrip("/"),
+        os.environ.get("COMPOSIO_API_KEY"),
+    )
+
+
+_config: Config | None = None
+_config_lock = threading.Lock()
+
+
+def get_config() -> Config:
+    """
+    Returns the process-wide config, resolving it on first use.
+
+    It is resolved again only when one of its variables is changed in
+    os.environ, as tests and long-running workers may do.
+    """
+    global _config
+    load_env()
+    raw = _raw_env()
+    with _config_lock:
+        if _config is None or astuple(_config) != raw:
+            _config = Config(*raw)
+        return _config
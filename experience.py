@@ -0,0 +1,8 @@
+import json
+
+
+def merge_experience(profile: dict, path: str = "experience_override.json") -> dict:
+    """Returns the profile with `experience` taken from an override file (the dataset has no work history)."""
+    with open(path) as f:
+        override = json.load(f)
+    return {**profile, "experience": override.get("experience")}
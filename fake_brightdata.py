@@ -0,0 +1,345 @@
+"""
+Local stand-in for the Bright Data datasets API, for benchmarks and offline tests.
+
+Point the client at it with BRIGHTDATA_BASE_URL:
+
+    python fake_brightdata.py --port 8788 --ready-after 2 --throttle-rate 0.05
+    BRIGHTDATA_BASE_URL=http://127.0.0.1:8788 python run_search_jobs.py
+"""
+import argparse
+import asyncio
+import hashlib
+import itertools
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+SNAPSHOT_PATH = "/datasets/v3/snapshot/"
+TRIGGER_PATH = "/datasets/v3/trigger"
+
+_FILLER = (
+    "Builds and operates data pipelines, reviews code, mentors engineers and "
+    "works closely with product on roadmap and delivery. "
+)
+
+
+@dataclass
+class FakeSettings:
+    """
+    How the stand-in behaves.
+
+    Args:
+        latency (float): Seconds added to every response.
+        jitter (float): Up to this many extra seconds, drawn uniformly per response.
+        ready_after (float): Seconds from trigger until a snapshot is ready.
+        failure_rate (float): Share of snapshots that end up "failed".
+        throttle_rate (float): Share of requests answered with 429.
+        retry_after (float): Retry-After sent with every 429.
+        payload_bytes (int): Approximate size of every record.
+        search_results (int): Records returned per search URL.
+        seed (int): Seed for the random draws, for repeatable runs.
+    """
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    ready_after: float = 1.0
+    failure_rate: float = 0.0
+    throttle_rate: float = 0.0
+    retry_after: float = 1.0
+    payload_bytes: int = 2048
+    search_results: int = 25
+    seed: int | None = None
+
+
+@dataclass
+class Snapshot:
+    snapshot_id: str
+    dataset_id: str
+    inputs: list[dict]
+    ready_at: float
+    failed: bool
+    requests: int = 1
+    records: list[dict] | None = field(default=None, repr=False)
+
+
+def _number(url: str) -> int:
+    return int.from_bytes(hashlib.blake2b(url.encode(), digest_size=6).digest(), "big")
+
+
+def _text(size: int) -> str:
+    return (_FILLER * (size // len(_FILLER) + 1))[:max(size, 0)]
+
+
+def _padded(record: dict, key: str, size: int) -> dict:
+    # Fills `key` so the record serializes to about `size` bytes
+    record[key] = ""
+    record[key] = _text(size - len(json.dumps(record)))
+    return record
+
+
+def fake_records(url: str, settings: FakeSettings) -> list[dict]:
+    """Builds deterministic records shaped like the real dataset's for one input URL."""
+    n = _number(url)
+    source = {"url": url}
+    size = settings.payload_bytes
+    if "/jobs/search" in url:
+        return [
+            _padded({
+                "job_title": f"Software Engineer {i}",
+                "company_name": f"Company {(n + i) % 997}",
+                "job_location": "Remote",
+                "job_url": f"https://www.linkedin.com/jobs/view/{(n + i) % 10 ** 10}",
+                "job_seniority_level": "Mid-Senior level",
+                "job_employment_type": "Full-time",
+                "job_posted_date": "2026-01-01T00:00:00.000Z",
+                "input": source,
+            }, "job_summary", size)
+            for i in range(settings.search_results)
+        ]
+    if "/in/" in url:
+        return [_padded({
+            "name": f"Person {n % 100000}",
+            "first_name": "Person",
+            "last_name": str(n % 100000),
+            "city": "Berlin",
+            "country_code": "DE",
+            "experience": [{"title": "Engineer", "company": f"Company {n % 997}", "start_date": "2020"}],
+            "certifications": [{"title": "Cloud Practitioner", "subtitle": "AWS", "credential_id": "x"}],
+            "followers": n % 5000,
+            "input": source,
+        }, "about", size)]
+    return [_padded({
+        "job_title": f"Software Engineer {n % 1000}",
+        "company_name": f"Company {n % 997}",
+        "job_location": "Remote",
+        "job_summary": f"Software engineering role at Company {n % 997}.",
+        "job_posted_date": "2026-01-01T00:00:00.000Z",
+        "input": source,
+    }, "job_description_formatted", size)]
+
+
+class FakeBrightData:
+    """
+    Asyncio HTTP server implementing the two dataset endpoints the client uses.
+
+    `POST /datasets/v3/trigger?dataset_id=...` takes a list of `{"url": ...}`
+    inputs and returns a snapshot id. `GET /datasets/v3/snapshot/{id}` returns
+    the snapshot status, or its records with `format=json` / `format=jsonl`
+    once ready. Latency, time to ready, failures, throttling and payload size
+    follow `settings`, and `stats` counts what the clients asked for.
+    """
+
+    def __init__(self, settings: FakeSettings | None = None, host: str = "127.0.0.1", port: int = 0):
+        self.settings = settings or FakeSettings()
+        self.host = host
+        self.port = port
+        self.snapshots: dict[str, Snapshot] = {}
+        self.stats: dict[str, int] = {}
+        self._random = random.Random(self.settings.seed)
+        self._ids = itertools.count(1)
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self.reset()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def reset(self) -> None:
+        """Forgets every snapshot and zeroes the counters."""
+        self.snapshots.clear()
+        self.stats = {"requests": 0, "triggers": 0, "status": 0, "downloads": 0, "throttled": 0, "errors": 0}
+
+    def requests_per_snapshot(self) -> float:
+        """Average number of requests (trigger, polls, downloads, 429s) each snapshot took."""
+        if not self.snapshots:
+            return 0.0
+        return sum(snapshot.requests for snapshot in self.snapshots.values()) / len(self.snapshots)
+
+    def start(self) -> "FakeBrightData":
+        """Starts serving on a daemon thread; port 0 picks a free port."""
+        if self._thread is not None:
+            return self
+        started = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(started,), name="fake-brightdata", daemon=True)
+        self._thread.start()
+        started.wait()
+        return self
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "FakeBrightData":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _run(self, started: threading.Event) -> None:
+        loop = self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        server = loop.run_until_complete(asyncio.start_server(self._serve, self.host, self.port, backlog=1024))
+        self.port = server.sockets[0].getsockname()[1]
+        started.set()
+        try:
+            loop.run_forever()
+        finally:
+            server.close()
+            # Keep-alive connections would otherwise hold the loop open
+            tasks = asyncio.all_tasks(loop)
+            for task in tasks:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            loop.close()
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                status, extra, content_type, payload = await self.handle(method, target, headers, body)
+                head = [f"HTTP/1.1 {status.value} {status.phrase}", f"Content-Type: {content_type}", f"Content-Length: {len(payload)}"]
+                head += [f"{name}: {value}" for name, value in extra.items()]
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + payload)
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        except asyncio.CancelledError:
+            # Server shutting down with the connection still open
+            pass
+        finally:
+            writer.close()
+
+    async def handle(self, method: str, target: str, headers: dict[str, str], body: bytes) -> tuple[HTTPStatus, dict, str, bytes]:
+        """Answers one request, returning `(status, extra headers, content type, body)`."""
+        settings = self.settings
+        self.stats["requests"] += 1
+        delay = settings.latency + (self._random.uniform(0, settings.jitter) if settings.jitter else 0)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        parts = urlsplit(target)
+        query = {key: values[0] for key, values in parse_qs(parts.query).items()}
+        snapshot = None
+        if parts.path.startswith(SNAPSHOT_PATH):
+            snapshot = self.snapshots.get(parts.path[len(SNAPSHOT_PATH):])
+            if snapshot is not None:
+                snapshot.requests += 1
+
+        if not headers.get("authorization", "").startswith("Bearer "):
+            return self._error(HTTPStatus.UNAUTHORIZED, "Missing API token")
+        if settings.throttle_rate and self._random.random() < settings.throttle_rate:
+            self.stats["throttled"] += 1
+            status, extra, content_type, payload = self._error(HTTPStatus.TOO_MANY_REQUESTS, "Too many requests")
+            extra["Retry-After"] = f"{settings.retry_after:g}"
+            return status, extra, content_type, payload
+
+        if method == "POST" and parts.path == TRIGGER_PATH:
+            return self._trigger(query, body)
+        if method == "GET" and parts.path.startswith(SNAPSHOT_PATH):
+            if snapshot is None:
+                return self._error(HTTPStatus.NOT_FOUND, "Snapshot not found")
+            return self._snapshot(snapshot, query.get("format"))
+        return self._error(HTTPStatus.NOT_FOUND, f"No route for {method} {parts.path}")
+
+    def _trigger(self, query: dict, body: bytes):
+        if not query.get("dataset_id"):
+            return self._error(HTTPStatus.BAD_REQUEST, "dataset_id is required")
+        try:
+            inputs = json.loads(body or b"[]")
+        except ValueError:
+            return self._error(HTTPStatus.BAD_REQUEST, "Body is not JSON")
+        if not isinstance(inputs, list) or not all(isinstance(item, dict) and item.get("url") for item in inputs):
+            return self._error(HTTPStatus.BAD_REQUEST, "Body must be a list of {\"url\": ...} inputs")
+
+        self.stats["triggers"] += 1
+        snapshot_id = f"s_fake{next(self._ids):08x}"
+        self.snapshots[snapshot_id] = Snapshot(
+            snapshot_id,
+            query["dataset_id"],
+            inputs,
+            ready_at=time.monotonic() + self.settings.ready_after,
+            failed=self._random.random() < self.settings.failure_rate,
+        )
+        return self._json(HTTPStatus.OK, {"snapshot_id": snapshot_id})
+
+    def _snapshot(self, snapshot: Snapshot, fmt: str | None):
+        if time.monotonic() < snapshot.ready_at:
+            self.stats["status"] += 1
+            return self._json(HTTPStatus.ACCEPTED, {"status": "running", "message": "Snapshot is not ready yet, try again later"})
+        if snapshot.failed:
+            self.stats["status"] += 1
+            return self._json(HTTPStatus.OK, {"status": "failed", "error": "Collection failed"})
+        if fmt is None:
+            self.stats["status"] += 1
+            return self._json(HTTPStatus.OK, {"status": "ready", "snapshot_id": snapshot.snapshot_id})
+
+        self.stats["downloads"] += 1
+        if snapshot.records is None:
+            snapshot.records = [record for item in snapshot.inputs for record in fake_records(item["url"], self.settings)]
+        if fmt == "jsonl":
+            payload = "".join(json.dumps(record) + "\n" for record in snapshot.records).encode()
+            return HTTPStatus.OK, {}, "application/jsonl", payload
+        return self._json(HTTPStatus.OK, snapshot.records)
+
+    def _json(self, status: HTTPStatus, body) -> tuple[HTTPStatus, dict, str, bytes]:
+        return status, {}, "application/json", json.dumps(body).encode()
+
+    def _error(self, status: HTTPStatus, message: str) -> tuple[HTTPStatus, dict, str, bytes]:
+        self.stats["errors"] += 1
+        return self._json(status, {"error": message})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8788)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--ready-after", type=float, default=1.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--payload-bytes", type=int, default=2048)
+    parser.add_argument("--search-results", type=int, default=25)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    settings = FakeSettings(
+        latency=args.latency, jitter=args.jitter, ready_after=args.ready_after,
+        failure_rate=args.failure_rate, throttle_rate=args.throttle_rate, retry_after=args.retry_after,
+        payload_bytes=args.payload_bytes, search_results=args.search_results, seed=args.seed,
+    )
+    server = FakeBrightData(settings, args.host, args.port).start()
+    print(f"Fake Bright Data listening on {server.base_url}")
+    print(f"export BRIGHTDATA_BASE_URL={server.base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print(f"Stopping; served {server.stats}")
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,20 @@
-import os
-import time
-import requests
-from dotenv import load_dotenv
+from archive import ArchiveWriter
+from brightdata_async import SnapshotScheduler, get_scheduler
+from brightdata_batch import DEFAULT_CHUNK_SIZE, fetch_batch
+from brightdata_client import get_client, require_dataset_id
+from cache import async_cached_fetch, cached_batch, cached_fetch
+from config import load_env
+from job_dedup import NearDuplicateIndex
+from job_index import index_jobs
+from metrics import get_metrics
+from projection import project_job
 
-load_dotenv()
+load_env()
+
+def filter_job_data(data: dict) -> dict:
+    """Filters job listing data returning only the specifically requested fields."""
+    # See projection.JOB_SPEC for the fields kept
+    return project_job(data)
 
 def get_job_listing(job_url: str) -> dict:
     """
@@ -15,66 +26,81 @@ def get_job_listing(job_url: str) -> dict:
     Returns:
         dict: The job listing data.
     """
-    api_token = os.environ.get("BRIGHTDATA_API_TOKEN")
-    dataset_id = os.environ.get("BRIGHTDATA_JOB_DATASET_ID")
-    
-    if not api_token or not dataset_id:
-        raise ValueError("Missing Bright Data API credentials in environment variables.")
+    dataset_id = require_dataset_id("BRIGHTDATA_JOB_DATASET_ID")
+    client = get_client()
 
-    headers = {
-        "Authorization": f"Bearer {api_token}",
-        "Content-Type": "application/json",
-    }
+    def fetch() -> dict:
+        # Trigger, poll until ready, then download the result as JSON
+        data = client.collect(dataset_id, [{"url": job_url}], ready_field="job_title", dataset="job")
 
-    # 1) Trigger collection
-    trigger_url = f"https://api.brightdata.com/datasets/v3/trigger?dataset_id={dataset_id}"
-    payload = [{"url": job_url}]
-    
-    resp = requests.post(trigger_url, headers=headers, json=payload)
-    resp.raise_for_status()
-    snapshot_id = resp.json().get("snapshot_id")
-    
-    if not snapshot_id:
-        raise RuntimeError(f"Failed to get snapshot_id from response: {resp.json()}")
+        raw_job = data[0] if data else {}
+        with get_metrics().span("filter", dataset="job"):
+            job = filter_job_data(raw_job)
+        index_jobs([(job_url, job)])
+        return job
 
-    # 2) Poll until ready
-    status_url = f"https://api.brightdata.com/datasets/v3/snapshot/{snapshot_id}"
-    poll_interval = int(os.environ.get("BRIGHTDATA_POLL_INTERVAL", 5))
-    
-    while True:
-        status_resp = requests.get(status_url, headers=headers)
-        status_resp.raise_for_status()
-        info = status_resp.json()
-        status = info.get("status")
-
-        if status == "ready" or status is None and info.get("job_title"):
-            break
-        if status == "failed":
-            raise RuntimeError(f"Snapshot failed: {info}")
-
-        time.sleep(poll_interval)
-
-    # 3) Download result as JSON
-    download_url = f"{status_url}?format=json"
-    data_resp = requests.get(download_url, headers=headers)
-    data_resp.raise_for_status()
-    data = data_resp.json()
-    
-    raw_job = data[0] if data else {}
-    if not raw_job:
-        return {}
+    # Served from the result cache when fresh; concurrent callers share one scrape
+    return cached_fetch("job", job_url, fetch)
+
+async def async_get_job_listing(job_url: str, scheduler: SnapshotScheduler | None = None) -> dict:
+    """
+    Fetches a LinkedIn job listing without blocking the event loop.
+
+    Args:
+        job_url (str): The LinkedIn job posting URL.
+        scheduler (SnapshotScheduler): Shares polling with other pending fetches;
+            defaults to the scheduler of the running loop.
 
-    direct_fields = {
-        "job_title", "company_name", "job_location", "job_summary",
-        "job_seniority_level", "job_employment_type", "job_industries",
-        "job_base_pay_range", "job_description_formatted", "base_salary"
-    }
+    Returns:
+        dict: The job listing data, identical to `get_job_listing`.
+    """
+    dataset_id = require_dataset_id("BRIGHTDATA_JOB_DATASET_ID")
+    scheduler = scheduler or get_scheduler()
+
+    async def fetch() -> dict:
+        data = await scheduler.collect(dataset_id, [{"url": job_url}], ready_field="job_title", dataset="job")
 
-    keys_to_remove = [k for k in raw_job.keys() if k not in direct_fields]
-    for k in keys_to_remove:
-        raw_job.pop(k, None)
+        raw_job = data[0] if data else {}
+        with get_metrics().span("filter", dataset="job"):
+            job = filter_job_data(raw_job)
+        index_jobs([(job_url, job)])
+        return job
+
+    return await async_cached_fetch("job", job_url, fetch)
+
+def get_job_listings(
+    urls: list[str],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    stream: bool = False,
+    archive: ArchiveWriter | None = None,
+    dedup: NearDuplicateIndex | None = None,
+) -> dict[str, dict]:
+    """
+    Fetches many LinkedIn job listings, packing up to `chunk_size` URLs into each trigger.
+
+    Args:
+        urls (list[str]): The LinkedIn job posting URLs.
+        chunk_size (int): Maximum number of URLs per Bright Data trigger.
+        stream (bool): Download snapshots as JSON lines, filtering records as they arrive.
+        archive (ArchiveWriter): Also writes every listing fetched into this archive.
+        dedup (NearDuplicateIndex): Marks reposts of postings this index has
+            already seen with a "duplicate_of" key holding the original's URL.
+
+    Returns:
+        dict[str, dict]: Maps each URL to its filtered job listing, or to
+        `{"error": ..., "error_code": ...}` if that listing could not be fetched.
+    """
+    def fetch_many(misses: list[str]) -> dict[str, dict]:
+        jobs = fetch_batch(misses, "BRIGHTDATA_JOB_DATASET_ID", filter_job_data, chunk_size, "job_batch", stream)
+        index_jobs(jobs.items())
+        return jobs
 
-    return raw_job
+    jobs = cached_batch("job", urls, fetch_many)
+    if dedup is not None:
+        jobs = dedup.mark(jobs)
+    if archive is not None:
+        archive.add_many(jobs.items())
+    return jobs
 
 if __name__ == "__main__":
     import json
@@ -1,77 +1,22 @@
-import os
-import time
-import requests
-from dotenv import load_dotenv
+import json
+
+from archive import ArchiveWriter
+from brightdata_async import SnapshotScheduler, get_scheduler
+from brightdata_batch import DEFAULT_CHUNK_SIZE, fetch_batch
+from brightdata_client import get_client, require_dataset_id
+from cache import async_cached_fetch, cache_key, cached_batch, cached_fetch, get_cache
+from config import load_env
+from metrics import get_metrics
+from profile_changes import ProfileChange, ProfileChangeIndex, get_profile_changes
+from projection import project_profile
 
 # Load environment variables from .env file
-load_dotenv()
+load_env()
 
 def filter_profile_data(data: dict) -> dict:
     """Filters profile data returning only the specifically requested fields."""
-    if not data:
-        return {}
-
-    direct_fields = {
-        "name", "city", "country_code", "about", 
-        "educations_details", "languages", "recommendations", 
-        "current_company_name", "publications", "organizations", 
-        "honors_and_awards", "bio_links", "first_name", "last_name",
-        "education", "certifications", "projects", "experience"
-    }
-
-    # 1. Remove top-level keys not in our allowed list
-    keys_to_remove = [k for k in data.keys() if k not in direct_fields]
-    for k in keys_to_remove:
-        data.pop(k, None)
-            
-    # 2. Process education array (keep only first item, remove specific keys)
-    education = data.get("education", [])
-    if isinstance(education, list):
-        if len(education) > 0:
-            edu_first = education[0]
-            if isinstance(edu_first, dict):
-                for key in ["description", "description_html", "institute_logo_url"]:
-                    edu_first.pop(key, None)
-            data["education"] = [edu_first]
-        else:
-            data.pop("education", None)
-
-    # 3. Process certifications array
-    certifications = data.get("certifications", [])
-    if isinstance(certifications, list):
-        new_certs = []
-        for cert in certifications:
-            if isinstance(cert, dict):
-                for key in ["credential_url", "credential_id"]:
-                    cert.pop(key, None)
-                if "subtitle" in cert:
-                    cert["issuer"] = cert.pop("subtitle")
-                if "meta" in cert:
-                    cert["notes"] = cert.pop("meta")
-                new_certs.append(cert)
-        if new_certs:
-            data["certifications"] = new_certs
-        else:
-            data.pop("certifications", None)
-
-    # 4. Remove nulls ONLY from projects array
-    projects = data.get("projects", [])
-    if isinstance(projects, list):
-        new_projects = [p for p in projects if p is not None]
-        if new_projects:
-            data["projects"] = new_projects
-        else:
-            data.pop("projects", None)
-
-    # 5. Remove membership_number from organizations
-    orgs = data.get("organizations", [])
-    if isinstance(orgs, list):
-        for org in orgs:
-            if isinstance(org, dict):
-                org.pop("membership_number", None)
-    
-
-    return data
+    # See projection.PROFILE_SPEC for the fields kept and how nested lists are reshaped
+    return project_profile(data)
 
 def get_linkedin_profile(profile_url: str) -> dict:
     """
@@ -83,56 +28,105 @@ def get_linkedin_profile(profile_url: str) -> dict:
     Returns:
         dict: The profile data.
     """
-    api_token = os.environ.get("BRIGHTDATA_API_TOKEN")
-    dataset_id = os.environ.get("BRIGHTDATA_PROFILE_DATASET_ID")
-    
-    if not api_token or not dataset_id:
-        raise ValueError("Missing Bright Data API credentials in environment variables.")
+    dataset_id = require_dataset_id("BRIGHTDATA_PROFILE_DATASET_ID")
+    client = get_client()
 
-    headers = {
-        "Authorization": f"Bearer {api_token}",
-        "Content-Type": "application/json",
-    }
+    def fetch() -> dict:
+        # Trigger, poll until ready, then download the result as JSON
+        data = client.collect(dataset_id, [{"url": profile_url}], ready_field="name", dataset="profile")
 
-    # 1) Trigger collection
-    trigger_url = f"https://api.brightdata.com/datasets/v3/trigger?dataset_id={dataset_id}"
-    payload = [{"url": profile_url}]
-    
-    resp = requests.post(trigger_url, headers=headers, json=payload)
-    resp.raise_for_status()
-    snapshot_id = resp.json().get("snapshot_id")
+        raw_profile = data[0] if data else {}
+        with get_metrics().span("filter", dataset="profile"):
+            return filter_profile_data(raw_profile)
 
-    if not snapshot_id:
-        raise RuntimeError(f"Failed to get snapshot_id from response: {resp.json()}")
+    # Served from the result cache when fresh; concurrent callers share one scrape
+    return cached_fetch("profile", profile_url, fetch)
 
-    # 2) Poll until ready
-    status_url = f"https://api.brightdata.com/datasets/v3/snapshot/{snapshot_id}"
-    poll_interval = int(os.environ.get("BRIGHTDATA_POLL_INTERVAL", 5))
-    
-    while True:
-        status_resp = requests.get(status_url, headers=headers)
-        status_resp.raise_for_status()
-        info = status_resp.json()
-        status = info.get("status")
-
-        if status == "ready" or status is None and info.get("name"):
-            break
-        if status == "failed":
-            raise RuntimeError(f"Snapshot failed: {info}")
-
-        time.sleep(poll_interval)
-
-    # 3) Download result as JSON
-    download_url = f"{status_url}?format=json"
-    data_resp = requests.get(download_url, headers=headers)
-    data_resp.raise_for_status()
-    data = data_resp.json()
-    
-    raw_profile = data[0] if data else {}
-    return filter_profile_data(raw_profile)
+async def async_get_linkedin_profile(profile_url: str, scheduler: SnapshotScheduler | None = None) -> dict:
+    """
+    Fetches a LinkedIn profile without blocking the event loop.
+
+    Args:
+        profile_url (str): The LinkedIn profile URL.
+        scheduler (SnapshotScheduler): Shares polling with other pending fetches;
+            defaults to the scheduler of the running loop.
+
+    Returns:
+        dict: The profile data, identical to `get_linkedin_profile`.
+    """
+    dataset_id = require_dataset_id("BRIGHTDATA_PROFILE_DATASET_ID")
+    scheduler = scheduler or get_scheduler()
+
+    async def fetch() -> dict:
+        data = await scheduler.collect(dataset_id, [{"url": profile_url}], ready_field="name", dataset="profile")
+
+        raw_profile = data[0] if data else {}
+        with get_metrics().span("filter", dataset="profile"):
+            return filter_profile_data(raw_profile)
+
+    return await async_cached_fetch("profile", profile_url, fetch)
+
+def get_linkedin_profiles(
+    urls: list[str],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    stream: bool = False,
+    archive: ArchiveWriter | None = None,
+) -> dict[str, dict]:
+    """
+    Fetches many LinkedIn profiles, packing up to `chunk_size` URLs into each trigger.
+
+    Args:
+        urls (list[str]): The LinkedIn profile URLs.
+        chunk_size (int): Maximum number of URLs per Bright Data trigger.
+        stream (bool): Download snapshots as JSON lines, filtering records as they arrive.
+        archive (ArchiveWriter): Also writes every profile fetched into this archive.
+
+    Returns:
+        dict[str, dict]: Maps each URL to its filtered profile, or to
+        `{"error": ..., "error_code": ...}` if that profile could not be fetched.
+    """
+    profiles = cached_batch(
+        "profile",
+        urls,
+        lambda misses: fetch_batch(misses, "BRIGHTDATA_PROFILE_DATASET_ID", filter_profile_data, chunk_size, "profile_batch", stream),
+    )
+    if archive is not None:
+        archive.add_many(profiles.items())
+    return profiles
+
+def refresh_linkedin_profiles(
+    urls: list[str],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    stream: bool = False,
+    index: ProfileChangeIndex | None = None,
+) -> dict[str, ProfileChange]:
+    """
+    Re-scrapes LinkedIn profiles and reports which sections changed since they were last recorded.
+
+    The result cache is bypassed, then refreshed with the new profiles.
+    Subscribers of the change index are notified of each change.
+
+    Args:
+        urls (list[str]): The LinkedIn profile URLs.
+        chunk_size (int): Maximum number of URLs per Bright Data trigger.
+        stream (bool): Download snapshots as JSON lines, filtering records as they arrive.
+        index (ProfileChangeIndex): Defaults to the index at BRIGHTDATA_PROFILE_CHANGES_PATH.
+
+    Returns:
+        dict[str, ProfileChange]: The change of each profile fetched, falsy
+        when it did not change. Profiles that could not be fetched are left out.
+    """
+    if index is None:
+        index = get_profile_changes()
+    profiles = fetch_batch(urls, "BRIGHTDATA_PROFILE_DATASET_ID", filter_profile_data, chunk_size, "profile_batch", stream)
+    cache = get_cache()
+    if cache is not None:
+        for url, profile in profiles.items():
+            if profile and "error" not in profile:
+                cache.set("profile", cache_key("profile", url), profile)
+    return index.update(profiles.items())
 
 if __name__ == "__main__":
-    import json
     # Example usage
     user_slug = "ankita-sethi21"  # csabatothdev
     sample_url = f"https://www.linkedin.com/in/{user_slug}/"
@@ -0,0 +1,231 @@
+import os
+import random
+import re
+import threading
+import zlib
+from array import array
+from typing import Iterable, Iterator
+
+from config import load_env
+from seen_jobs import job_id
+
+load_env()
+
+DEFAULT_THRESHOLD = 0.8
+DEFAULT_PERMUTATIONS = 128
+SHINGLE_WORDS = 3
+# A Mersenne prime above every 31-bit shingle hash, so (a * x + b) stays within 64 bits
+_PRIME = (1 << 31) - 1
+# numpy (the "matching" extra) is imported by the first index; signatures are computed in pure Python without it
+_numpy = None
+
+_TAG = re.compile(r"<[^>]+>")
+_WORD = re.compile(r"[a-z0-9]+")
+# Legal-form suffixes that differ between reposts of one company's postings
+_COMPANY_SUFFIXES = {"inc", "llc", "ltd", "limited", "gmbh", "ag", "sa", "bv", "plc", "corp", "corporation", "co", "company"}
+
+
+def _load_numpy():
+    """Returns numpy, or None when it is not installed."""
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+        except ImportError:
+            numpy = False
+        _numpy = numpy
+    return _numpy or None
+
+
+def _words(text) -> list[str]:
+    return _WORD.findall(_TAG.sub(" ", text).lower()) if isinstance(text, str) else []
+
+
+def company_key(job: dict) -> str:
+    """The normalized company name; postings of different companies are never duplicates."""
+    words = _words(job.get("company_name"))
+    while words and words[-1] in _COMPANY_SUFFIXES:
+        words.pop()
+    return " ".join(words)
+
+
+def job_shingles(job: dict, size: int = SHINGLE_WORDS) -> set[int]:
+    """
+    Hashes of the word `size`-grams of a posting's summary and description,
+    plus the words of its title, which keeps short postings comparable.
+    """
+    words = _words(job.get("job_summary")) + _words(job.get("job_description_formatted"))
+    shingles = {" ".join(words[i:i + size]) for i in range(max(1, len(words) - size + 1))} if words else set()
+    shingles.update(f"title:{word}" for word in _words(job.get("job_title")))
+    return {zlib.crc32(shingle.encode()) % _PRIME for shingle in shingles}
+
+
+def lsh_bands(permutations: int, threshold: float) -> int:
+    """
+    Picks the number of LSH bands so that postings about as similar as
+    `threshold` are very likely to share a band: the band count whose
+    candidate threshold (1/bands) ** (1/rows) is closest to below it.
+    """
+    options = [b for b in range(1, permutations + 1) if permutations % b == 0]
+    below = [b for b in options if (1 / b) ** (b / permutations) <= threshold]
+    return min(below or options, key=lambda b: threshold - (1 / b) ** (b / permutations))
+
+
+class NearDuplicateIndex:
+    """
+    In-memory index of job postings that finds reposts with lightly edited text.
+
+    Each posting gets a MinHash signature over its shingles (see
+    `job_shingles`); signatures are split into bands and each band is
+    hashed into a bucket together with the normalized company name, so a
+    lookup only compares the posting with the few earlier ones it shares a
+    bucket with. Candidates are confirmed when their estimated Jaccard
+    similarity reaches `threshold`.
+
+    The index is incremental: only the first posting of each group of
+    near-duplicates is stored, as its canonical copy, at about
+    4 * `permutations` bytes plus one bucket entry per band. Adding a posting
+    again under its own URL (or another URL with the same posting id) is not
+    a duplicate.
+    """
+
+    def __init__(
+        self,
+        threshold: float | None = None,
+        permutations: int = DEFAULT_PERMUTATIONS,
+        bands: int | None = None,
+        seed: int = 1,
+    ):
+        self.threshold = threshold if threshold is not None else float(os.environ.get("BRIGHTDATA_DEDUP_THRESHOLD", DEFAULT_THRESHOLD))
+        self.permutations = permutations
+        self.bands = bands or lsh_bands(permutations, self.threshold)
+        if permutations % self.bands:
+            raise ValueError("permutations must be a multiple of bands")
+        self.rows = permutations // self.bands
+
+        rng = random.Random(seed)
+        self._a = [rng.randrange(1, _PRIME) for _ in range(permutations)]
+        self._b = [rng.randrange(0, _PRIME) for _ in range(permutations)]
+        self._np = _load_numpy()
+        if self._np is not None:
+            self._np_a = self._np.array(self._a, dtype=self._np.uint64)[:, None]
+            self._np_b = self._np.array(self._b, dtype=self._np.uint64)[:, None]
+
+        self._lock = threading.Lock()
+        self._signatures = array("I")
+        self._urls: list[str] = []
+        self._rows: dict[str, int] = {}
+        self._buckets: list[dict[int, int]] = [{} for _ in range(self.bands)]
+
+    def signature(self, job: dict) -> array | None:
+        """The MinHash signature of a posting, or None when it has no text to compare."""
+        shingles = job_shingles(job)
+        if not shingles:
+            return None
+        np = self._np
+        if np is not None:
+            values = np.fromiter(shingles, dtype=np.uint64, count=len(shingles))
+            return array("I", ((self._np_a * values + self._np_b) % _PRIME).min(axis=1).astype(np.uint32).tobytes())
+        return array("I", [min((a * x + b) % _PRIME for x in shingles) for a, b in zip(self._a, self._b)])
+
+    def _band_keys(self, company: str, signature: array) -> list[int]:
+        rows = self.rows
+        return [hash((company, signature[i * rows:(i + 1) * rows].tobytes())) for i in range(self.bands)]
+
+    def _similarity(self, row: int, signature: array) -> float:
+        stored = self._signatures[row * self.permutations:(row + 1) * self.permutations]
+        return sum(x == y for x, y in zip(stored, signature)) / self.permutations
+
+    def _match(self, keys: list[int], signature: array) -> tuple[int, float] | None:
+        best = None
+        compared = set()
+        for band, key in enumerate(keys):
+            row = self._buckets[band].get(key)
+            if row is not None and row not in compared:
+                compared.add(row)
+                similarity = self._similarity(row, signature)
+                if similarity >= self.threshold and (best is None or similarity > best[1]):
+                    best = (row, similarity)
+        return best
+
+    def find(self, job: dict) -> tuple[str, float] | None:
+        """Returns the URL of the stored posting `job` duplicates and their estimated similarity, or None."""
+        signature = self.signature(job)
+        if signature is None:
+            return None
+        keys = self._band_keys(company_key(job), signature)
+        with self._lock:
+            match = self._match(keys, signature)
+            return (self._urls[match[0]], match[1]) if match else None
+
+    def add(self, job: dict, url: str | None = None) -> str | None:
+        """
+        Adds a posting unless it duplicates one already stored.
+
+        Args:
+            job (dict): A filtered job listing.
+            url (str): Defaults to the job's "job_url".
+
+        Returns:
+            str | None: The URL of the canonical posting `job` duplicates, or
+            None if it is new (or is itself the canonical copy).
+        """
+        url = url or job.get("job_url")
+        key = job_id(url) if url else None
+        if key is not None and key in self._rows:
+            return None
+        signature = self.signature(job)
+        if signature is None:
+            return None
+        keys = self._band_keys(company_key(job), signature)
+        with self._lock:
+            if key is not None and key in self._rows:
+                return None
+            match = self._match(keys, signature)
+            if match is not None:
+                return self._urls[match[0]]
+            row = len(self._urls)
+            self._signatures.extend(signature)
+            self._urls.append(url or f"#{row}")
+            if key is not None:
+                self._rows[key] = row
+            for band, band_key in enumerate(keys):
+                self._buckets[band].setdefault(band_key, row)
+        return None
+
+    def iter_unique(self, jobs: Iterable[dict]) -> Iterator[dict]:
+        """Yields the postings that are not near-duplicates of ones already seen, adding them to the index."""
+        for job in jobs:
+            if self.add(job) is None:
+                yield job
+
+    def filter(self, jobs: Iterable[dict]) -> list[dict]:
+        """`iter_unique` as a list."""
+        return list(self.iter_unique(jobs))
+
+    def mark(self, jobs: dict[str, dict]) -> dict[str, dict]:
+        """
+        Marks near-duplicates in a `url -> job` batch result with a "duplicate_of"
+        key holding the canonical URL; errors and new postings are left as they are.
+        """
+        marked = {}
+        for url, job in jobs.items():
+            canonical = self.add(job, url) if job and "error" not in job else None
+            marked[url] = {**job, "duplicate_of": canonical} if canonical else job
+        return marked
+
+    def __len__(self) -> int:
+        return len(self._urls)
+
+
+_index: NearDuplicateIndex | None = None
+_index_lock = threading.Lock()
+
+
+def get_near_duplicates() -> NearDuplicateIndex:
+    """Returns the process-wide index, with the threshold from BRIGHTDATA_DEDUP_THRESHOLD."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = NearDuplicateIndex()
+        return _index
@@ -0,0 +1,268 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Iterable, Iterator
+
+from config import load_env
+from projection import project_search_job
+from seen_jobs import job_id
+
+load_env()
+
+DEFAULT_MAX_AGE = 7 * 24 * 3600
+DEFAULT_MIN_RESULTS = 10
+
+# Indexed text fields and their bm25 weights: a hit in the title counts most
+TEXT_FIELDS = {
+    "job_title": 10.0,
+    "company_name": 5.0,
+    "job_industries": 3.0,
+    "job_summary": 2.0,
+    "job_description_formatted": 1.0,
+}
+
+_TAG = re.compile(r"<[^>]+>")
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def _text(value) -> str:
+    if value is None:
+        return ""
+    if not isinstance(value, str):
+        value = json.dumps(value, ensure_ascii=False)
+    return _TAG.sub(" ", value)
+
+
+def match_query(keyword: str) -> str | None:
+    """
+    Turns a free-text keyword into an FTS5 query matching every word, with
+    the last word matched as a prefix ("python dev" finds "python developer").
+    """
+    tokens = _TOKEN.findall(keyword.lower())
+    if not tokens:
+        return None
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+class JobIndex:
+    """
+    Local full-text index over job listings already fetched.
+
+    Listings are keyed by LinkedIn job id, so fetching a posting again
+    replaces its entry. Text fields are indexed with SQLite FTS5 and ranked
+    with bm25; location, seniority level and employment type are plain
+    columns used as filters.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        columns = ", ".join(TEXT_FIELDS)
+        new_columns = ", ".join(f"new.{name}" for name in TEXT_FIELDS)
+        old_columns = ", ".join(f"old.{name}" for name in TEXT_FIELDS)
+        # External-content FTS table kept in step with `jobs` by triggers
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id INTEGER PRIMARY KEY, job_id TEXT NOT NULL UNIQUE, record TEXT NOT NULL,"
+            f" {', '.join(f'{name} TEXT' for name in TEXT_FIELDS)},"
+            " job_location TEXT, job_seniority_level TEXT, job_employment_type TEXT,"
+            " updated REAL NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS jobs_updated ON jobs (updated);"
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5({columns},"
+            " content='jobs', content_rowid='id', tokenize='unicode61 remove_diacritics 2');"
+            "CREATE TRIGGER IF NOT EXISTS jobs_ai AFTER INSERT ON jobs BEGIN"
+            f" INSERT INTO jobs_fts (rowid, {columns}) VALUES (new.id, {new_columns}); END;"
+            "CREATE TRIGGER IF NOT EXISTS jobs_ad AFTER DELETE ON jobs BEGIN"
+            f" INSERT INTO jobs_fts (jobs_fts, rowid, {columns}) VALUES ('delete', old.id, {old_columns}); END;"
+            "CREATE TRIGGER IF NOT EXISTS jobs_au AFTER UPDATE ON jobs BEGIN"
+            f" INSERT INTO jobs_fts (jobs_fts, rowid, {columns}) VALUES ('delete', old.id, {old_columns});"
+            f" INSERT INTO jobs_fts (rowid, {columns}) VALUES (new.id, {new_columns}); END;"
+        )
+
+    def add(self, job: dict, url: str | None = None) -> None:
+        """Indexes one listing; see `add_many`."""
+        self.add_many([(url, job)])
+
+    def add_many(self, jobs: Iterable[tuple[str | None, dict]]) -> int:
+        """
+        Indexes listings as `(url, job)` pairs, replacing earlier entries for
+        the same posting. The URL defaults to the job's "job_url"; listings
+        without either, or carrying an "error", are skipped.
+
+        Returns:
+            int: The number of listings indexed.
+        """
+        now = time.time()
+        rows = []
+        for url, job in jobs:
+            url = url or job.get("job_url")
+            if not url or not job or "error" in job:
+                continue
+            record = {**job, "job_url": job.get("job_url") or url}
+            rows.append((
+                job_id(url), json.dumps(record, ensure_ascii=False),
+                *(_text(job.get(name)) for name in TEXT_FIELDS),
+                job.get("job_location"), job.get("job_seniority_level"), job.get("job_employment_type"), now,
+            ))
+        if not rows:
+            return 0
+
+        columns = ", ".join(TEXT_FIELDS)
+        updates = ", ".join(f"{name} = excluded.{name}" for name in (
+            "record", *TEXT_FIELDS, "job_location", "job_seniority_level", "job_employment_type", "updated"
+        ))
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.executemany(
+                    f"INSERT INTO jobs (job_id, record, {columns}, job_location, job_seniority_level,"
+                    f" job_employment_type, updated) VALUES ({', '.join('?' * len(rows[0]))})"
+                    f" ON CONFLICT (job_id) DO UPDATE SET {updates}",
+                    rows,
+                )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return len(rows)
+
+    def search(
+        self,
+        keyword: str,
+        location: str | None = None,
+        seniority_level: str | None = None,
+        employment_type: str | None = None,
+        max_age: float | None = None,
+        limit: int | None = 25,
+    ) -> list[dict]:
+        """
+        Ranked keyword search over indexed listings.
+
+        Args:
+            keyword (str): Free-text query; every word must match.
+            location (str): Case-insensitive substring of `job_location`.
+            seniority_level (str): Exact `job_seniority_level`, any case.
+            employment_type (str): Exact `job_employment_type`, any case.
+            max_age (float): Ignore listings indexed more than this many seconds ago.
+            limit (int): Maximum number of results; None for every match.
+
+        Returns:
+            list[dict]: The best matching listings, shaped like `search_jobs` results.
+        """
+        query = match_query(keyword)
+        if query is None:
+            return []
+
+        where = ["jobs_fts MATCH ?"]
+        params: list = [query]
+        if location:
+            where.append("jobs.job_location LIKE ? ESCAPE '\\'")
+            params.append("%" + re.sub(r"([%_\\])", r"\\\1", location) + "%")
+        if seniority_level:
+            where.append("jobs.job_seniority_level = ? COLLATE NOCASE")
+            params.append(seniority_level)
+        if employment_type:
+            where.append("jobs.job_employment_type = ? COLLATE NOCASE")
+            params.append(employment_type)
+        if max_age is not None:
+            where.append("jobs.updated >= ?")
+            params.append(time.time() - max_age)
+
+        weights = ", ".join(str(weight) for weight in TEXT_FIELDS.values())
+        sql = (
+            "SELECT jobs.record FROM jobs_fts JOIN jobs ON jobs.id = jobs_fts.rowid"
+            f" WHERE {' AND '.join(where)} ORDER BY bm25(jobs_fts, {weights}) LIMIT ?"
+        )
+        with self._lock:
+            # A negative LIMIT means no limit in SQLite
+            rows = self._db.execute(sql, (*params, -1 if limit is None else limit)).fetchall()
+        return [project_search_job(json.loads(record)) for (record,) in rows]
+
+    def remove_older_than(self, seconds: float) -> int:
+        """Drops listings indexed more than `seconds` ago, returning how many were removed."""
+        with self._lock:
+            return self._db.execute("DELETE FROM jobs WHERE updated < ?", (time.time() - seconds,)).rowcount
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+_index: JobIndex | None = None
+_index_lock = threading.Lock()
+
+
+def get_job_index() -> JobIndex | None:
+    """Returns the index at BRIGHTDATA_JOB_INDEX_PATH, or None when indexing is not configured."""
+    global _index
+    path = os.environ.get("BRIGHTDATA_JOB_INDEX_PATH")
+    with _index_lock:
+        if not path:
+            return None
+        if _index is None or _index.path != path:
+            _index = JobIndex(path)
+        return _index
+
+
+def index_jobs(jobs: Iterable[tuple[str | None, dict]]) -> None:
+    """Adds `(url, job)` pairs to the configured index, if any."""
+    index = get_job_index()
+    if index is not None:
+        index.add_many(jobs)
+
+
+def indexed(jobs: Iterable[dict], batch_size: int = 500) -> Iterator[dict]:
+    """Passes streamed search results through, adding them to the configured index in batches."""
+    index = get_job_index()
+    if index is None:
+        yield from jobs
+        return
+    batch = []
+    try:
+        for job in jobs:
+            batch.append((None, job))
+            if len(batch) >= batch_size:
+                index.add_many(batch)
+                batch = []
+            yield job
+    finally:
+        index.add_many(batch)
+
+
+def search_index(keyword: str, min_results: int | None = None, **filters) -> list[dict] | None:
+    """
+    Answers a keyword search from the configured index.
+
+    Every fresh match is returned unless `filters` sets a `limit`, so the
+    answer has the same shape as a scrape of the search page.
+
+    Returns:
+        list[dict] | None: The matches, or None when no index is configured or
+        it holds fewer than `min_results` fresh matches
+        (BRIGHTDATA_JOB_INDEX_MIN_RESULTS), so the caller should scrape.
+    """
+    index = get_job_index()
+    if index is None:
+        return None
+    if min_results is None:
+        min_results = int(os.environ.get("BRIGHTDATA_JOB_INDEX_MIN_RESULTS", DEFAULT_MIN_RESULTS))
+    filters.setdefault("max_age", float(os.environ.get("BRIGHTDATA_JOB_INDEX_MAX_AGE", DEFAULT_MAX_AGE)))
+    filters.setdefault("limit", None)
+    results = index.search(keyword, **filters)
+    return results if len(results) >= max(min_results, 1) else None
@@ -1,10 +1,18 @@
-from composio import ComposioToolSet, App
-toolset = ComposioToolSet()
-for app in [App.PDF_API_IO, App.PDF_CO, App.API2PDF]:
-    print(f"=== {app.name} ===")
+from composio_cache import get_action_cache
+
+# Action names are cached (see PDF_ACTION_CACHE), so composio is only imported, and the toolset built, on a miss
+cache = get_action_cache()
+toolset = None
+for app_name in ["PDF_API_IO", "PDF_CO", "API2PDF"]:
+    print(f"=== {app_name} ===")
     try:
-        actions = toolset.get_actions(app=app)
-        for action in actions:
-            print(f"- {action.name}")
+        names = cache.get(f"actions:{app_name}")
+        if names is None:
+            from composio import App, ComposioToolSet
+            toolset = toolset or ComposioToolSet()
+            names = [action.name for action in toolset.get_actions(app=App[app_name])]
+            cache.set(f"actions:{app_name}", names)
+        for name in names:
+            print(f"- {name}")
     except Exception as e:
         print(f"Error: {e}")
@@ -1,6 +1,285 @@
-def main():
-    print("Hello from scrapbook!")
+"""
+scrapbook: bulk fetch LinkedIn profiles, job listings and job searches to JSON lines.
+
+    scrapbook fetch-profiles urls.txt -o profiles.jsonl --concurrency 8 --batch-size 100
+    scrapbook fetch-jobs - -o jobs.jsonl < job_urls.txt
+    scrapbook search keywords.txt -o searches.jsonl --output-chunk 100000
+
+Every output line is `{"kind", "url", "result"}` or, when that input failed,
+`{"kind", "url", "error", "error_code"}`; for searches `url` is the keyword
+and `result` the list of jobs. Each batch of keywords is searched with one
+trigger per --batch-size searches. Lines are written as results complete. Run the
+same command again to resume: inputs that already have a result are skipped
+and failed ones are retried, so a later line for an input supersedes earlier ones.
+
+With --archive, records are also added to a compact archive (see archive.py)
+for lookup by URL; search results are keyed by their job URL.
+"""
+import argparse
+import contextlib
+import glob
+import json
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Iterable, Iterator, TextIO
+
+from archive import ArchiveWriter
+from brightdata_batch import DEFAULT_CHUNK_SIZE
+from get_job_listing import get_job_listings
+from get_linkedin_profile import get_linkedin_profiles
+from job_index import search_index
+from search_jobs import SearchQuery, search_jobs_many
+
+DEFAULT_CONCURRENCY = 8
+
+
+def read_inputs(source: str) -> Iterator[str]:
+    """Yields the non-blank, non-comment lines of a file, or of stdin for "-"."""
+    stream = sys.stdin if source == "-" else open(source, encoding="utf-8")
+    try:
+        for line in stream:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                yield line
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+class JsonlOutput:
+    """
+    Appends result lines to a JSON lines file, or to numbered part files of
+    at most `chunk_records` lines each (`out.00000.jsonl`, `out.00001.jsonl`, ...).
+
+    On opening, existing output is scanned so a rerun can skip finished inputs;
+    a final line cut short by a crash is dropped.
+    """
+
+    def __init__(self, path: str, chunk_records: int = 0, stream: TextIO | None = None):
+        self.path = path
+        self.chunk_records = chunk_records
+        self.done: set[str] = set()
+        self._file: TextIO | None = stream
+        self._part = 0
+        self._lines = 0
+        if stream is None:
+            self._resume()
+
+    def _part_path(self, part: int) -> str:
+        if not self.chunk_records:
+            return self.path
+        root, ext = os.path.splitext(self.path)
+        return f"{root}.{part:05d}{ext or '.jsonl'}"
+
+    def _parts(self) -> list[str]:
+        if not self.chunk_records:
+            return [self.path] if os.path.exists(self.path) else []
+        root, ext = os.path.splitext(self.path)
+        return sorted(glob.glob(f"{glob.escape(root)}.[0-9][0-9][0-9][0-9][0-9]{ext or '.jsonl'}"))
+
+    def _resume(self) -> None:
+        parts = self._parts()
+        for path in parts:
+            lines = 0
+            with open(path, "rb+") as f:
+                end = 0
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    end += len(line)
+                    lines += 1
+                    try:
+                        row = json.loads(line)
+                    except ValueError:
+                        continue
+                    if "result" in row:
+                        self.done.add(row["url"])
+                f.truncate(end)
+            self._lines = lines
+        if parts:
+            self._part = len(parts) - 1
+
+    def write(self, row: dict) -> None:
+        if self.chunk_records and self._lines >= self.chunk_records:
+            self._file.close()
+            self._file = None
+            self._part += 1
+            self._lines = 0
+        if self._file is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = open(self._part_path(self._part), "a", encoding="utf-8")
+        self._file.write(json.dumps(row, ensure_ascii=False) + "\n")
+        self._lines += 1
+
+    def flush(self) -> None:
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self) -> None:
+        if self._file is not None and self._file is not sys.stdout:
+            self._file.close()
+        self._file = None
+
+
+def _rows(kind: str, results: dict) -> Iterator[dict]:
+    for url, result in results.items():
+        if isinstance(result, dict) and "error" in result:
+            yield {"kind": kind, "url": url, "error": result["error"], "error_code": result.get("error_code")}
+        else:
+            yield {"kind": kind, "url": url, "result": result}
+
+
+def run_pipeline(
+    kind: str,
+    inputs: Iterable[str],
+    fetch: Callable[[list[str]], dict],
+    output: JsonlOutput,
+    batch_size: int,
+    concurrency: int,
+    archive: ArchiveWriter | None = None,
+) -> dict[str, int]:
+    """
+    Fetches `inputs` in batches on `concurrency` threads, writing each batch as soon as it completes.
+
+    Inputs are read lazily and at most `concurrency` batches are in flight,
+    so arbitrarily long inputs can be streamed through. Results are also
+    added to `archive`, if given.
+
+    Returns:
+        dict[str, int]: Counts of "ok", "failed" and "skipped" inputs.
+    """
+    counts = {"ok": 0, "failed": 0, "skipped": 0}
+    seen: set[str] = set()
+
+    def todo() -> Iterator[str]:
+        for item in inputs:
+            if item in output.done or item in seen:
+                counts["skipped"] += 1
+                continue
+            seen.add(item)
+            yield item
+
+    def settle(future: Future, batch: list[str]) -> None:
+        try:
+            results = future.result()
+        except Exception as e:
+            results = {item: {"error": str(e), "error_code": "exception"} for item in batch}
+        for row in _rows(kind, results):
+            output.write(row)
+            counts["ok" if "result" in row else "failed"] += 1
+            if archive is not None and "result" in row:
+                if kind == "search":
+                    archive.add_many((None, job) for job in row["result"])
+                else:
+                    archive.add(row["url"], row["result"])
+        output.flush()
+
+    batches = chunked_iter(todo(), batch_size)
+    pending: dict[Future, list[str]] = {}
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="scrapbook") as pool:
+        for batch in batches:
+            pending[pool.submit(fetch, batch)] = batch
+            if len(pending) >= concurrency:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    settle(future, pending.pop(future))
+        while pending:
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                settle(future, pending.pop(future))
+    return counts
+
+
+def chunked_iter(items: Iterable[str], size: int) -> Iterator[list[str]]:
+    """Like `brightdata_batch.chunked`, for iterables that can't be sliced."""
+    batch: list[str] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _fetcher(kind: str, batch_size: int, stream: bool) -> Callable[[list[str]], dict]:
+    if kind == "profile":
+        return lambda urls: get_linkedin_profiles(urls, chunk_size=batch_size, stream=stream)
+    if kind == "job":
+        return lambda urls: get_job_listings(urls, chunk_size=batch_size, stream=stream)
+
+    def search_many(keywords: list[str]) -> dict:
+        # Keywords the job index can answer skip the scrape; the rest share triggers
+        results = {}
+        for keyword in keywords:
+            indexed_jobs = search_index(keyword)
+            if indexed_jobs is not None:
+                results[keyword] = indexed_jobs
+        remaining = [keyword for keyword in keywords if keyword not in results]
+        if remaining:
+            found = search_jobs_many(remaining, chunk_size=batch_size, stream=stream)
+            for keyword in remaining:
+                jobs = found[SearchQuery(keyword)]
+                # Every row is one keyword already, so the jobs don't need their "queries"
+                if isinstance(jobs, list):
+                    jobs = [{field: value for field, value in job.items() if field != "queries"} for job in jobs]
+                results[keyword] = jobs
+        return results
+    return search_many
+
+
+COMMANDS = {
+    "fetch-profiles": ("profile", "LinkedIn profile URLs"),
+    "fetch-jobs": ("job", "LinkedIn job posting URLs"),
+    "search": ("search", "job search keywords"),
+}
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="scrapbook", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    for name, (kind, what) in COMMANDS.items():
+        command = commands.add_parser(name, help=f"Fetch {what} read from a file or stdin")
+        command.add_argument("input", nargs="?", default="-", help=f"File of {what}, one per line (default: stdin)")
+        command.add_argument("-o", "--output", default="-", help="JSON lines output file (default: stdout, no resume)")
+        command.add_argument("-c", "--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Batches fetched at once")
+        command.add_argument(
+            "-b", "--batch-size", type=int, default=DEFAULT_CHUNK_SIZE,
+            help="Inputs per batch, also the most packed into one trigger",
+        )
+        command.add_argument("--output-chunk", type=int, default=0, help="Start a new numbered output file every N lines")
+        command.add_argument("--archive", help="Also add the records to this archive directory")
+        command.add_argument("--stream", action="store_true", help="Download snapshots as JSON lines")
+
+    args = parser.parse_args(argv)
+    kind, _ = COMMANDS[args.command]
+    if args.concurrency < 1 or args.batch_size < 1:
+        parser.error("--concurrency and --batch-size must be at least 1")
+
+    if args.output == "-":
+        output = JsonlOutput("-", stream=sys.stdout)
+    else:
+        output = JsonlOutput(args.output, args.output_chunk)
+        if output.done:
+            print(f"Resuming: {len(output.done)} input(s) already in {args.output}", file=sys.stderr)
+
+    fetch = _fetcher(kind, args.batch_size, args.stream)
+    archive = ArchiveWriter(args.archive) if args.archive else None
+    try:
+        # The fetchers report progress on stdout, which may be carrying the results
+        with contextlib.redirect_stdout(sys.stderr):
+            counts = run_pipeline(kind, read_inputs(args.input), fetch, output, args.batch_size, args.concurrency, archive)
+    finally:
+        output.close()
+        if archive is not None:
+            archive.close()
+
+    print(f"Done: {counts['ok']} ok, {counts['failed']} failed, {counts['skipped']} skipped", file=sys.stderr)
+    return 1 if counts["failed"] else 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
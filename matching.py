@@ -0,0 +1,284 @@
+import json
+import math
+import os
+import re
+import zlib
+from collections import Counter
+from typing import Iterable
+
+from seen_jobs import job_id
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:  # Installed with the "matching" extra
+    np = sparse = None
+
+DEFAULT_FEATURES = 2 ** 20
+# Tokens whose bucket is memoized; the memo starts over when it fills, so a long-lived matcher stays bounded
+BUCKET_MEMO_SIZE = 2 ** 18
+
+# Each score compares one profile field with one job field; the total is the weighted sum
+FIELD_PAIRS = {
+    "title": ("titles", "title"),
+    "skills": ("skills", "description"),
+    "highlights": ("highlights", "description"),
+}
+DEFAULT_WEIGHTS = {"title": 0.3, "skills": 0.3, "highlights": 0.4}
+JOB_FIELDS = ("title", "description")
+
+_TAG = re.compile(r"<[^>]+>")
+# Keeps tokens like "c++", "c#" and "node.js" whole
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+
+
+def _join(*parts) -> str:
+    texts = []
+    for part in parts:
+        if isinstance(part, str):
+            texts.append(part)
+        elif isinstance(part, list):
+            texts.extend(item for item in part if isinstance(item, str))
+    return " ".join(texts)
+
+
+def _items(value) -> list[dict]:
+    return [item for item in value if isinstance(item, dict)] if isinstance(value, list) else []
+
+
+def profile_text(profile: dict) -> dict[str, str]:
+    """
+    Splits a profile into the text fields used for matching.
+
+    Titles come from `experience`; skills from an optional `skills` list plus
+    certification and project titles; highlights from experience highlights,
+    `about` and project descriptions.
+    """
+    experience = _items(profile.get("experience"))
+    projects = _items(profile.get("projects"))
+    return {
+        "titles": _join([item.get("title") for item in experience], profile.get("position")),
+        "skills": _join(
+            profile.get("skills"),
+            [item.get("title") for item in _items(profile.get("certifications"))],
+            [item.get("title") for item in projects],
+        ),
+        "highlights": _join(
+            [highlight for item in experience for highlight in item.get("highlights") or []],
+            profile.get("about"),
+            [item.get("description") for item in projects],
+        ),
+    }
+
+
+def job_text(job: dict) -> dict[str, str]:
+    """Splits a job listing into the text fields used for matching."""
+    return {
+        "title": _join(job.get("job_title")),
+        "description": _TAG.sub(" ", _join(
+            job.get("job_summary"), job.get("job_description_formatted"), job.get("job_industries"),
+        )),
+    }
+
+
+class JobMatcher:
+    """
+    Ranks job listings against a profile using hashed bag-of-words vectors.
+
+    Jobs are vectorized once, when added, into sparse term-frequency
+    matrices (one per job field). IDF weights come from the document
+    frequencies of all added jobs and are applied at query time, so adding
+    jobs never re-vectorizes earlier ones. Ranking a profile is one sparse
+    matrix-vector product per field followed by a partial sort.
+    """
+
+    def __init__(self, n_features: int = DEFAULT_FEATURES, weights: dict[str, float] | None = None):
+        if np is None:
+            raise ImportError('Job matching needs numpy and scipy: pip install "scrapbook[matching]"')
+        if n_features & (n_features - 1):
+            raise ValueError("n_features must be a power of two")
+        self.n_features = n_features
+        self.weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+
+        self.jobs: list[dict] = []
+        self._rows: dict[str, int] = {}
+        self._active = np.zeros(0, dtype=bool)
+        self._batches: dict[str, list] = {field: [] for field in JOB_FIELDS}
+        self._df = {field: np.zeros(n_features, dtype=np.int64) for field in JOB_FIELDS}
+        self._buckets: dict[str, int] = {}
+        self._stale = True
+
+    def _bucket(self, token: str) -> int:
+        if len(self._buckets) >= BUCKET_MEMO_SIZE:
+            self._buckets.clear()
+        bucket = self._buckets[token] = zlib.crc32(token.encode()) & (self.n_features - 1)
+        return bucket
+
+    def _vectorize(self, texts: list[str]):
+        """Sublinear term frequencies (1 + log count) of each text, one row per text."""
+        buckets = self._buckets
+        bucket = self._bucket
+        indptr, indices, data = [0], [], []
+        for text in texts:
+            counts = Counter(_TOKEN.findall(text.lower()))
+            indices += [buckets[token] if token in buckets else bucket(token) for token in counts]
+            data += counts.values()
+            indptr.append(len(indices))
+        matrix = sparse.csr_matrix(
+            (np.asarray(data, dtype=np.float32), np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int64)),
+            shape=(len(texts), self.n_features),
+        )
+        # Tokens sharing a bucket are summed before the log is taken
+        matrix.sum_duplicates()
+        np.log(matrix.data, out=matrix.data)
+        matrix.data += 1.0
+        return matrix
+
+    def add_jobs(self, jobs: Iterable[tuple[str | None, dict]]) -> int:
+        """
+        Vectorizes `(url, job)` pairs and adds them to the matcher. The URL
+        defaults to the job's "job_url"; adding a posting again replaces it.
+
+        Returns:
+            int: The number of jobs added.
+        """
+        batch = []
+        for url, job in jobs:
+            url = url or job.get("job_url")
+            if not url or not job or "error" in job:
+                continue
+            batch.append((job_id(url), {**job, "job_url": job.get("job_url") or url}))
+        if not batch:
+            return 0
+        # A posting listed twice in one batch keeps its last copy
+        batch = list(dict(batch).items())
+
+        start = len(self.jobs)
+        replaced = [self._rows[key] for key, _ in batch if key in self._rows]
+        texts = [job_text(job) for _, job in batch]
+        for field in JOB_FIELDS:
+            matrix = self._vectorize([text[field] for text in texts])
+            self._batches[field].append(matrix)
+            self._df[field] += np.bincount(matrix.indices, minlength=self.n_features)
+            if replaced:
+                old = self._matrix(field)[replaced]
+                self._df[field] -= np.bincount(old.indices, minlength=self.n_features)
+
+        active = np.ones(len(batch), dtype=bool)
+        self._active = np.concatenate([self._active, active])
+        self._active[replaced] = False
+        for offset, (key, job) in enumerate(batch):
+            self._rows[key] = start + offset
+            self.jobs.append(job)
+        self._stale = True
+        return len(batch)
+
+    def _matrix(self, field: str):
+        batches = self._batches[field]
+        if len(batches) > 1:
+            batches[:] = [sparse.vstack(batches, format="csr")]
+        return batches[0]
+
+    def _prepare(self) -> None:
+        # IDF and the job norms under it change whenever jobs are added
+        count = int(self._active.sum())
+        self._idf2, self._norms = {}, {}
+        for field in JOB_FIELDS:
+            idf = np.log((1 + count) / (1 + self._df[field])) + 1.0
+            idf2 = (idf * idf).astype(np.float32)
+            matrix = self._matrix(field)
+            norms = np.sqrt(matrix.multiply(matrix) @ idf2)
+            norms[norms == 0] = 1.0
+            self._idf2[field], self._norms[field] = idf2, norms
+        self._stale = False
+
+    def score(self, profile: dict) -> dict[str, "np.ndarray"]:
+        """
+        Scores a profile against every job.
+
+        Returns:
+            dict[str, np.ndarray]: The cosine similarity of each field pair
+            for every job (0 for replaced jobs), plus the weighted "total".
+        """
+        if self._stale:
+            self._prepare()
+        texts = profile_text(profile)
+        total = np.zeros(len(self.jobs), dtype=np.float32)
+        scores = {}
+        for name, (profile_field, job_field) in FIELD_PAIRS.items():
+            vector = self._vectorize([texts[profile_field]])
+            buckets, tf = vector.indices, vector.data
+            # The profile side carries both IDF factors so jobs stay raw term frequencies
+            weighted = tf * self._idf2[job_field][buckets]
+            norm = math.sqrt(float(weighted @ tf)) or 1.0
+            query = np.zeros(self.n_features, dtype=np.float32)
+            query[buckets] = weighted
+            field_scores = self._matrix(job_field) @ query
+            field_scores /= self._norms[job_field] * norm
+            field_scores[~self._active] = 0.0
+            scores[name] = field_scores
+            total += self.weights.get(name, 0.0) * field_scores
+        scores["total"] = total
+        return scores
+
+    def rank(self, profile: dict, k: int = 10) -> list[dict]:
+        """
+        Returns the `k` best matching jobs for a profile.
+
+        Returns:
+            list[dict]: Best first, each `{"job": ..., "score": ..., "breakdown": {...}}`
+            where the breakdown holds the unweighted score of each field pair.
+        """
+        if not self.jobs:
+            return []
+        scores = self.score(profile)
+        total = scores["total"]
+        k = min(k, int(self._active.sum()))
+        if k <= 0:
+            return []
+        top = np.argpartition(-total, k - 1)[:k]
+        top = top[np.argsort(-total[top], kind="stable")]
+        return [
+            {
+                "job": self.jobs[i],
+                "score": float(total[i]),
+                "breakdown": {name: float(scores[name][i]) for name in FIELD_PAIRS},
+            }
+            for i in top
+        ]
+
+    def __len__(self) -> int:
+        return int(self._active.sum())
+
+    def save(self, path: str) -> None:
+        """Saves the vectors and jobs to `path` (a directory) so they needn't be recomputed."""
+        os.makedirs(path, exist_ok=True)
+        arrays = {"active": self._active}
+        for field in JOB_FIELDS:
+            matrix = self._matrix(field) if self._batches[field] else self._vectorize([])
+            arrays.update({
+                f"{field}_data": matrix.data, f"{field}_indices": matrix.indices,
+                f"{field}_indptr": matrix.indptr, f"{field}_df": self._df[field],
+            })
+        np.savez(os.path.join(path, "vectors.npz"), **arrays)
+        with open(os.path.join(path, "jobs.json"), "w") as f:
+            json.dump({"n_features": self.n_features, "weights": self.weights, "jobs": self.jobs}, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path: str) -> "JobMatcher":
+        with open(os.path.join(path, "jobs.json")) as f:
+            meta = json.load(f)
+        matcher = cls(meta["n_features"], meta["weights"])
+        with np.load(os.path.join(path, "vectors.npz")) as arrays:
+            matcher._active = arrays["active"]
+            for field in JOB_FIELDS:
+                matcher._batches[field] = [sparse.csr_matrix(
+                    (arrays[f"{field}_data"], arrays[f"{field}_indices"], arrays[f"{field}_indptr"]),
+                    shape=(len(meta["jobs"]), matcher.n_features),
+                )]
+                matcher._df[field] = arrays[f"{field}_df"]
+        matcher.jobs = meta["jobs"]
+        for row, job in enumerate(matcher.jobs):
+            if matcher._active[row]:
+                matcher._rows[job_id(job["job_url"])] = row
+        return matcher
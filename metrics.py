@@ -0,0 +1,230 @@
+import atexit
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, TextIO
+
+from config import load_env
+
+load_env()
+
+# Upper bounds of the histogram buckets, by metric; timings use TIME_BUCKETS
+TIME_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+BUCKETS = {
+    "brightdata_response_bytes": (1e3, 1e4, 1e5, 1e6, 1e7, 1e8, 1e9),
+    "brightdata_polls_per_snapshot": (1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144),
+    "brightdata_records_per_download": (1, 10, 100, 1000, 10000, 100000),
+}
+HELP = {
+    "brightdata_phase_seconds": "Time spent in each phase of a fetch (trigger, poll, wait, download, parse, filter).",
+    "brightdata_requests_total": "Bright Data API requests by phase and HTTP status (0 for connection errors).",
+    "brightdata_retries_total": "Bright Data API requests retried after a connection error or 5xx.",
+    "brightdata_response_bytes": "Response body size of Bright Data API requests.",
+    "brightdata_records_total": "Records downloaded from snapshots.",
+    "brightdata_unattributed_records_total": "Records of multi-search snapshots dropped because their input URL matched no search.",
+    "brightdata_records_per_download": "Records in each downloaded snapshot.",
+    "brightdata_polls_per_snapshot": "Status polls needed before a snapshot was ready.",
+}
+
+Labels = tuple[tuple[str, str], ...]
+
+
+def _labels(labels: dict) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items() if value is not None and value != ""))
+
+
+class _Histogram:
+    __slots__ = ("bounds", "counts", "count", "sum")
+
+    def __init__(self, bounds: tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+
+class Metrics:
+    """
+    In-process registry of fetch counters and histograms.
+
+    `span(phase)` times a block into `brightdata_phase_seconds{phase=...}`;
+    `count` and `observe` update counters and histograms. Hooks added with
+    `add_hook` receive every span as it finishes, as a dict with `phase`,
+    `seconds`, `labels`, `error` and `time`. The aggregates can be exported
+    in the Prometheus text format or as JSON lines.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: dict[tuple[str, Labels], float] = {}
+        self._histograms: dict[tuple[str, Labels], _Histogram] = {}
+        self._hooks: list[Callable[[dict], None]] = []
+
+    def add_hook(self, hook: Callable[[dict], None]) -> None:
+        self._hooks.append(hook)
+
+    def remove_hook(self, hook: Callable[[dict], None]) -> None:
+        if hook in self._hooks:
+            self._hooks.remove(hook)
+
+    def count(self, name: str, value: float = 1, **labels) -> None:
+        key = (name, _labels(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        key = (name, _labels(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram(BUCKETS.get(name, TIME_BUCKETS))
+            histogram.observe(value)
+
+    def record(self, phase: str, seconds: float, error: str | None = None, **labels) -> None:
+        """Records a finished span and passes it to the hooks."""
+        self.observe("brightdata_phase_seconds", seconds, phase=phase, **labels)
+        if self._hooks:
+            event = {"phase": phase, "seconds": seconds, "labels": dict(_labels(labels)), "error": error, "time": time.time()}
+            for hook in list(self._hooks):
+                try:
+                    hook(event)
+                except Exception:
+                    # A broken hook must not fail the scrape
+                    pass
+
+    @contextmanager
+    def span(self, phase: str, **labels) -> Iterator[None]:
+        """Times the block as `phase`; exceptions are recorded by type and re-raised."""
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException as e:
+            self.record(phase, time.perf_counter() - start, error=type(e).__name__, **labels)
+            raise
+        self.record(phase, time.perf_counter() - start, **labels)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def snapshot(self) -> list[dict]:
+        """Returns every series as a dict: counters with `value`, histograms with `count`, `sum` and cumulative `buckets`."""
+        with self._lock:
+            series = [
+                {"name": name, "type": "counter", "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(self._counters.items())
+            ]
+            for (name, labels), histogram in sorted(self._histograms.items(), key=lambda item: item[0]):
+                cumulative, buckets = 0, {}
+                for bound, n in zip(histogram.bounds + (float("inf"),), histogram.counts):
+                    cumulative += n
+                    buckets["+Inf" if bound == float("inf") else f"{bound:g}"] = cumulative
+                series.append({
+                    "name": name, "type": "histogram", "labels": dict(labels),
+                    "count": histogram.count, "sum": histogram.sum, "buckets": buckets,
+                })
+        return series
+
+    def prometheus(self) -> str:
+        """Renders the aggregates in the Prometheus text exposition format."""
+        lines = []
+        described = set()
+        for series in self.snapshot():
+            name = series["name"]
+            if name not in described:
+                described.add(name)
+                if name in HELP:
+                    lines.append(f"# HELP {name} {HELP[name]}")
+                lines.append(f"# TYPE {name} {series['type']}")
+            labels = series["labels"]
+            if series["type"] == "counter":
+                lines.append(f"{name}{_format_labels(labels)} {series['value']:g}")
+                continue
+            for bound, n in series["buckets"].items():
+                lines.append(f"{name}_bucket{_format_labels({**labels, 'le': bound})} {n}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {series['sum']:g}")
+            lines.append(f"{name}_count{_format_labels(labels)} {series['count']}")
+        return "\n".join(lines) + "\n"
+
+    def write_jsonl(self, out: TextIO) -> None:
+        """Writes one JSON line per series, stamped with the current time."""
+        now = time.time()
+        for series in self.snapshot():
+            out.write(json.dumps({"time": now, **series}) + "\n")
+
+    def export(self, path: str) -> None:
+        """Writes the aggregates to `path`: JSON lines for `.jsonl`, else Prometheus text."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if path.endswith(".jsonl"):
+            with open(path, "a", encoding="utf-8") as f:
+                self.write_jsonl(f)
+            return
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.prometheus())
+        os.replace(tmp, path)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items()) + "}"
+
+
+class JsonlEventLog:
+    """Hook appending every span to a JSON lines file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def __call__(self, event: dict) -> None:
+        line = json.dumps(event) + "\n"
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+
+_metrics: Metrics | None = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> Metrics:
+    """
+    Returns the process-wide registry.
+
+    With BRIGHTDATA_METRICS_PATH set, the aggregates are written there when the
+    process exits (`.jsonl` for JSON lines, anything else for Prometheus text);
+    with BRIGHTDATA_METRICS_EVENTS set, every span is appended there as it happens.
+    """
+    global _metrics
+    if _metrics is not None:
+        return _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            metrics = Metrics()
+            events_path = os.environ.get("BRIGHTDATA_METRICS_EVENTS")
+            if events_path:
+                metrics.add_hook(JsonlEventLog(events_path))
+            export_path = os.environ.get("BRIGHTDATA_METRICS_PATH")
+            if export_path:
+                atexit.register(metrics.export, export_path)
+            _metrics = metrics
+        return _metrics
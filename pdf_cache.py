@@ -0,0 +1,141 @@
+import hashlib
+import json
+import mmap
+import os
+import threading
+
+from config import load_env
+
+load_env()
+
+DEFAULT_DIR = ".cache/pdf"
+DEFAULT_MAX_BYTES = 1024 ** 3
+# Files at least this large are memory-mapped instead of read into memory
+DEFAULT_MMAP_THRESHOLD = 1024 ** 2
+
+
+def pdf_cache_key(html: str | bytes, provider: str, settings: dict | None = None) -> str:
+    """Content address of a render: a hash of the HTML bytes, the provider and the page settings."""
+    digest = hashlib.sha256()
+    digest.update(html.encode("utf-8") if isinstance(html, str) else html)
+    digest.update(b"\0" + provider.encode())
+    digest.update(b"\0" + json.dumps(settings or {}, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+class PdfStore:
+    """
+    Content-addressed store of rendered PDFs on disk.
+
+    Files live under `directory` as `<key[:2]>/<key>.pdf`. A file's mtime
+    records when it was last used, and once the store grows past
+    `max_bytes` (PDF_CACHE_MAX_BYTES) the least recently used files are
+    removed until it is back under 90% of the limit.
+    """
+
+    def __init__(self, directory: str | None = None, max_bytes: int | None = None, mmap_threshold: int | None = None):
+        self.directory = directory or os.environ.get("PDF_CACHE_DIR", DEFAULT_DIR)
+        self.max_bytes = max_bytes or int(os.environ.get("PDF_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+        self.mmap_threshold = mmap_threshold if mmap_threshold is not None else DEFAULT_MMAP_THRESHOLD
+        os.makedirs(self.directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._size = sum(size for _, size, _ in self._files())
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.pdf")
+
+    def _files(self):
+        for entry in os.scandir(self.directory):
+            if entry.is_dir():
+                for file in os.scandir(entry.path):
+                    if file.name.endswith(".pdf"):
+                        stat = file.stat()
+                        yield file.path, stat.st_size, stat.st_mtime
+
+    def get(self, key: str) -> bytes | memoryview | None:
+        """
+        Returns the stored PDF, or None.
+
+        Large files come back as a read-only memoryview over a memory map, so
+        they can be written out or sent without being copied into memory.
+        """
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                if size and size >= self.mmap_threshold:
+                    data = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+                else:
+                    data = f.read()
+            # Mark as recently used for eviction
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return data
+
+    def put(self, key: str, data: bytes | memoryview) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        with self._lock:
+            try:
+                self._size -= os.path.getsize(path)
+            except FileNotFoundError:
+                pass
+            os.replace(tmp, path)
+            self._size += len(data)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        files = sorted(self._files(), key=lambda file: file[2])
+        total = sum(size for _, size, _ in files)
+        target = self.max_bytes * 0.9
+        for path, size, _ in files:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._size = total
+
+    def __contains__(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    @property
+    def size(self) -> int:
+        """Total bytes stored."""
+        return self._size
+
+
+def cached_render(store: PdfStore | None, html: str | bytes, provider: str, settings: dict | None, render) -> bytes | memoryview:
+    """Serves a render from `store` when the same HTML and settings were rendered before, else calls `render()`."""
+    if store is None:
+        return render()
+    key = pdf_cache_key(html, provider, settings)
+    hit = store.get(key)
+    if hit is not None:
+        return hit
+    pdf = render()
+    store.put(key, pdf)
+    return pdf
+
+
+_store: PdfStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_pdf_store() -> PdfStore | None:
+    """Returns the store at PDF_CACHE_DIR, or None when PDF caching is disabled (PDF_CACHE_DIR empty)."""
+    global _store
+    directory = os.environ.get("PDF_CACHE_DIR", DEFAULT_DIR)
+    with _store_lock:
+        if not directory:
+            return None
+        if _store is None or _store.directory != directory:
+            _store = PdfStore(directory)
+        return _store
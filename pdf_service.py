@@ -0,0 +1,452 @@
+import atexit
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable
+
+from composio_cache import ActionCache, get_action_cache
+from config import load_env
+from pdf_cache import PdfStore, cached_render, get_pdf_store
+
+load_env()
+
+# Composio apps offering an HTML -> PDF action, in default preference order
+DEFAULT_PROVIDERS = ("PDF_API_IO", "PDF_CO", "API2PDF")
+DEFAULT_TIMEOUT = 120
+DEFAULT_HEDGE_AFTER = 3.0
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_DOWNLOAD_TIMEOUT = 60
+# Seconds between writes of the provider stats file
+STATS_SAVE_INTERVAL = 5.0
+
+# Response keys holding the rendered file's URL (PDF.co: "url", API2PDF: "FileUrl")
+URL_KEYS = ("url", "FileUrl", "fileUrl", "file_url", "pdf_url", "download_url")
+
+# Parameter names the providers use for the HTML payload, most specific first
+HTML_PARAM_KEYS = ("html", "htmlCode", "source", "html_content", "content")
+
+
+class PdfRenderError(RuntimeError):
+    """Raised when every provider failed to convert the HTML."""
+
+    def __init__(self, errors: dict[str, str]):
+        self.errors = errors
+        super().__init__("All PDF providers failed: " + "; ".join(f"{name}: {error}" for name, error in errors.items()))
+
+
+def find_html_to_pdf_action(schemas: list[dict]) -> dict | None:
+    """Returns the first action schema whose name mentions both html and pdf."""
+    for schema in schemas:
+        name = schema.get("name", "").lower()
+        if "html" in name and "pdf" in name:
+            return schema
+    return None
+
+
+def param_mapping(schema: dict) -> dict:
+    """
+    Works out how to pass HTML to an action from its parameter schema.
+
+    Returns:
+        dict: `{"html_key": ..., "file_name_keys": [...]}`; the file name keys
+        receive a generated `<provider>.pdf` name.
+    """
+    props = (schema.get("parameters") or {}).get("properties") or {}
+    html_key = next((key for key in HTML_PARAM_KEYS if key in props), "html")
+    file_name_keys = [key for key in ("name", "fileName") if key in props] if html_key in props else []
+    return {"html_key": html_key, "file_name_keys": file_name_keys}
+
+
+def build_params(mapping: dict, html: str, provider: str, settings: dict | None = None) -> dict:
+    params = {mapping["html_key"]: html}
+    for key in mapping["file_name_keys"]:
+        params[key] = f"{provider.lower()}.pdf"
+    params.update(settings or {})
+    return params
+
+
+def pdf_url(response) -> str | None:
+    """Finds the rendered file's URL anywhere in a provider response."""
+    if isinstance(response, dict):
+        for key in URL_KEYS:
+            value = response.get(key)
+            if isinstance(value, str) and value.startswith(("http://", "https://")):
+                return value
+        values = response.values()
+    elif isinstance(response, list):
+        values = response
+    else:
+        return None
+    for value in values:
+        url = pdf_url(value)
+        if url:
+            return url
+    return None
+
+
+def download_pdf(url: str, timeout: float | None = None) -> bytes:
+    import requests
+
+    response = requests.get(url, timeout=timeout or float(os.environ.get("PDF_DOWNLOAD_TIMEOUT", DEFAULT_DOWNLOAD_TIMEOUT)))
+    response.raise_for_status()
+    return response.content
+
+
+def _app(provider: str):
+    """The Composio App for a provider name, or the name itself when composio is unavailable."""
+    try:
+        from composio import App
+    except ImportError:
+        return provider
+    return App[provider]
+
+
+def resolve_pdf_action(provider: str, get_toolset: Callable[[], object], cache: ActionCache | None = None) -> dict:
+    """
+    Finds a provider's HTML -> PDF action, served from the action cache when
+    possible so no toolset or schema discovery is needed.
+
+    Args:
+        provider (str): The Composio app name, e.g. "PDF_CO".
+        get_toolset (Callable): Returns the toolset; only called on a cache miss.
+        cache (ActionCache): Defaults to the cache at PDF_ACTION_CACHE.
+
+    Returns:
+        dict: `{"action": ..., "mapping": ..., "parameters": ...}`.
+
+    Raises:
+        LookupError: The app has no HTML -> PDF action.
+    """
+    cache = cache if cache is not None else get_action_cache()
+    key = f"pdf_action:{provider}"
+    entry = cache.get(key)
+    if entry is not None:
+        return entry
+
+    schemas = get_toolset().get_action_schemas(apps=[_app(provider)])
+    schema = find_html_to_pdf_action(schemas)
+    if schema is None:
+        raise LookupError(
+            f"{provider} has no HTML to PDF action; available: {[s.get('name') for s in schemas]}"
+        )
+    entry = {
+        "action": schema["name"],
+        "mapping": param_mapping(schema),
+        "parameters": schema.get("parameters") or {},
+    }
+    cache.set(key, entry)
+    return entry
+
+
+# Errors saying a cached action or its parameters are no longer valid
+# The SDK's errors for an action or parameter that no longer exists: its
+# ActionNotFound / EnumMetadataNotFound types and their messages
+_STALE_ACTION_TYPE = re.compile(r"^(Action|Enum\w*)NotFound")
+_STALE_ACTION = re.compile(
+    r"(unknown|invalid) action|invalid value for action|action\b.*\b(not found|does not exist)"
+    r"|(unknown|unexpected|invalid) (param|parameter|argument)\b|missing required (param|parameter|argument)",
+    re.IGNORECASE,
+)
+
+
+def is_stale_action_error(error: Exception) -> bool:
+    """
+    Tells whether an execute_action failure means the cached action should be
+    rediscovered: an action that no longer exists, or a parameter it no
+    longer takes or now requires. Timeouts, 5xx responses, rate limits,
+    network errors and other validation errors are not.
+    """
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return False
+    return bool(_STALE_ACTION_TYPE.match(type(error).__name__) or _STALE_ACTION.search(str(error)))
+
+
+def is_success(response) -> bool:
+    """Composio responses flag success as "successful" (older SDKs: "successfull")."""
+    if not isinstance(response, dict):
+        return False
+    ok = response.get("successful", response.get("successfull", True))
+    return bool(ok) and not response.get("error")
+
+
+@dataclass
+class PdfResult:
+    provider: str
+    action: str
+    response: dict
+    latency: float
+
+
+class ProviderStats:
+    """
+    Running latency and error rate per provider, used to order providers.
+
+    Both are exponentially weighted, so a provider that recovers is tried
+    first again soon. Stats are kept in a JSON file (PDF_PROVIDER_STATS) when
+    one is configured, written at most every `save_interval` seconds and on
+    `flush` (called by `PdfService.close` and at exit).
+    """
+
+    def __init__(
+        self,
+        path: str | None = None,
+        smoothing: float = 0.3,
+        default_latency: float = DEFAULT_HEDGE_AFTER,
+        save_interval: float = STATS_SAVE_INTERVAL,
+    ):
+        self.path = path if path is not None else os.environ.get("PDF_PROVIDER_STATS")
+        self.smoothing = smoothing
+        self.default_latency = default_latency
+        self.save_interval = save_interval
+        self._lock = threading.Lock()
+        self._saved_at = float("-inf")
+        self._dirty = False
+        self.stats: dict[str, dict[str, float]] = {}
+        if self.path and os.path.exists(self.path):
+            try:
+                with open(self.path) as f:
+                    self.stats = json.load(f)
+            except (OSError, ValueError):
+                self.stats = {}
+        if self.path:
+            atexit.register(self.flush)
+
+    def record(self, provider: str, latency: float, ok: bool) -> None:
+        with self._lock:
+            entry = self.stats.get(provider)
+            if entry is None:
+                entry = self.stats[provider] = {"latency": latency, "error_rate": 0.0 if ok else 1.0, "calls": 0}
+            else:
+                a = self.smoothing
+                # Failures often return fast; only successes say how long a render takes
+                if ok:
+                    entry["latency"] = (1 - a) * entry["latency"] + a * latency
+                entry["error_rate"] = (1 - a) * entry["error_rate"] + a * (0.0 if ok else 1.0)
+            entry["calls"] += 1
+            self._dirty = True
+            if time.monotonic() - self._saved_at >= self.save_interval:
+                self._save()
+
+    def flush(self) -> None:
+        """Writes the stats recorded since the last save."""
+        with self._lock:
+            if self._dirty:
+                self._save()
+
+    def latency(self, provider: str) -> float:
+        entry = self.stats.get(provider)
+        return entry["latency"] if entry else self.default_latency
+
+    def expected_cost(self, provider: str) -> float:
+        """Expected seconds until a success: latency times the expected number of attempts."""
+        entry = self.stats.get(provider)
+        if entry is None:
+            return self.default_latency
+        return entry["latency"] / max(1.0 - entry["error_rate"], 0.05)
+
+    def order(self, providers) -> list[str]:
+        """Providers sorted by expected cost; ties keep their given order."""
+        with self._lock:
+            return sorted(providers, key=self.expected_cost)
+
+    def _save(self) -> None:
+        if not self.path:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.stats, f)
+        os.replace(tmp, self.path)
+        self._saved_at = time.monotonic()
+        self._dirty = False
+
+
+class PdfService:
+    """
+    Converts HTML to PDF through Composio apps, racing them for latency.
+
+    The providers are ordered by their observed stats. The first starts
+    immediately; the next is started when the running ones fail or have
+    not answered within the hedge delay (`hedge_after`, by default 1.5x the
+    running provider's typical latency; 0 starts every provider at once).
+    The first successful response wins and the rest are ignored.
+    """
+
+    def __init__(
+        self,
+        toolset=None,
+        providers: tuple[str, ...] | list[str] | None = None,
+        stats: ProviderStats | None = None,
+        hedge_after: float | None = None,
+        timeout: float | None = None,
+        max_workers: int | None = None,
+        action_cache: ActionCache | None = None,
+        store: PdfStore | None = None,
+    ):
+        self._toolset = toolset
+        self.action_cache = action_cache if action_cache is not None else get_action_cache()
+        self.store = store if store is not None else get_pdf_store()
+        if providers is None:
+            env = os.environ.get("PDF_PROVIDERS")
+            providers = tuple(name.strip() for name in env.split(",") if name.strip()) if env else DEFAULT_PROVIDERS
+        self.providers = list(providers)
+        self.stats = stats or ProviderStats()
+        env_hedge = os.environ.get("PDF_HEDGE_AFTER")
+        self.hedge_after = hedge_after if hedge_after is not None else float(env_hedge) if env_hedge else None
+        self.timeout = timeout or float(os.environ.get("PDF_TIMEOUT", DEFAULT_TIMEOUT))
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or int(os.environ.get("PDF_MAX_WORKERS", DEFAULT_MAX_WORKERS)),
+            thread_name_prefix="pdf-provider",
+        )
+        self._actions: dict[str, tuple[str, dict]] = {}
+        self._actions_lock = threading.Lock()
+
+    @property
+    def toolset(self):
+        with self._actions_lock:
+            if self._toolset is None:
+                from composio import ComposioToolSet
+                self._toolset = ComposioToolSet()
+            return self._toolset
+
+    def resolve(self, provider: str) -> tuple[str, dict]:
+        """Finds a provider's HTML -> PDF action and parameter mapping."""
+        with self._actions_lock:
+            resolved = self._actions.get(provider)
+        if resolved is not None:
+            return resolved
+
+        entry = resolve_pdf_action(provider, lambda: self.toolset, self.action_cache)
+        resolved = (entry["action"], entry["mapping"])
+        with self._actions_lock:
+            self._actions[provider] = resolved
+        return resolved
+
+    def _call(self, provider: str, html: str, settings: dict | None) -> PdfResult:
+        start = time.monotonic()
+        try:
+            action, mapping = self.resolve(provider)
+            try:
+                response = self.toolset.execute_action(action=action, params=build_params(mapping, html, provider, settings))
+            except Exception as e:
+                # The action may have been renamed or its parameters changed; rediscover it next time.
+                # Transient failures keep the cache, so an outage doesn't force schema discovery again
+                if is_stale_action_error(e):
+                    with self._actions_lock:
+                        self._actions.pop(provider, None)
+                    self.action_cache.invalidate(f"pdf_action:{provider}")
+                raise
+            if not is_success(response):
+                raise RuntimeError((response or {}).get("error") or "unsuccessful response")
+        except Exception:
+            self.stats.record(provider, time.monotonic() - start, ok=False)
+            raise
+        latency = time.monotonic() - start
+        self.stats.record(provider, latency, ok=True)
+        return PdfResult(provider, action, response, latency)
+
+    def _hedge_delay(self, provider: str) -> float:
+        if self.hedge_after is not None:
+            return self.hedge_after
+        return 1.5 * self.stats.latency(provider)
+
+    def convert(self, html: str, settings: dict | None = None) -> PdfResult:
+        """
+        Converts HTML to PDF with whichever provider answers successfully first.
+
+        Args:
+            html (str): The document.
+            settings (dict): Page settings passed to the provider as extra parameters.
+
+        Returns:
+            PdfResult: The winning provider, its action and raw response.
+
+        Raises:
+            PdfRenderError: Every provider failed.
+            TimeoutError: No provider succeeded within the timeout.
+        """
+        pending_providers = self.stats.order(self.providers)
+        running: dict[Future, str] = {}
+        errors: dict[str, str] = {}
+        deadline = time.monotonic() + self.timeout
+        next_start = time.monotonic()
+
+        while pending_providers or running:
+            now = time.monotonic()
+            # Start the next provider when nothing is running or the hedge delay has passed
+            if pending_providers and (not running or now >= next_start):
+                provider = pending_providers.pop(0)
+                running[self._executor.submit(self._call, provider, html, settings)] = provider
+                next_start = now + self._hedge_delay(provider)
+                if self.hedge_after == 0:
+                    continue
+
+            if now >= deadline:
+                break
+            wake = deadline if not pending_providers else min(deadline, next_start)
+            done, _ = wait(list(running), timeout=max(0.0, wake - time.monotonic()), return_when=FIRST_COMPLETED)
+            for future in done:
+                provider = running.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    errors[provider] = str(e)
+                    # Don't wait out the hedge delay after a failure
+                    next_start = time.monotonic()
+                    continue
+                for other in running:
+                    other.cancel()
+                return result
+
+        for future in running:
+            future.cancel()
+        if running or not errors:
+            raise TimeoutError(f"No PDF provider succeeded within {self.timeout:.0f}s")
+        raise PdfRenderError(errors)
+
+    def render(self, html: str, settings: dict | None = None) -> bytes | memoryview:
+        """
+        Returns the PDF bytes for HTML, converting and downloading it only when
+        the same HTML and settings have not been rendered before.
+
+        Returns:
+            bytes | memoryview: The PDF; large cached files come back memory-mapped.
+        """
+        def convert_and_download() -> bytes:
+            result = self.convert(html, settings)
+            url = pdf_url(result.response)
+            if url is None:
+                raise PdfRenderError({result.provider: "response has no file URL"})
+            return download_pdf(url)
+
+        # Any configured provider may win the race, so the key covers all of them
+        provider = "composio:" + ",".join(sorted(self.providers))
+        return cached_render(self.store, html, provider, settings, convert_and_download)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.stats.flush()
+
+
+_service: PdfService | None = None
+_service_lock = threading.Lock()
+
+
+def get_pdf_service() -> PdfService:
+    """Returns the process-wide service, using the Composio toolset from the environment."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = PdfService()
+        return _service
+
+
+def html_to_pdf_remote(html: str, settings: dict | None = None) -> bytes | memoryview:
+    """Converts HTML to PDF through the fastest available Composio provider, reusing earlier renders."""
+    return get_pdf_service().render(html, settings)
@@ -0,0 +1,219 @@
+import json
+import os
+import threading
+import time
+
+from config import load_env
+from metrics import get_metrics
+
+load_env()
+
+DEFAULT_DEADLINE = 1800
+
+
+class PollTimeoutError(TimeoutError):
+    """Raised when a snapshot is still not ready once the polling deadline has passed."""
+
+
+class PollStrategy:
+    """
+    Decides how long to wait between status polls.
+
+    Subclasses implement `interval`; `start` hands out a `PollTimer` that
+    tracks one snapshot against the overall deadline.
+    """
+
+    def __init__(self, deadline: float | None = None):
+        self.deadline = deadline if deadline is not None else float(os.environ.get("BRIGHTDATA_POLL_DEADLINE", DEFAULT_DEADLINE))
+
+    def interval(self, dataset: str, attempt: int, elapsed: float) -> float:
+        raise NotImplementedError
+
+    def record(self, dataset: str, duration: float) -> None:
+        """Called with the time a snapshot took to become ready."""
+
+    def start(self, dataset: str, snapshot_id: str = "") -> "PollTimer":
+        return PollTimer(self, dataset, snapshot_id)
+
+
+class PollTimer:
+    """Polling state for a single snapshot."""
+
+    def __init__(self, strategy: PollStrategy, dataset: str, snapshot_id: str = ""):
+        self.strategy = strategy
+        self.dataset = dataset
+        self.snapshot_id = snapshot_id
+        self.started = time.monotonic()
+        self.attempt = 0
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def next_delay(self) -> float:
+        """
+        Returns how long to sleep before the next poll.
+
+        Raises:
+            PollTimeoutError: If the deadline has passed.
+        """
+        elapsed = self.elapsed
+        remaining = self.strategy.deadline - elapsed
+        if remaining <= 0:
+            raise PollTimeoutError(
+                f"Snapshot {self.snapshot_id or '(unknown)'} not ready after {elapsed:.0f}s "
+                f"({self.attempt} polls, deadline {self.strategy.deadline:.0f}s)"
+            )
+        delay = self.strategy.interval(self.dataset, self.attempt, elapsed)
+        self.attempt += 1
+        return max(0.0, min(delay, remaining))
+
+    def done(self) -> None:
+        """Called once the snapshot is ready; records how long it took and how many polls it needed."""
+        elapsed = self.elapsed
+        self.strategy.record(self.dataset, elapsed)
+        metrics = get_metrics()
+        metrics.record("wait", elapsed, dataset=self.dataset)
+        metrics.observe("brightdata_polls_per_snapshot", self.attempt + 1, dataset=self.dataset)
+
+
+class FixedPolling(PollStrategy):
+    """Polls every `interval` seconds."""
+
+    def __init__(self, interval: float, deadline: float | None = None):
+        super().__init__(deadline)
+        self.fixed_interval = interval
+
+    def interval(self, dataset: str, attempt: int, elapsed: float) -> float:
+        return self.fixed_interval
+
+    def __str__(self) -> str:
+        return f"every {self.fixed_interval:g}s"
+
+
+class ExponentialBackoff(PollStrategy):
+    """Starts polling quickly and backs off by `factor` up to `cap` seconds."""
+
+    def __init__(self, initial: float = 1.0, factor: float = 2.0, cap: float = 15.0, deadline: float | None = None):
+        super().__init__(deadline)
+        self.initial = initial
+        self.factor = factor
+        self.cap = cap
+
+    def interval(self, dataset: str, attempt: int, elapsed: float) -> float:
+        return min(self.cap, self.initial * self.factor ** attempt)
+
+    def __str__(self) -> str:
+        return f"with backoff from {self.initial:g}s up to {self.cap:g}s"
+
+
+class AdaptivePolling(PollStrategy):
+    """
+    Learns how long snapshots of each dataset usually take and polls most
+    often around the expected finish.
+
+    Completion times are kept as an exponentially weighted moving average per
+    dataset ("profile", "job", "search"). Before the expected finish it
+    sleeps most of the remaining time, close to it it polls every
+    `min_interval`, and once a snapshot runs late it backs off again. Datasets
+    without history fall back to exponential backoff. When `stats_path` is
+    set the averages are persisted so new processes start warm.
+    """
+
+    def __init__(
+        self,
+        min_interval: float = 1.0,
+        max_interval: float = 15.0,
+        stats_path: str | None = None,
+        smoothing: float = 0.3,
+        deadline: float | None = None,
+    ):
+        super().__init__(deadline)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.smoothing = smoothing
+        self.stats_path = stats_path if stats_path is not None else os.environ.get("BRIGHTDATA_POLL_STATS")
+        self.fallback = ExponentialBackoff(min_interval, 2.0, max_interval, self.deadline)
+        self._lock = threading.Lock()
+        self.expected: dict[str, float] = self._load()
+
+    def _load(self) -> dict[str, float]:
+        if not self.stats_path or not os.path.exists(self.stats_path):
+            return {}
+        try:
+            with open(self.stats_path, encoding="utf-8") as f:
+                return {k: float(v) for k, v in json.load(f).items()}
+        except (OSError, ValueError, AttributeError):
+            return {}
+
+    def _save(self) -> None:
+        if not self.stats_path:
+            return
+        directory = os.path.dirname(self.stats_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.stats_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.expected, f)
+        os.replace(tmp_path, self.stats_path)
+
+    def interval(self, dataset: str, attempt: int, elapsed: float) -> float:
+        expected = self.expected.get(dataset)
+        if expected is None:
+            return self.fallback.interval(dataset, attempt, elapsed)
+
+        early = expected * 0.8
+        if elapsed < early:
+            # Sleep through most of the expected wait in one go
+            delay = max(self.min_interval, (early - elapsed) / 2)
+        elif elapsed < expected * 1.5:
+            delay = self.min_interval
+        else:
+            # Running late: the longer it overruns, the less often we look
+            delay = self.min_interval + (elapsed - expected) * 0.25
+        return min(delay, self.max_interval)
+
+    def record(self, dataset: str, duration: float) -> None:
+        with self._lock:
+            previous = self.expected.get(dataset)
+            if previous is None:
+                self.expected[dataset] = duration
+            else:
+                self.expected[dataset] = previous + self.smoothing * (duration - previous)
+            try:
+                self._save()
+            except OSError:
+                pass
+
+    def __str__(self) -> str:
+        return "adaptively"
+
+
+_strategy: PollStrategy | None = None
+_strategy_lock = threading.Lock()
+
+
+def make_poll_strategy(name: str | None = None) -> PollStrategy:
+    """
+    Builds the strategy named by `name` or BRIGHTDATA_POLL_STRATEGY.
+
+    Accepted names are "fixed" (every BRIGHTDATA_POLL_INTERVAL seconds),
+    "exponential" and "adaptive" (the default).
+    """
+    name = (name or os.environ.get("BRIGHTDATA_POLL_STRATEGY", "adaptive")).lower()
+    if name == "fixed":
+        return FixedPolling(float(os.environ.get("BRIGHTDATA_POLL_INTERVAL", 5)))
+    if name == "exponential":
+        return ExponentialBackoff()
+    if name == "adaptive":
+        return AdaptivePolling()
+    raise ValueError(f"Unknown poll strategy: {name!r}")
+
+
+def get_poll_strategy() -> PollStrategy:
+    """Returns the process-wide strategy so adaptive timings are shared by all fetchers."""
+    global _strategy
+    with _strategy_lock:
+        if _strategy is None:
+            _strategy = make_poll_strategy()
+        return _strategy
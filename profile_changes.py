@@ -0,0 +1,216 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Iterable
+
+from config import load_env
+from urls import normalize_url
+
+load_env()
+
+DEFAULT_PATH = ".cache/profile_changes.sqlite"
+
+
+def section_hash(value) -> int:
+    """A 64-bit hash of one profile section, independent of dict key order."""
+    encoded = json.dumps(value, sort_keys=True, ensure_ascii=False).encode()
+    return int.from_bytes(hashlib.blake2b(encoded, digest_size=8).digest(), "big", signed=True)
+
+
+def section_hashes(profile: dict) -> dict[str, int]:
+    """Hashes each top-level section of a filtered profile; missing and null sections are left out."""
+    return {section: section_hash(value) for section, value in profile.items() if value is not None}
+
+
+@dataclass(frozen=True)
+class ProfileChange:
+    """
+    The sections of a profile that differ from the last time it was recorded.
+
+    A change is falsy when nothing changed. For a profile seen for the first
+    time `new` is set and every section is listed in `added`.
+    """
+
+    url: str
+    added: tuple[str, ...] = ()
+    removed: tuple[str, ...] = ()
+    changed: tuple[str, ...] = ()
+    new: bool = False
+
+    @property
+    def sections(self) -> set[str]:
+        """Every section added, removed or changed."""
+        return {*self.added, *self.removed, *self.changed}
+
+    def touches(self, fields: Iterable[str] | None) -> bool:
+        """Whether any of `fields` changed; None means any section."""
+        return bool(self.sections) if fields is None else not self.sections.isdisjoint(fields)
+
+    def __bool__(self) -> bool:
+        return bool(self.sections)
+
+
+ChangeCallback = Callable[[str, dict, ProfileChange], None]
+
+
+class ProfileChangeIndex:
+    """
+    On-disk record of per-section hashes of filtered profiles.
+
+    `update` compares freshly fetched profiles with the hashes stored for
+    them, stores the new hashes and returns a `ProfileChange` per profile,
+    so downstream work (the experience merge, matching, resume generation)
+    can be redone only for the profiles and sections that changed.
+    Subscribers registered with `subscribe` are called for each changed
+    profile touching the fields they asked for.
+    """
+
+    def __init__(self, path: str | None = None):
+        self.path = path or os.environ.get("BRIGHTDATA_PROFILE_CHANGES_PATH", DEFAULT_PATH)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._subscribers: list[tuple[ChangeCallback, frozenset[str] | None]] = []
+        self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS profiles ("
+            " profile TEXT PRIMARY KEY, first_seen REAL NOT NULL,"
+            " last_checked REAL NOT NULL, last_changed REAL NOT NULL) WITHOUT ROWID;"
+            "CREATE TABLE IF NOT EXISTS sections ("
+            " profile TEXT NOT NULL, section TEXT NOT NULL, hash INTEGER NOT NULL,"
+            " last_changed REAL NOT NULL, PRIMARY KEY (profile, section)) WITHOUT ROWID;"
+        )
+
+    def subscribe(self, callback: ChangeCallback, fields: Iterable[str] | None = None) -> ChangeCallback:
+        """
+        Calls `callback(url, profile, change)` after each update in which one of
+        `fields` (or, by default, any section) changed. Returns the callback,
+        to pass to `unsubscribe` later.
+        """
+        self._subscribers.append((callback, frozenset(fields) if fields is not None else None))
+        return callback
+
+    def unsubscribe(self, callback: ChangeCallback) -> None:
+        self._subscribers = [(cb, fields) for cb, fields in self._subscribers if cb is not callback]
+
+    def update(self, profiles: Iterable[tuple[str, dict]]) -> dict[str, ProfileChange]:
+        """
+        Records a batch of filtered profiles and diffs them against the stored hashes.
+
+        Args:
+            profiles (Iterable[tuple[str, dict]]): `(url, profile)` pairs, as
+                returned by `get_linkedin_profiles`. Empty profiles and errors
+                are skipped and keep their stored hashes.
+
+        Returns:
+            dict[str, ProfileChange]: The change of each profile recorded,
+            falsy for those that did not change, under every URL spelling it
+            was given as. Several spellings of one profile share one change,
+            diffed from the last of them.
+        """
+        entries: dict[str, tuple[str, dict, dict[str, int]]] = {}
+        spellings: dict[str, list[str]] = {}
+        for url, profile in profiles:
+            if profile and "error" not in profile:
+                key = normalize_url(url)
+                entries[key] = (url, profile, section_hashes(profile))
+                spellings.setdefault(key, []).append(url)
+
+        now = time.time()
+        changes: dict[str, ProfileChange] = {}
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                stored = self._stored(list(entries))
+                known = {key for (key,) in self._select_in("SELECT profile FROM profiles WHERE profile IN ({})", list(entries))}
+                for key, (url, _, hashes) in entries.items():
+                    old = stored.get(key, {})
+                    change = ProfileChange(
+                        url,
+                        added=tuple(s for s in hashes if s not in old),
+                        removed=tuple(s for s in old if s not in hashes),
+                        changed=tuple(s for s in hashes if s in old and old[s] != hashes[s]),
+                        new=key not in known,
+                    )
+                    for spelling in spellings[key]:
+                        changes[spelling] = change
+                    self._db.execute(
+                        "INSERT INTO profiles (profile, first_seen, last_checked, last_changed) VALUES (?, ?, ?, ?)"
+                        " ON CONFLICT (profile) DO UPDATE SET last_checked = excluded.last_checked,"
+                        " last_changed = CASE WHEN ? THEN excluded.last_changed ELSE last_changed END",
+                        (key, now, now, now, bool(change)),
+                    )
+                    self._db.executemany(
+                        "INSERT OR REPLACE INTO sections (profile, section, hash, last_changed) VALUES (?, ?, ?, ?)",
+                        [(key, s, hashes[s], now) for s in (*change.added, *change.changed)],
+                    )
+                    self._db.executemany(
+                        "DELETE FROM sections WHERE profile = ? AND section = ?", [(key, s) for s in change.removed]
+                    )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+
+        for url, profile, _ in entries.values():
+            change = changes[url]
+            for callback, fields in list(self._subscribers):
+                if change.touches(fields):
+                    try:
+                        callback(url, profile, change)
+                    except Exception:
+                        # A broken subscriber must not fail the refresh or starve the others
+                        pass
+        return changes
+
+    def _stored(self, keys: list[str]) -> dict[str, dict[str, int]]:
+        stored: dict[str, dict[str, int]] = {}
+        for key, section, hash_ in self._select_in("SELECT profile, section, hash FROM sections WHERE profile IN ({})", keys):
+            stored.setdefault(key, {})[section] = hash_
+        return stored
+
+    def _select_in(self, sql: str, keys: list[str]) -> list[tuple]:
+        # Stay under SQLite's bound-parameter limit
+        rows = []
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            rows += self._db.execute(sql.format(",".join("?" * len(chunk))), chunk).fetchall()
+        return rows
+
+    def hashes(self, url: str) -> dict[str, int]:
+        """The section hashes stored for a profile, empty if it was never recorded."""
+        with self._lock:
+            return self._stored([normalize_url(url)]).get(normalize_url(url), {})
+
+    def __contains__(self, url: str) -> bool:
+        with self._lock:
+            return self._db.execute("SELECT 1 FROM profiles WHERE profile = ?", (normalize_url(url),)).fetchone() is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM profiles").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+_index: ProfileChangeIndex | None = None
+_index_lock = threading.Lock()
+
+
+def get_profile_changes() -> ProfileChangeIndex:
+    """Returns the process-wide index at BRIGHTDATA_PROFILE_CHANGES_PATH."""
+    global _index
+    path = os.environ.get("BRIGHTDATA_PROFILE_CHANGES_PATH", DEFAULT_PATH)
+    with _index_lock:
+        if _index is None or _index.path != path:
+            _index = ProfileChangeIndex(path)
+        return _index
@@ -0,0 +1,134 @@
+from typing import Callable, Iterable, Iterator
+
+# A projection spec lists the top-level keys to keep and, for list-valued
+# fields, how to reshape them:
+#   first        keep only the first N items
+#   dicts_only   drop items that are not dicts
+#   drop_nulls   drop None items
+#   drop         keys removed from every dict item
+#   rename       keys renamed in every dict item (renamed keys move to the end)
+#   drop_empty   remove the field when the list ends up empty
+# Values that are not lists are passed through untouched.
+
+PROFILE_SPEC = {
+    "keep": [
+        "name", "city", "country_code", "about",
+        "educations_details", "languages", "recommendations",
+        "current_company_name", "publications", "organizations",
+        "honors_and_awards", "bio_links", "first_name", "last_name",
+        "education", "certifications", "projects", "experience",
+    ],
+    "fields": {
+        "education": {
+            "first": 1,
+            "drop": ["description", "description_html", "institute_logo_url"],
+            "drop_empty": True,
+        },
+        "certifications": {
+            "dicts_only": True,
+            "drop": ["credential_url", "credential_id"],
+            "rename": {"subtitle": "issuer", "meta": "notes"},
+            "drop_empty": True,
+        },
+        "projects": {"drop_nulls": True, "drop_empty": True},
+        "organizations": {"drop": ["membership_number"]},
+    },
+}
+
+JOB_SPEC = {
+    "keep": [
+        "job_title", "company_name", "job_location", "job_summary",
+        "job_seniority_level", "job_employment_type", "job_industries",
+        "job_base_pay_range", "job_description_formatted", "base_salary",
+    ],
+}
+
+SEARCH_SPEC = {
+    "keep": [
+        "job_title", "company_name", "job_location", "job_url",
+        "job_summary", "job_seniority_level", "job_employment_type",
+        "job_industries", "job_base_pay_range", "base_salary",
+    ],
+}
+
+_DROP = object()
+_MISSING = object()
+
+
+def compile_projection(spec: dict) -> Callable[[dict], dict]:
+    """
+    Compiles a projection spec into a function that builds the projected
+    record in a single pass, leaving the input untouched.
+
+    The function is generated as straight-line code with one lookup per kept
+    key, so its cost depends on the spec rather than on how many unwanted
+    fields the raw record carries. Output keys follow the order of `keep`.
+    """
+    keep = list(dict.fromkeys(spec["keep"]))
+    fields = {name: _compile_field(options) for name, options in spec.get("fields", {}).items()}
+    unknown = set(fields) - set(keep)
+    if unknown:
+        raise ValueError(f"Fields {sorted(unknown)} are reshaped but not kept")
+
+    namespace = {"_MISSING": _MISSING, "_DROP": _DROP}
+    lines = ["def project(data):", "    if not data:", "        return {}", "    get = data.get", "    out = {}"]
+    for i, key in enumerate(keep):
+        lines += [f"    v = get({key!r}, _MISSING)", "    if v is not _MISSING:"]
+        if key in fields:
+            namespace[f"_t{i}"] = fields[key]
+            lines += [f"        v = _t{i}(v)", "        if v is not _DROP:", f"            out[{key!r}] = v"]
+        else:
+            lines.append(f"        out[{key!r}] = v")
+    lines.append("    return out")
+
+    exec("\n".join(lines), namespace)
+    return namespace["project"]
+
+
+def _compile_field(options: dict) -> Callable:
+    allowed = {"first", "dicts_only", "drop_nulls", "drop", "rename", "drop_empty"}
+    unknown = set(options) - allowed
+    if unknown:
+        raise ValueError(f"Unknown projection options: {sorted(unknown)}")
+
+    namespace = {"_DROP": _DROP}
+    lines = ["def transform(items):", "    if not isinstance(items, list):", "        return items"]
+    if options.get("dicts_only"):
+        # Dropping non-dicts drops None as well
+        lines.append("    items = [x for x in items if isinstance(x, dict)]")
+    elif options.get("drop_nulls"):
+        lines.append("    items = [x for x in items if x is not None]")
+    if options.get("first") is not None:
+        lines.append(f"    items = items[:{int(options['first'])}]")
+
+    drop = list(options.get("drop", ()))
+    rename = dict(options.get("rename", {}))
+    if drop or rename:
+        # Copy-and-pop mirrors how the hand-written filters edited items, including key order
+        reshape = ["def reshape(item):", "    out = item.copy()", "    pop = out.pop"]
+        reshape += [f"    pop({key!r}, None)" for key in drop]
+        for old, new in rename.items():
+            reshape += [f"    if {old!r} in out:", f"        out[{new!r}] = pop({old!r})"]
+        reshape.append("    return out")
+        exec("\n".join(reshape), namespace)
+        if options.get("dicts_only"):
+            lines.append("    items = [reshape(x) for x in items]")
+        else:
+            lines.append("    items = [reshape(x) if isinstance(x, dict) else x for x in items]")
+    if options.get("drop_empty"):
+        lines += ["    if not items:", "        return _DROP"]
+    lines.append("    return items")
+
+    exec("\n".join(lines), namespace)
+    return namespace["transform"]
+
+
+def project_all(project: Callable[[dict], dict], records: Iterable[dict], drop_empty: bool = False) -> Iterator[dict]:
+    """Applies a compiled projection to many records, optionally skipping those left empty."""
+    projected = map(project, records)
+    return filter(None, projected) if drop_empty else projected
+
+
+project_profile = compile_projection(PROFILE_SPEC)
+project_job = compile_projection(JOB_SPEC)
+project_search_job = compile_projection(SEARCH_SPEC)
@@ -0,0 +1,329 @@
+import math
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Iterator
+
+from config import load_env
+from metrics import get_metrics
+
+load_env()
+
+ENDPOINTS = ("trigger", "status", "download")
+# Throttling halves the rate, which then climbs back to the full rate over RECOVERY seconds;
+# further 429s within THROTTLE_WINDOW belong to the same burst and do not halve it again
+MIN_SCALE = 0.05
+RECOVERY = 60.0
+THROTTLE_WINDOW = 1.0
+# Slots of holders that neither finished nor died are reclaimed after this long
+HOLDER_LEASE = 600.0
+# How long to wait before trying again for a concurrency slot, doubling while every slot stays taken
+SLOT_RETRY = 0.05
+SLOT_RETRY_MAX = 1.0
+
+
+@dataclass(frozen=True)
+class EndpointLimit:
+    """
+    Limits for one endpoint class.
+
+    Args:
+        rate (float): Sustained requests per second; 0 for no rate limit.
+        burst (float): Requests that may be sent at once after a quiet period.
+        concurrency (int): Requests in flight at once; 0 for no limit.
+    """
+
+    rate: float
+    burst: float
+    concurrency: int
+
+
+DEFAULT_LIMITS = {
+    "trigger": EndpointLimit(rate=5.0, burst=50, concurrency=20),
+    "status": EndpointLimit(rate=20.0, burst=100, concurrency=50),
+    "download": EndpointLimit(rate=10.0, burst=20, concurrency=20),
+}
+
+
+def limits_from_env() -> dict[str, EndpointLimit]:
+    """Reads BRIGHTDATA_{TRIGGER,STATUS,DOWNLOAD}_{RATE,BURST,CONCURRENCY}, falling back to DEFAULT_LIMITS."""
+    limits = {}
+    for endpoint, default in DEFAULT_LIMITS.items():
+        prefix = f"BRIGHTDATA_{endpoint.upper()}"
+        limits[endpoint] = EndpointLimit(
+            rate=float(os.environ.get(f"{prefix}_RATE", default.rate)),
+            burst=float(os.environ.get(f"{prefix}_BURST", default.burst)),
+            concurrency=int(os.environ.get(f"{prefix}_CONCURRENCY", default.concurrency)),
+        )
+    return limits
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Seconds to wait according to a Retry-After header (delay-seconds or HTTP date), or None."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+@dataclass
+class _Bucket:
+    tokens: float
+    updated: float
+    blocked_until: float = 0.0
+    scale: float = 1.0
+    throttled_at: float = 0.0
+
+    def effective_scale(self, now: float) -> float:
+        return min(1.0, self.scale + (now - self.throttled_at) / RECOVERY)
+
+
+class _MemoryState:
+    """Limiter state for a single process."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._buckets: dict[str, _Bucket] = {}
+        self._holders: dict[str, dict[str, tuple[int, float]]] = {}
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        with self._lock:
+            yield
+
+    reading = transaction
+
+    def bucket(self, endpoint: str) -> _Bucket | None:
+        bucket = self._buckets.get(endpoint)
+        return _Bucket(**vars(bucket)) if bucket is not None else None
+
+    def save_bucket(self, endpoint: str, bucket: _Bucket) -> None:
+        self._buckets[endpoint] = bucket
+
+    def holders(self, endpoint: str) -> list[tuple[str, int, float]]:
+        return [(holder, pid, expires) for holder, (pid, expires) in self._holders.get(endpoint, {}).items()]
+
+    def add_holder(self, endpoint: str, holder: str, pid: int, expires: float) -> None:
+        self._holders.setdefault(endpoint, {})[holder] = (pid, expires)
+
+    def remove_holders(self, endpoint: str, holders: list[str]) -> None:
+        for holder in holders:
+            self._holders.get(endpoint, {}).pop(holder, None)
+
+
+class _SqliteState:
+    """Limiter state in a SQLite file, shared by every process on the host."""
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS buckets ("
+            " endpoint TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL,"
+            " blocked_until REAL NOT NULL, scale REAL NOT NULL, throttled_at REAL NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS holders ("
+            " holder TEXT PRIMARY KEY, endpoint TEXT NOT NULL, pid INTEGER NOT NULL, expires REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS holders_endpoint ON holders (endpoint)")
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+
+    @contextmanager
+    def reading(self) -> Iterator[None]:
+        # A plain read: in WAL mode it neither takes nor waits for the write lock
+        with self._lock:
+            yield
+
+    def bucket(self, endpoint: str) -> _Bucket | None:
+        row = self._db.execute(
+            "SELECT tokens, updated, blocked_until, scale, throttled_at FROM buckets WHERE endpoint = ?", (endpoint,)
+        ).fetchone()
+        return _Bucket(*row) if row else None
+
+    def save_bucket(self, endpoint: str, bucket: _Bucket) -> None:
+        self._db.execute(
+            "INSERT OR REPLACE INTO buckets VALUES (?, ?, ?, ?, ?, ?)",
+            (endpoint, bucket.tokens, bucket.updated, bucket.blocked_until, bucket.scale, bucket.throttled_at),
+        )
+
+    def holders(self, endpoint: str) -> list[tuple[str, int, float]]:
+        return self._db.execute("SELECT holder, pid, expires FROM holders WHERE endpoint = ?", (endpoint,)).fetchall()
+
+    def add_holder(self, endpoint: str, holder: str, pid: int, expires: float) -> None:
+        self._db.execute("INSERT INTO holders VALUES (?, ?, ?, ?)", (holder, endpoint, pid, expires))
+
+    def remove_holders(self, endpoint: str, holders: list[str]) -> None:
+        self._db.executemany("DELETE FROM holders WHERE holder = ?", [(holder,) for holder in holders])
+
+    def close(self) -> None:
+        self._db.close()
+
+
+class RateLimiter:
+    """
+    Token-bucket rate limiter and concurrency governor for the Bright Data API.
+
+    Trigger, status and download calls each have their own `EndpointLimit`.
+    With a `path` (BRIGHTDATA_RATE_LIMIT_PATH) the buckets, in-flight slots
+    and backoffs live in a SQLite file, so every worker process on the host
+    draws from the same budget; otherwise they are per process. Slots of
+    processes that died are reclaimed.
+
+    A 429 calls `backoff`: the endpoint is held for the Retry-After delay
+    in every process and its rate is halved, then recovers over a minute.
+    """
+
+    def __init__(self, path: str | None = None, limits: dict[str, EndpointLimit] | None = None):
+        self.path = path if path is not None else os.environ.get("BRIGHTDATA_RATE_LIMIT_PATH", "")
+        self.limits = {**limits_from_env(), **(limits or {})}
+        self._state = _SqliteState(self.path) if self.path else _MemoryState()
+
+    def _take(self, endpoint: str, holder: str) -> float:
+        """
+        Takes a token and a slot if both are free; else returns how long to
+        wait, or infinity while every concurrency slot is taken.
+        """
+        limit = self.limits[endpoint]
+        now = time.time()
+        # Most waiting callers find the endpoint held or full; tell them so without the write lock
+        with self._state.reading():
+            bucket = self._state.bucket(endpoint)
+            holders = self._state.holders(endpoint) if limit.concurrency else []
+        if bucket is not None and now < bucket.blocked_until:
+            return bucket.blocked_until - now
+        if limit.concurrency and len(holders) >= limit.concurrency:
+            if not any(expires < now or not _pid_alive(pid) for _, pid, expires in holders):
+                return math.inf
+
+        with self._state.transaction():
+            bucket = self._state.bucket(endpoint) or _Bucket(tokens=limit.burst, updated=now)
+            if now < bucket.blocked_until:
+                return bucket.blocked_until - now
+
+            if limit.concurrency:
+                holders = self._state.holders(endpoint)
+                if len(holders) >= limit.concurrency:
+                    stale = [h for h, pid, expires in holders if expires < now or not _pid_alive(pid)]
+                    self._state.remove_holders(endpoint, stale)
+                    if len(holders) - len(stale) >= limit.concurrency:
+                        return math.inf
+
+            if limit.rate:
+                rate = limit.rate * bucket.effective_scale(now)
+                bucket.tokens = min(limit.burst, bucket.tokens + (now - bucket.updated) * rate)
+                bucket.updated = now
+                if bucket.tokens < 1:
+                    self._state.save_bucket(endpoint, bucket)
+                    return (1 - bucket.tokens) / rate
+                bucket.tokens -= 1
+                self._state.save_bucket(endpoint, bucket)
+
+            if limit.concurrency:
+                self._state.add_holder(endpoint, holder, os.getpid(), now + HOLDER_LEASE)
+        return 0.0
+
+    def acquire(self, endpoint: str) -> str:
+        """Blocks until a call to `endpoint` may be sent; returns the slot to `release` afterwards."""
+        holder = f"{os.getpid()}:{uuid.uuid4().hex}"
+        waited = 0.0
+        slot_retry = SLOT_RETRY
+        while True:
+            wait = self._take(endpoint, holder)
+            if wait <= 0:
+                break
+            if wait == math.inf:
+                # Releases aren't signalled across processes, so poll for a slot, backing off while none frees up
+                wait, slot_retry = slot_retry, min(SLOT_RETRY_MAX, slot_retry * 2)
+            else:
+                slot_retry = SLOT_RETRY
+            # A little jitter keeps waiting workers from waking together
+            wait = min(wait, 5.0) * random.uniform(1.0, 1.1)
+            time.sleep(wait)
+            waited += wait
+        if waited:
+            get_metrics().record("ratelimit", waited, endpoint=endpoint)
+        return holder
+
+    def release(self, endpoint: str, holder: str) -> None:
+        if self.limits[endpoint].concurrency:
+            with self._state.transaction():
+                self._state.remove_holders(endpoint, [holder])
+
+    @contextmanager
+    def slot(self, endpoint: str) -> Iterator[None]:
+        holder = self.acquire(endpoint)
+        try:
+            yield
+        finally:
+            self.release(endpoint, holder)
+
+    def backoff(self, endpoint: str, seconds: float) -> None:
+        """Holds `endpoint` for `seconds` in every process sharing the limiter and halves its rate."""
+        limit = self.limits[endpoint]
+        now = time.time()
+        with self._state.transaction():
+            bucket = self._state.bucket(endpoint) or _Bucket(tokens=limit.burst, updated=now)
+            bucket.blocked_until = max(bucket.blocked_until, now + seconds)
+            if now - bucket.throttled_at >= THROTTLE_WINDOW:
+                bucket.scale = max(MIN_SCALE, bucket.effective_scale(now) / 2)
+                bucket.throttled_at = now
+            self._state.save_bucket(endpoint, bucket)
+        get_metrics().count("brightdata_throttled_total", endpoint=endpoint)
+
+    def delay(self, endpoint: str) -> float:
+        """Seconds until `endpoint` is no longer held by a backoff."""
+        with self._state.reading():
+            bucket = self._state.bucket(endpoint)
+        return max(0.0, bucket.blocked_until - time.time()) if bucket is not None else 0.0
+
+
+_limiter: RateLimiter | None = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Returns the process-wide limiter, shared with other processes when BRIGHTDATA_RATE_LIMIT_PATH is set."""
+    global _limiter
+    path = os.environ.get("BRIGHTDATA_RATE_LIMIT_PATH", "")
+    with _limiter_lock:
+        if _limiter is None or _limiter.path != path:
+            _limiter = RateLimiter(path)
+        return _limiter
@@ -0,0 +1,283 @@
+import functools
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from html import escape
+from string import Template
+from typing import Callable, Iterable
+
+from experience import merge_experience
+from pdf_cache import cached_render, get_pdf_store
+
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+DEFAULT_TEMPLATE = os.path.join(ASSETS_DIR, "resume_template.html")
+
+
+def compile_template(text: str) -> Callable[[dict[str, str]], str]:
+    """
+    Compiles a `$placeholder` template into a render function.
+
+    The template is split once into its literal chunks and placeholder
+    names, so rendering is a single join.
+    """
+    parts: list[str] = []
+    names: list[str] = []
+    last = 0
+    for match in Template.pattern.finditer(text):
+        if match.group("invalid") is not None:
+            raise ValueError(f"Invalid placeholder at offset {match.start()} of the resume template")
+        if match.group("escaped") is not None:
+            parts.append(text[last:match.start()] + "$")
+            names.append("")
+        else:
+            parts.append(text[last:match.start()])
+            names.append(match.group("named") or match.group("braced"))
+        last = match.end()
+    tail = text[last:]
+
+    def render(values: dict[str, str]) -> str:
+        out = []
+        for part, name in zip(parts, names):
+            out.append(part)
+            if name:
+                out.append(values[name])
+        out.append(tail)
+        return "".join(out)
+
+    return render
+
+
+@functools.lru_cache(maxsize=8)
+def _load_template(path: str, mtime: int) -> Callable[[dict[str, str]], str]:
+    with open(path, encoding="utf-8") as f:
+        return compile_template(f.read())
+
+
+def load_template(path: str = DEFAULT_TEMPLATE) -> Callable[[dict[str, str]], str]:
+    """Returns the compiled template at `path`, recompiling only when the file changes."""
+    return _load_template(path, os.stat(path).st_mtime_ns)
+
+
+def _items(value) -> list[dict]:
+    return [item for item in value if isinstance(item, dict)] if isinstance(value, list) else []
+
+
+def _dates(item: dict, start: str = "start_date", end: str = "end_date") -> str:
+    return " - ".join(escape(str(item[key])) for key in (start, end) if item.get(key))
+
+
+def _entry(css: str, title, date: str = "", subtitle: str = "", body: str = "") -> str:
+    date_html = f'\n                <span class="entry-date">{date}</span>' if date else ""
+    subtitle_html = f'\n            <div class="entry-subtitle">{subtitle}</div>' if subtitle else ""
+    return (
+        f'        <div class="{css}">\n'
+        '            <div class="entry-header">\n'
+        f'                <span class="entry-title">{escape(str(title or ""))}</span>{date_html}\n'
+        f"            </div>{subtitle_html}{body}\n"
+        "        </div>\n"
+    )
+
+
+def _section(title: str, content: str) -> str:
+    if not content:
+        return ""
+    return (
+        '    <section class="section">\n'
+        f'        <h3 class="section-title">{escape(title)}</h3>\n'
+        f"{content}"
+        "    </section>\n"
+    )
+
+
+def _experience(profile: dict) -> str:
+    entries = []
+    for job in _items(profile.get("experience")):
+        subtitle = escape(str(job.get("company") or ""))
+        if job.get("location"):
+            subtitle += f' <span class="entry-location">- {escape(str(job["location"]))}</span>'
+        highlights = "".join(
+            f"\n                <li>{escape(str(highlight))}</li>" for highlight in job.get("highlights") or []
+        )
+        body = f'\n            <ul class="entry-description">{highlights}\n            </ul>' if highlights else ""
+        entries.append(_entry("job-entry", job.get("title"), _dates(job), subtitle, body))
+    return "".join(entries)
+
+
+def _projects(profile: dict) -> str:
+    return "".join(
+        _entry(
+            "project-entry", project.get("title"), _dates(project),
+            body=f'\n            <div class="entry-description">{escape(str(project["description"]))}</div>'
+            if project.get("description") else "",
+        )
+        for project in _items(profile.get("projects"))
+    )
+
+
+def _education(profile: dict) -> str:
+    entries = []
+    for school in _items(profile.get("education")):
+        subtitle = ", ".join(escape(str(school[key])) for key in ("degree", "field") if school.get(key))
+        entries.append(_entry("education-entry", school.get("title"), _dates(school, "start_year", "end_year"), subtitle))
+    return "".join(entries)
+
+
+def _certifications(profile: dict) -> str:
+    entries = []
+    for cert in _items(profile.get("certifications")):
+        badge = f'<span class="cert-badge">{escape(str(cert["issuer"]))}</span>\n            ' if cert.get("issuer") else ""
+        notes = f" ({escape(str(cert['notes']))})" if cert.get("notes") else ""
+        entries.append(
+            f'        <div class="cert-entry">\n            {badge}<strong>{escape(str(cert.get("title") or ""))}</strong>{notes}\n        </div>\n'
+        )
+    return "".join(entries)
+
+
+def _list(items: list[dict], detail: str) -> str:
+    lines = []
+    for item in items:
+        extra = f" - {escape(str(item[detail]))}" if item.get(detail) else ""
+        lines.append(f"            <li><strong>{escape(str(item.get('title') or ''))}</strong>{extra}</li>\n")
+    return f"        <ul>\n{''.join(lines)}        </ul>\n" if lines else ""
+
+
+def _contact(profile: dict) -> str:
+    parts = []
+    location = ", ".join(str(profile[key]) for key in ("city", "country_code") if profile.get(key))
+    if location:
+        parts.append(f"<span>{escape(location)}</span>")
+    for link in _items(profile.get("bio_links")):
+        if link.get("link"):
+            parts.append(
+                f'<span><a href="{escape(str(link["link"]))}" target="_blank">{escape(str(link.get("title") or link["link"]))}</a></span>'
+            )
+    return "\n            <span>|</span>\n            ".join(parts)
+
+
+def resume_context(profile: dict) -> dict[str, str]:
+    """Builds the escaped HTML fragments that fill the resume template's placeholders."""
+    name = profile.get("name") or " ".join(filter(None, [profile.get("first_name"), profile.get("last_name")]))
+    experience = _items(profile.get("experience"))
+    headline = profile.get("position") or (experience[0].get("title") if experience else None)
+    sections = [
+        _section("Professional Summary", f'        <p class="summary">{escape(str(profile["about"]))}</p>\n' if profile.get("about") else ""),
+        _section("Professional Experience", _experience(profile)),
+        _section("Projects", _projects(profile)),
+        _section("Education", _education(profile)),
+        _section("Certifications", _certifications(profile)),
+        _section("Publications", _list(_items(profile.get("publications")), "subtitle")),
+        _section("Honors & Awards", _list(_items(profile.get("honors_and_awards")), "publication")),
+        _section("Organizations", _list(_items(profile.get("organizations")), "membership_type")),
+        _section("Languages", _list(_items(profile.get("languages")), "subtitle")),
+    ]
+    return {
+        "title": escape(" - ".join(filter(None, [name, headline]))),
+        "name": escape(str(name or "").upper()),
+        "headline": f"<h2>{escape(str(headline))}</h2>" if headline else "",
+        "contact": _contact(profile),
+        "sections": "\n".join(section for section in sections if section),
+    }
+
+
+def render_resume_html(
+    profile: dict,
+    experience_path: str | None = None,
+    template_path: str = DEFAULT_TEMPLATE,
+) -> str:
+    """
+    Renders a profile as resume HTML.
+
+    Args:
+        profile (dict): A filtered profile from `get_linkedin_profile`.
+        experience_path (str): Experience override file merged into the profile, as in
+            run_real_test.py; by default the profile's own `experience` is used.
+        template_path (str): The resume template.
+
+    Returns:
+        str: The resume HTML.
+    """
+    if experience_path:
+        profile = merge_experience(profile, experience_path)
+    return load_template(template_path)(resume_context(profile))
+
+
+def html_to_pdf(html: str, base_url: str = ASSETS_DIR) -> bytes | memoryview:
+    """
+    Converts HTML to PDF locally with WeasyPrint (the "pdf" extra), without
+    any network round trip.
+    """
+    def render() -> bytes:
+        try:
+            from weasyprint import HTML
+        except ImportError as e:
+            raise ImportError('Local PDF rendering needs WeasyPrint: pip install "scrapbook[pdf]"') from e
+        return HTML(string=html, base_url=base_url).write_pdf()
+
+    # Unchanged resumes are served from the PDF cache
+    return cached_render(get_pdf_store(), html, "weasyprint", {"base_url": base_url}, render)
+
+
+def _slug(profile: dict, index: int) -> str:
+    name = profile.get("name") or " ".join(filter(None, [profile.get("first_name"), profile.get("last_name")]))
+    slug = re.sub(r"[^a-z0-9]+", "-", str(name or "").lower()).strip("-")
+    return f"{index:04d}-{slug or 'resume'}"
+
+
+def _render_one(task: tuple[int, dict, str, str | None, str, bool]) -> str:
+    index, profile, out_dir, experience_path, template_path, pdf = task
+    html = render_resume_html(profile, experience_path, template_path)
+    path = os.path.join(out_dir, _slug(profile, index) + (".pdf" if pdf else ".html"))
+    if pdf:
+        with open(path, "wb") as f:
+            f.write(html_to_pdf(html))
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(html)
+    return path
+
+
+def render_resumes(
+    profiles: Iterable[dict],
+    out_dir: str,
+    experience_path: str | None = None,
+    template_path: str = DEFAULT_TEMPLATE,
+    pdf: bool = True,
+    workers: int | None = None,
+) -> list[str]:
+    """
+    Renders many resumes in parallel on a process pool.
+
+    Each worker compiles the template once and reuses it for every resume it
+    renders; PDF conversion is CPU-bound, so processes rather than threads.
+
+    Args:
+        profiles (Iterable[dict]): Filtered profiles.
+        out_dir (str): Directory the files are written to.
+        experience_path (str): Experience override file merged into every profile;
+            by default each profile keeps its own `experience`.
+        template_path (str): The resume template.
+        pdf (bool): Write PDFs; False writes the HTML only.
+        workers (int): Pool size; defaults to RESUME_WORKERS or the CPU count.
+
+    Returns:
+        list[str]: The written file paths, in input order.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    tasks = [(i, profile, out_dir, experience_path, template_path, pdf) for i, profile in enumerate(profiles)]
+    workers = workers or int(os.environ.get("RESUME_WORKERS", 0)) or os.cpu_count() or 1
+    if workers == 1 or len(tasks) <= 1:
+        return [_render_one(task) for task in tasks]
+    # Spawned rather than forked: callers may have client or webhook threads running
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks)), mp_context=context) as pool:
+        return list(pool.map(_render_one, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
+
+
+if __name__ == "__main__":
+    import json
+    import sys
+
+    with open(sys.argv[1]) as f:
+        profile = json.load(f)
+    print(render_resume_html(profile))
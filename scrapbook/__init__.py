@@ -0,0 +1,71 @@
+"""
+Scrapbook: LinkedIn profiles, job listings and job searches through Bright Data,
+plus matching, resumes and PDF rendering.
+
+    import scrapbook
+    profile = scrapbook.get_linkedin_profile("https://www.linkedin.com/in/someone/")
+
+Attributes are loaded on first use: `import scrapbook` imports nothing else,
+and each name pulls in only the module that defines it, so the HTTP stack,
+numpy and the Composio SDK are imported by the first call that needs them.
+The modules themselves stay importable on their own (`import search_jobs`).
+"""
+import importlib
+
+# Public name -> module defining it
+_EXPORTS = {
+    "Config": "config",
+    "get_config": "config",
+    "load_env": "config",
+    "BrightDataClient": "brightdata_client",
+    "SnapshotFailed": "brightdata_client",
+    "get_client": "brightdata_client",
+    "SnapshotScheduler": "brightdata_async",
+    "get_scheduler": "brightdata_async",
+    "fetch_batch": "brightdata_batch",
+    "iter_fetch_batch": "brightdata_batch",
+    "normalize_url": "urls",
+    "get_linkedin_profile": "get_linkedin_profile",
+    "get_linkedin_profiles": "get_linkedin_profile",
+    "async_get_linkedin_profile": "get_linkedin_profile",
+    "refresh_linkedin_profiles": "get_linkedin_profile",
+    "merge_experience": "experience",
+    "get_job_listing": "get_job_listing",
+    "get_job_listings": "get_job_listing",
+    "async_get_job_listing": "get_job_listing",
+    "SearchQuery": "search_jobs",
+    "search_jobs": "search_jobs",
+    "search_jobs_many": "search_jobs",
+    "iter_search_jobs": "search_jobs",
+    "search_new_jobs": "search_jobs",
+    "async_search_jobs": "search_jobs",
+    "ArchiveReader": "archive",
+    "ArchiveWriter": "archive",
+    "NearDuplicateIndex": "job_dedup",
+    "ProfileChange": "profile_changes",
+    "ProfileChangeIndex": "profile_changes",
+    "SeenJobsIndex": "seen_jobs",
+    "JobIndex": "job_index",
+    "SnapshotQueue": "snapshot_queue",
+    "JobMatcher": "matching",
+    "render_resume_html": "resume",
+    "render_resumes": "resume",
+    "PdfService": "pdf_service",
+    "html_to_pdf_remote": "pdf_service",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    # Cache it so later lookups skip __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *_EXPORTS})
@@ -1,99 +1,367 @@
-import os
 import time
-import requests
-from dotenv import load_dotenv
+from dataclasses import dataclass
+from typing import Iterable, Iterator
+from urllib.parse import parse_qsl, quote_plus, urlencode, urlsplit
 
-load_dotenv()
+from archive import ArchiveWriter, archived
+from brightdata_async import SnapshotScheduler, get_scheduler
+from brightdata_batch import DEFAULT_CHUNK_SIZE, iter_snapshots
+from brightdata_client import get_client, require_dataset_id
+from cache import async_cached_fetch, cached_fetch
+from config import load_env
+from job_dedup import NearDuplicateIndex
+from job_index import index_jobs, indexed, search_index
+from metrics import get_metrics
+from projection import project_all, project_search_job
+from seen_jobs import SeenJobsIndex, get_seen_jobs, job_id
+from urls import normalize_url, record_input_url
 
+load_env()
 
-def search_jobs(keyword: str) -> list[dict]:
+# LinkedIn job search filters: f_TPR (posted within, in seconds), f_E (experience level), f_WT (workplace type)
+POSTED_WITHIN = {"day": 86400, "week": 604800, "month": 2592000}
+EXPERIENCE_LEVELS = {
+    "internship": "1", "entry": "2", "associate": "3",
+    "mid-senior": "4", "director": "5", "executive": "6",
+}
+REMOTE, ON_SITE_OR_HYBRID = "2", "1,3"
+
+
+def build_search_url(keyword: str) -> str:
+    """Builds the LinkedIn job search URL that Bright Data collects for a keyword."""
+    # BrightData's job dataset expects a URL, so we construct a LinkedIn search URL
+    encoded_keyword = quote_plus(keyword)
+    return f"https://www.linkedin.com/jobs/search/?keywords={encoded_keyword}"
+
+
+@dataclass(frozen=True)
+class SearchQuery:
+    """
+    One LinkedIn job search.
+
+    Args:
+        keywords (str): The search query (e.g. "python developer").
+        location (str): Where the jobs are (e.g. "Berlin, Germany").
+        posted_within (str | int): "day", "week", "month" or a number of seconds.
+        experience_level (tuple[str, ...]): Any of EXPERIENCE_LEVELS; a single name is accepted too.
+        remote (bool): True for remote jobs only, False for on-site and hybrid ones.
+    """
+
+    keywords: str
+    location: str | None = None
+    posted_within: str | int | None = None
+    experience_level: tuple[str, ...] = ()
+    remote: bool | None = None
+
+    def __post_init__(self):
+        levels = (self.experience_level,) if isinstance(self.experience_level, str) else tuple(self.experience_level)
+        unknown = [level for level in levels if level not in EXPERIENCE_LEVELS]
+        if unknown:
+            raise ValueError(f"Unknown experience level(s) {unknown}; expected any of {list(EXPERIENCE_LEVELS)}.")
+        if isinstance(self.posted_within, str) and self.posted_within not in POSTED_WITHIN:
+            raise ValueError(f"posted_within must be a number of seconds or one of {list(POSTED_WITHIN)}.")
+        object.__setattr__(self, "experience_level", levels)
+
+    def url(self) -> str:
+        """The LinkedIn search URL Bright Data collects for this query."""
+        params = [("keywords", self.keywords)]
+        if self.location:
+            params.append(("location", self.location))
+        if self.posted_within:
+            seconds = POSTED_WITHIN.get(self.posted_within, self.posted_within)
+            params.append(("f_TPR", f"r{int(seconds)}"))
+        if self.experience_level:
+            params.append(("f_E", ",".join(sorted({EXPERIENCE_LEVELS[level] for level in self.experience_level}))))
+        if self.remote is not None:
+            params.append(("f_WT", REMOTE if self.remote else ON_SITE_OR_HYBRID))
+        return f"https://www.linkedin.com/jobs/search/?{urlencode(params)}"
+
+    def as_dict(self) -> dict:
+        """The fields that are set, as recorded in each job's "queries"."""
+        fields = {
+            "keywords": self.keywords, "location": self.location, "posted_within": self.posted_within,
+            "experience_level": list(self.experience_level), "remote": self.remote,
+        }
+        return {name: value for name, value in fields.items() if value not in (None, [])}
+
+
+def _search_key(url: str) -> str:
+    # Unlike normalize_url, keeps the query string, which is what tells searches apart
+    return f"{normalize_url(url)}?{urlencode(sorted(parse_qsl(urlsplit(url).query)))}"
+
+
+def filter_search_job(raw_job: dict) -> dict:
+    """Keeps only the useful fields of one search result (see projection.SEARCH_SPEC)."""
+    return project_search_job(raw_job)
+
+
+def filter_search_results(data: Iterable[dict]) -> list[dict]:
+    """Filters each job to keep only useful fields, dropping jobs left empty."""
+    return list(_iter_filtered(data))
+
+
+def _iter_filtered(data: Iterable[dict]) -> Iterator[dict]:
+    return project_all(project_search_job, data, drop_empty=True)
+
+
+def search_jobs(
+    keyword: str,
+    use_index: bool = True,
+    archive: ArchiveWriter | None = None,
+    dedup: NearDuplicateIndex | None = None,
+) -> list[dict]:
     """
     Searches for LinkedIn job listings matching a keyword using Bright Data API.
 
+    When a local job index is configured (BRIGHTDATA_JOB_INDEX_PATH) and
+    already holds enough fresh matches, those are returned without scraping.
+
     Args:
         keyword (str): The search query (e.g. "python developer").
+        use_index (bool): Set to False to always scrape.
+        archive (ArchiveWriter): Also writes the jobs found into this archive, keyed by job URL.
+        dedup (NearDuplicateIndex): Drops reposts of postings this index has
+            already seen, in this or earlier searches.
 
     Returns:
         list[dict]: A list of matching job listing dicts.
     """
-    api_token = os.environ.get("BRIGHTDATA_API_TOKEN")
-    dataset_id = os.environ.get("BRIGHTDATA_JOB_DATASET_ID")
+    if use_index:
+        indexed_jobs = search_index(keyword)
+        if indexed_jobs is not None:
+            print(f"Found {len(indexed_jobs)} indexed job(s) for '{keyword}'")
+            return indexed_jobs
 
-    if not api_token or not dataset_id:
-        raise ValueError("Missing Bright Data API credentials in environment variables.")
+    dataset_id = require_dataset_id("BRIGHTDATA_JOB_DATASET_ID")
+    client = get_client()
 
-    headers = {
-        "Authorization": f"Bearer {api_token}",
-        "Content-Type": "application/json",
-    }
+    def fetch() -> list[dict]:
+        # 1) Trigger keyword discovery
+        payload = [{"url": build_search_url(keyword)}]
 
-    # 1) Trigger keyword discovery
-    # BrightData's job dataset expects a URL, so we construct a LinkedIn search URL
-    from urllib.parse import quote_plus
-    encoded_keyword = quote_plus(keyword)
-    search_url = f"https://www.linkedin.com/jobs/search/?keywords={encoded_keyword}"
-    
-    trigger_url = f"https://api.brightdata.com/datasets/v3/trigger?dataset_id={dataset_id}"
-    payload = [{"url": search_url}]
+        print(f"Triggering job search with payload {payload}")
+        snapshot_id = client.trigger(dataset_id, payload)
 
-    print(f"Triggering job search with payload {payload}")
-    resp = requests.post(trigger_url, headers=headers, json=payload, timeout=30)
-    resp.raise_for_status()
-    snapshot_id = resp.json().get("snapshot_id")
+        # 2) Poll until ready
+        print(f"Snapshot ID: {snapshot_id}. Polling status {client.poll_strategy}...")
+        client.wait(snapshot_id, on_status=lambda info: print(f"Polling status: {info.get('status')}"), dataset="search")
 
-    if not snapshot_id:
-        raise RuntimeError(f"Failed to get snapshot_id from response: {resp.json()}")
+        # 3) Download results as JSON
+        print("Downloading results...")
+        # Already loaded by the client; imported here so cached searches never load it
+        from requests.exceptions import HTTPError
 
-    # 2) Poll until ready
-    status_url = f"https://api.brightdata.com/datasets/v3/snapshot/{snapshot_id}"
-    poll_interval = int(os.environ.get("BRIGHTDATA_POLL_INTERVAL", 5))
+        try:
+            data = client.download(snapshot_id)
+        except HTTPError as e:
+            print(f"Error downloading data: {e}")
+            print(f"Response body: {e.response.text}")
+            raise
 
-    print(f"Snapshot ID: {snapshot_id}. Polling status every {poll_interval}s...")
+        # 4) Filter each job to keep only useful fields, indexing them for later queries
+        with get_metrics().span("filter", dataset="search"):
+            jobs = filter_search_results(data)
+        index_jobs((None, job) for job in jobs)
+        return jobs
 
-    while True:
-        status_resp = requests.get(status_url, headers=headers, timeout=30)
-        status_resp.raise_for_status()
-        info = status_resp.json()
-        status = info.get("status")
+    # Served from the result cache when fresh; concurrent callers share one scrape
+    jobs = cached_fetch("search", keyword, fetch)
+    if dedup is not None:
+        jobs = dedup.filter(jobs)
+    if archive is not None:
+        archive.add_many((None, job) for job in jobs)
+    return jobs
 
-        print(f"Polling status: {status}")
 
-        if status == "ready":
-            break
-        if status == "failed":
-            raise RuntimeError(f"Snapshot failed: {info}")
+def iter_search_jobs(
+    keyword: str,
+    archive: ArchiveWriter | None = None,
+    dedup: NearDuplicateIndex | None = None,
+) -> Iterator[dict]:
+    """
+    Searches for LinkedIn job listings, streaming the results.
 
-        time.sleep(poll_interval)
+    The snapshot is downloaded as JSON lines and each job is filtered as it
+    arrives, so memory stays flat for broad keywords. Results bypass the
+    result cache but are still added to the job index.
 
-    # 3) Download results as JSON
-    print("Downloading results...")
-    download_url = f"{status_url}?format=json"
-    data_resp = requests.get(download_url, headers=headers, timeout=60)
-    try:
-        data_resp.raise_for_status()
-    except requests.exceptions.HTTPError as e:
-        print(f"Error downloading data: {e}")
-        print(f"Response body: {data_resp.text}")
-        raise
-    data = data_resp.json()
-
-    if not isinstance(data, list):
-        data = [data] if data else []
-
-    # 4) Filter each job to keep only useful fields
-    keep_fields = {
-        "job_title", "company_name", "job_location", "job_url",
-        "job_summary", "job_seniority_level", "job_employment_type",
-        "job_industries", "job_base_pay_range", "base_salary",
-    }
-
-    results = []
-    for raw_job in data:
-        filtered = {k: v for k, v in raw_job.items() if k in keep_fields}
-        if filtered:
-            results.append(filtered)
-
-    return results
+    Args:
+        keyword (str): The search query (e.g. "python developer").
+        archive (ArchiveWriter): Also writes each job into this archive as it arrives.
+        dedup (NearDuplicateIndex): Skips reposts of postings this index has already seen.
+
+    Yields:
+        dict: Each matching job listing, filtered like `search_jobs`.
+    """
+    dataset_id = require_dataset_id("BRIGHTDATA_JOB_DATASET_ID")
+    client = get_client()
+
+    snapshot_id = client.trigger(dataset_id, [{"url": build_search_url(keyword)}])
+    client.wait(snapshot_id, dataset="search")
+    jobs = indexed(_iter_filtered(client.iter_download(snapshot_id)))
+    if dedup is not None:
+        jobs = dedup.iter_unique(jobs)
+    yield from archived(jobs, archive)
+
+
+def search_jobs_many(
+    queries: Iterable[SearchQuery | str],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    stream: bool = False,
+    archive: ArchiveWriter | None = None,
+    dedup: NearDuplicateIndex | None = None,
+) -> dict[SearchQuery, list[dict] | dict]:
+    """
+    Runs many job searches, packing up to `chunk_size` search URLs into each
+    trigger and polling all the snapshots together.
+
+    A posting found by several queries is merged into one dict, shared by
+    each of their result lists, whose "queries" key lists every query that
+    found it (see `SearchQuery.as_dict`). Jobs are added to the job index
+    but the result cache is not used.
+
+    Args:
+        queries (Iterable[SearchQuery | str]): The searches; plain strings are keywords.
+        chunk_size (int): Maximum number of searches per Bright Data trigger.
+        stream (bool): Download snapshots as JSON lines, filtering jobs as they arrive.
+        archive (ArchiveWriter): Also writes the jobs found into this archive, keyed by job URL.
+        dedup (NearDuplicateIndex): Drops reposts of postings this index has already seen.
+
+    Returns:
+        dict[SearchQuery, list[dict] | dict]: Maps each query to its jobs, or to
+        `{"error": ..., "error_code": ...}` if its search failed.
+    """
+    queries = [query if isinstance(query, SearchQuery) else SearchQuery(query) for query in queries]
+    # Identical searches share one scrape
+    by_key: dict[str, list[SearchQuery]] = {}
+    for query in queries:
+        by_key.setdefault(_search_key(query.url()), []).append(query)
+    urls = [group[0].url() for group in by_key.values()]
+
+    results: dict[SearchQuery, list[dict] | dict] = {}
+    postings: dict[str, dict] = {}
+
+    def attribute(job: dict, found_by: list[SearchQuery]) -> dict:
+        key = job_id(job["job_url"]) if job.get("job_url") else f"#{len(postings)}"
+        posting = postings.get(key)
+        if posting is None:
+            posting = postings[key] = {**job, "queries": []}
+        else:
+            # Copies from different searches may each lack some fields
+            posting.update({field: value for field, value in job.items() if posting.get(field) in (None, "", [])})
+        posting["queries"] += [query.as_dict() for query in found_by if query.as_dict() not in posting["queries"]]
+        return posting
+
+    for chunk, records, error in iter_snapshots(urls, "BRIGHTDATA_JOB_DATASET_ID", chunk_size, "search", stream):
+        keys = [_search_key(url) for url in chunk]
+        if error is not None:
+            results.update((query, error) for key in keys for query in by_key[key])
+            continue
+
+        found: dict[str, list[dict]] = {key: [] for key in keys}
+        errors: dict[str, dict] = {}
+        filter_time = 0.0
+        unattributed = 0
+        for record in records:
+            url = record_input_url(record)
+            key = _search_key(url) if url else None
+            if key not in found:
+                # Without its input URL a record can only be attributed in a single-search snapshot
+                if len(keys) != 1:
+                    unattributed += 1
+                    continue
+                key = keys[0]
+            if not isinstance(record, dict):
+                continue
+            if record.get("error"):
+                errors.setdefault(key, {"error": record["error"], "error_code": record.get("error_code")})
+                continue
+            started = time.perf_counter()
+            job = filter_search_job(record)
+            filter_time += time.perf_counter() - started
+            if job:
+                found[key].append(job)
+        get_metrics().record("filter", filter_time, dataset="search")
+        if unattributed:
+            get_metrics().count("brightdata_unattributed_records_total", unattributed, dataset="search")
+
+        for key, jobs in found.items():
+            merged = list({id(posting): posting for posting in (attribute(job, by_key[key]) for job in jobs)}.values())
+            for query in by_key[key]:
+                results[query] = merged if merged or key not in errors else errors[key]
+
+    if dedup is not None:
+        reposts = {id(posting) for posting in postings.values() if dedup.add(posting) is not None}
+        for query, jobs in results.items():
+            if isinstance(jobs, list):
+                results[query] = [job for job in jobs if id(job) not in reposts]
+        postings = {key: posting for key, posting in postings.items() if id(posting) not in reposts}
+
+    # The index and archive hold the postings themselves, not which searches found them
+    plain = [{field: value for field, value in posting.items() if field != "queries"} for posting in postings.values()]
+    index_jobs((None, job) for job in plain)
+    if archive is not None:
+        archive.add_many((None, job) for job in plain)
+    return {query: results[query] for query in queries}
+
+
+def search_new_jobs(
+    keyword: str,
+    per_keyword: bool = False,
+    stream: bool = False,
+    index: SeenJobsIndex | None = None,
+) -> list[dict]:
+    """
+    Searches for LinkedIn job listings, returning only postings not seen before
+    or edited since they were last seen.
+
+    Postings are tracked across keywords in the seen-jobs index, so a posting
+    found by one keyword is not reported again by another.
+
+    Args:
+        keyword (str): The search query (e.g. "python developer").
+        per_keyword (bool): Report postings new to this keyword even if another
+            keyword already returned them.
+        stream (bool): Stream the snapshot instead of downloading it whole.
+        index (SeenJobsIndex): Defaults to the index at BRIGHTDATA_SEEN_JOBS_PATH.
+
+    Returns:
+        list[dict]: The new or changed job listings.
+    """
+    if index is None:
+        index = get_seen_jobs()
+    # The local index only holds postings already fetched, so always scrape here
+    jobs = iter_search_jobs(keyword) if stream else search_jobs(keyword, use_index=False)
+    return index.update(jobs, keyword=keyword, per_keyword=per_keyword)
+
+
+async def async_search_jobs(keyword: str, scheduler: SnapshotScheduler | None = None) -> list[dict]:
+    """
+    Searches for LinkedIn job listings without blocking the event loop.
+
+    Args:
+        keyword (str): The search query (e.g. "python developer").
+        scheduler (SnapshotScheduler): Shares polling with other pending fetches;
+            defaults to the scheduler of the running loop.
+
+    Returns:
+        list[dict]: The matching job listings, identical to `search_jobs`.
+    """
+    indexed_jobs = search_index(keyword)
+    if indexed_jobs is not None:
+        return indexed_jobs
+
+    dataset_id = require_dataset_id("BRIGHTDATA_JOB_DATASET_ID")
+    scheduler = scheduler or get_scheduler()
+
+    async def fetch() -> list[dict]:
+        data = await scheduler.collect(dataset_id, [{"url": build_search_url(keyword)}], dataset="search")
+        with get_metrics().span("filter", dataset="search"):
+            jobs = filter_search_results(data)
+        index_jobs((None, job) for job in jobs)
+        return jobs
+
+    return await async_cached_fetch("search", keyword, fetch)
 
 
 if __name__ == "__main__":
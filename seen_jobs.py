@@ -0,0 +1,240 @@
+import hashlib
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Iterable
+
+from config import load_env
+from urls import normalize_url
+
+load_env()
+
+DEFAULT_PATH = ".cache/seen_jobs.sqlite"
+DEFAULT_CAPACITY = 1_000_000
+DEFAULT_ERROR_RATE = 0.01
+# Updates that add ids between writes of the Bloom filter; a crash in between only costs a rebuild
+BLOOM_SAVE_EVERY = 100
+
+# LinkedIn job URLs carry the posting id either in the path or as currentJobId
+_JOB_ID_PATTERNS = (
+    re.compile(r"/jobs/view/(?:[^/?#]*-)?(\d+)"),
+    re.compile(r"[?&]currentJobId=(\d+)"),
+)
+
+# Fields that identify a posting rather than describe it, so they don't count as edits
+_IDENTITY_FIELDS = {"job_url"}
+
+
+def job_id(url: str) -> str:
+    """
+    Returns the LinkedIn posting id of a job URL, or the normalized URL when
+    no id can be found, so tracking parameters don't make a posting look new.
+    """
+    for pattern in _JOB_ID_PATTERNS:
+        match = pattern.search(url)
+        if match:
+            return match.group(1)
+    return normalize_url(url)
+
+
+def content_hash(job: dict) -> int:
+    """A 64-bit hash of a posting's content, used to detect edited postings."""
+    content = {k: v for k, v in job.items() if k not in _IDENTITY_FIELDS}
+    encoded = json.dumps(content, sort_keys=True, ensure_ascii=False).encode()
+    return int.from_bytes(hashlib.blake2b(encoded, digest_size=8).digest(), "big", signed=True)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings, using double hashing."""
+
+    def __init__(self, capacity: int, error_rate: float = DEFAULT_ERROR_RATE, bits: bytes | None = None):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray(bits) if bits is not None else bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, key: str) -> None:
+        bits = self.bits
+        for pos in self._positions(key):
+            bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key: str) -> bool:
+        bits = self.bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class SeenJobsIndex:
+    """
+    On-disk index of job postings already returned by searches.
+
+    Postings are keyed by their LinkedIn job id and store a hash of their
+    content, so a posting is reported again only when it has been edited.
+    The exact store is SQLite; a Bloom filter in front of it answers most
+    lookups for postings never seen before without touching the database.
+    The filter is saved every `BLOOM_SAVE_EVERY` updates that add ids and on
+    `close`, rebuilt from the table if it falls out of step with it (as after
+    a crash between saves), and grown once it holds more than `capacity` ids.
+    """
+
+    def __init__(self, path: str | None = None, capacity: int | None = None):
+        self.path = path or os.environ.get("BRIGHTDATA_SEEN_JOBS_PATH", DEFAULT_PATH)
+        capacity = capacity or int(os.environ.get("BRIGHTDATA_SEEN_JOBS_CAPACITY", DEFAULT_CAPACITY))
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " job_id TEXT PRIMARY KEY, hash INTEGER NOT NULL,"
+            " first_seen REAL NOT NULL, last_changed REAL NOT NULL) WITHOUT ROWID;"
+            "CREATE TABLE IF NOT EXISTS keyword_jobs ("
+            " keyword TEXT NOT NULL, job_id TEXT NOT NULL,"
+            " PRIMARY KEY (keyword, job_id)) WITHOUT ROWID;"
+            "CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value) WITHOUT ROWID;"
+        )
+        self._count = self._db.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+        self._bloom = self._load_bloom(max(capacity, self._count * 2))
+        self._unsaved = 0
+
+    def _load_bloom(self, capacity: int) -> BloomFilter:
+        meta = dict(self._db.execute("SELECT name, value FROM meta"))
+        if meta.get("bloom_count") == self._count and meta.get("bloom_capacity", 0) >= self._count:
+            return BloomFilter(meta["bloom_capacity"], bits=meta["bloom"])
+
+        bloom = BloomFilter(capacity)
+        for (seen_id,) in self._db.execute("SELECT job_id FROM jobs"):
+            bloom.add(seen_id)
+        return bloom
+
+    def _save_bloom(self) -> None:
+        self._db.executemany(
+            "INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)",
+            [("bloom", bytes(self._bloom.bits)), ("bloom_count", self._count),
+             ("bloom_capacity", self._bloom.capacity)],
+        )
+
+    def update(self, jobs: Iterable[dict], keyword: str | None = None, per_keyword: bool = False) -> list[dict]:
+        """
+        Records a batch of postings and returns the ones that are new or changed.
+
+        Args:
+            jobs (Iterable[dict]): Filtered search results, each with a "job_url".
+            keyword (str): The search keyword, recorded against each posting.
+            per_keyword (bool): Also report postings already seen under other
+                keywords the first time this keyword returns them.
+
+        Returns:
+            list[dict]: The new or edited postings, in input order. A posting
+            listed twice in the batch is considered once.
+        """
+        keyword = " ".join(keyword.lower().split()) if keyword else None
+        entries: dict[str, tuple[dict, int]] = {}
+        for job in jobs:
+            url = job.get("job_url")
+            if url:
+                key = job_id(url)
+                if key not in entries:
+                    entries[key] = (job, content_hash(job))
+
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                # Only ids the filter may have seen need a lookup
+                maybe_seen = [key for key in entries if key in self._bloom]
+                stored = dict(self._select_in("SELECT job_id, hash FROM jobs WHERE job_id IN ({})", maybe_seen))
+                new = [key for key in entries if key not in stored]
+                edited = [key for key in stored if stored[key] != entries[key][1]]
+
+                self._db.executemany(
+                    "INSERT INTO jobs (job_id, hash, first_seen, last_changed) VALUES (?, ?, ?, ?)",
+                    [(key, entries[key][1], now, now) for key in new],
+                )
+                self._db.executemany(
+                    "UPDATE jobs SET hash = ?, last_changed = ? WHERE job_id = ?",
+                    [(entries[key][1], now, key) for key in edited],
+                )
+                changed = set(new).union(edited)
+
+                if keyword is not None:
+                    if per_keyword:
+                        listed = {key for (key,) in self._select_in(
+                            "SELECT job_id FROM keyword_jobs WHERE keyword = ? AND job_id IN ({})", list(entries), (keyword,)
+                        )}
+                        changed.update(key for key in entries if key not in listed)
+                    self._db.executemany(
+                        "INSERT OR IGNORE INTO keyword_jobs (keyword, job_id) VALUES (?, ?)",
+                        [(keyword, key) for key in entries],
+                    )
+
+                for key in new:
+                    self._bloom.add(key)
+                self._count += len(new)
+                if self._count > self._bloom.capacity:
+                    self._bloom = self._load_bloom(self._count * 2)
+                if new:
+                    self._unsaved += 1
+                    if self._unsaved >= BLOOM_SAVE_EVERY:
+                        self._save_bloom()
+                        self._unsaved = 0
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                # The filter may hold ids that were rolled back; that only costs extra lookups
+                self._count = self._db.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+                raise
+        return [job for key, (job, _) in entries.items() if key in changed]
+
+    def _select_in(self, sql: str, keys: list[str], params: tuple = ()) -> list[tuple]:
+        # Stay under SQLite's bound-parameter limit
+        rows = []
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            rows += self._db.execute(sql.format(",".join("?" * len(chunk))), (*params, *chunk)).fetchall()
+        return rows
+
+    def __contains__(self, url: str) -> bool:
+        key = job_id(url)
+        if key not in self._bloom:
+            return False
+        with self._lock:
+            return self._db.execute("SELECT 1 FROM jobs WHERE job_id = ?", (key,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def close(self) -> None:
+        with self._lock:
+            if self._unsaved:
+                self._save_bloom()
+                self._unsaved = 0
+            self._db.close()
+
+
+_index: SeenJobsIndex | None = None
+_index_lock = threading.Lock()
+
+
+def get_seen_jobs() -> SeenJobsIndex:
+    """Returns the process-wide index at BRIGHTDATA_SEEN_JOBS_PATH."""
+    global _index
+    path = os.environ.get("BRIGHTDATA_SEEN_JOBS_PATH", DEFAULT_PATH)
+    with _index_lock:
+        if _index is None or _index.path != path:
+            _index = SeenJobsIndex(path)
+        return _index
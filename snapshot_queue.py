@@ -0,0 +1,353 @@
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import sys
+import time
+from dataclasses import dataclass
+from typing import Iterable, Iterator
+
+from brightdata_batch import DEFAULT_CHUNK_SIZE, match_records
+from brightdata_client import SnapshotFailed, get_client, require_dataset_id
+from config import load_env
+from get_job_listing import filter_job_data
+from get_linkedin_profile import filter_profile_data
+from polling import PollTimeoutError
+from search_jobs import build_search_url, filter_search_results
+from urls import normalize_url
+
+load_env()
+
+DEFAULT_QUEUE_PATH = ".cache/queue.sqlite"
+DEFAULT_MAX_ATTEMPTS = 3
+
+# Dataset, filter and poll label for every kind of job
+KINDS = {
+    "profile": ("BRIGHTDATA_PROFILE_DATASET_ID", filter_profile_data, "profile_batch"),
+    "job": ("BRIGHTDATA_JOB_DATASET_ID", filter_job_data, "job_batch"),
+    "search": ("BRIGHTDATA_JOB_DATASET_ID", None, "search"),
+}
+
+
+@dataclass
+class QueuedJob:
+    id: int
+    kind: str
+    url: str
+    snapshot_id: str | None
+    attempts: int
+
+
+class SnapshotQueue:
+    """
+    SQLite-backed queue of scrape jobs that survives crashes and restarts.
+
+    Every job moves through pending -> triggered -> done / failed. The
+    snapshot id is committed as soon as a trigger returns, so a worker that
+    dies while polling leaves a "triggered" job that the next worker resumes
+    by polling the same snapshot instead of paying for a new scrape. Workers
+    hold a lease on the jobs they claim; leases of dead workers on this host
+    are released on start-up, and any other lease simply expires.
+    """
+
+    def __init__(self, path: str | None = None, max_attempts: int | None = None, lease_seconds: float | None = None):
+        self.path = path or os.environ.get("BRIGHTDATA_QUEUE_PATH", DEFAULT_QUEUE_PATH)
+        self.max_attempts = max_attempts or int(os.environ.get("BRIGHTDATA_QUEUE_MAX_ATTEMPTS", DEFAULT_MAX_ATTEMPTS))
+        self.lease_seconds = lease_seconds or float(os.environ.get("BRIGHTDATA_QUEUE_LEASE", 2400))
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id INTEGER PRIMARY KEY,"
+            " kind TEXT NOT NULL, url TEXT NOT NULL, key TEXT NOT NULL,"
+            " snapshot_id TEXT, state TEXT NOT NULL DEFAULT 'pending',"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " result TEXT, error TEXT,"
+            " lease_owner TEXT, lease_until REAL,"
+            " created REAL NOT NULL, updated REAL NOT NULL,"
+            " UNIQUE (kind, key))"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, kind)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_snapshot ON jobs (snapshot_id)")
+
+    def close(self) -> None:
+        self._db.close()
+
+    def enqueue(self, kind: str, urls: Iterable[str]) -> int:
+        """Adds jobs, skipping any URL (or keyword) already queued. Returns how many were added."""
+        if kind not in KINDS:
+            raise ValueError(f"Unknown job kind: {kind!r}")
+        now = time.time()
+        rows = [(kind, url, _job_key(kind, url), now, now) for url in urls if url.strip()]
+        before = self._db.total_changes
+        self._db.executemany(
+            "INSERT OR IGNORE INTO jobs (kind, url, key, created, updated) VALUES (?, ?, ?, ?, ?)", rows
+        )
+        return self._db.total_changes - before
+
+    def claim(self, owner: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> list[QueuedJob]:
+        """
+        Leases the next unit of work: every job of one triggered snapshot that
+        needs resuming, or else up to `chunk_size` pending jobs of one kind.
+        """
+        now = time.time()
+        free = "(lease_until IS NULL OR lease_until < ?)"
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            row = self._db.execute(
+                f"SELECT snapshot_id FROM jobs WHERE state = 'triggered' AND {free} LIMIT 1", (now,)
+            ).fetchone()
+            if row:
+                rows = self._db.execute(
+                    "SELECT id, kind, url, snapshot_id, attempts FROM jobs WHERE state = 'triggered' AND snapshot_id = ?",
+                    (row[0],),
+                ).fetchall()
+            else:
+                row = self._db.execute(
+                    f"SELECT kind FROM jobs WHERE state = 'pending' AND {free} ORDER BY id LIMIT 1", (now,)
+                ).fetchone()
+                if row is None:
+                    self._db.execute("COMMIT")
+                    return []
+                # Search results can't be told apart per keyword, so each gets its own trigger
+                limit = 1 if row[0] == "search" else chunk_size
+                rows = self._db.execute(
+                    f"SELECT id, kind, url, snapshot_id, attempts FROM jobs"
+                    f" WHERE state = 'pending' AND kind = ? AND {free} ORDER BY id LIMIT ?",
+                    (row[0], now, limit),
+                ).fetchall()
+
+            # Resuming a snapshot counts as an attempt too, so a job that keeps crashing workers gives up
+            self._db.executemany(
+                "UPDATE jobs SET attempts = attempts + 1, lease_owner = ?, lease_until = ?, updated = ? WHERE id = ?",
+                [(owner, now + self.lease_seconds, now, r[0]) for r in rows],
+            )
+            self._db.execute("COMMIT")
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        return [QueuedJob(id, kind, url, snapshot_id, attempts + 1) for id, kind, url, snapshot_id, attempts in rows]
+
+    def mark_triggered(self, jobs: list[QueuedJob], snapshot_id: str) -> None:
+        self._db.executemany(
+            "UPDATE jobs SET state = 'triggered', snapshot_id = ?, updated = ? WHERE id = ?",
+            [(snapshot_id, time.time(), job.id) for job in jobs],
+        )
+        for job in jobs:
+            job.snapshot_id = snapshot_id
+
+    def complete(self, job: QueuedJob, result) -> None:
+        self._finish(job, "done", result=json.dumps(result, ensure_ascii=False))
+
+    def fail(self, job: QueuedJob, error: str) -> None:
+        self._finish(job, "failed", error=error)
+
+    def _finish(self, job: QueuedJob, state: str, result: str | None = None, error: str | None = None) -> None:
+        self._db.execute(
+            "UPDATE jobs SET state = ?, result = ?, error = ?, lease_owner = NULL, lease_until = NULL, updated = ?"
+            " WHERE id = ?",
+            (state, result, error, time.time(), job.id),
+        )
+
+    def retry(self, jobs: list[QueuedJob], error: str, retrigger: bool) -> None:
+        """
+        Releases jobs for another attempt, or fails those out of attempts.
+
+        With `retrigger` the snapshot is dropped and the jobs go back to
+        pending; otherwise the next worker keeps polling the same snapshot.
+        """
+        now = time.time()
+        for job in jobs:
+            if job.attempts >= self.max_attempts:
+                self.fail(job, error)
+                continue
+            if retrigger:
+                self._db.execute(
+                    "UPDATE jobs SET state = 'pending', snapshot_id = NULL, error = ?,"
+                    " lease_owner = NULL, lease_until = NULL, updated = ? WHERE id = ?",
+                    (error, now, job.id),
+                )
+            else:
+                self._db.execute(
+                    "UPDATE jobs SET error = ?, lease_owner = NULL, lease_until = NULL, updated = ? WHERE id = ?",
+                    (error, now, job.id),
+                )
+
+    def release_dead_leases(self) -> int:
+        """Frees leases held by worker processes on this host that no longer exist."""
+        host = socket.gethostname()
+        released = 0
+        owners = self._db.execute("SELECT DISTINCT lease_owner FROM jobs WHERE lease_owner IS NOT NULL").fetchall()
+        for (owner,) in owners:
+            owner_host, _, pid = owner.rpartition(":")
+            if owner_host != host or not pid.isdigit() or _pid_alive(int(pid)):
+                continue
+            cursor = self._db.execute(
+                "UPDATE jobs SET lease_owner = NULL, lease_until = NULL WHERE lease_owner = ?", (owner,)
+            )
+            released += cursor.rowcount
+        return released
+
+    def counts(self) -> dict[str, int]:
+        return dict(self._db.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall())
+
+    def results(self, kind: str | None = None) -> Iterator[dict]:
+        """Yields `{"kind", "url", "result"}` for finished jobs and `{"kind", "url", "error"}` for failed ones."""
+        query = "SELECT kind, url, state, result, error FROM jobs WHERE state IN ('done', 'failed')"
+        params: tuple = ()
+        if kind:
+            query += " AND kind = ?"
+            params = (kind,)
+        for job_kind, url, state, result, error in self._db.execute(query + " ORDER BY id", params):
+            if state == "done":
+                yield {"kind": job_kind, "url": url, "result": json.loads(result)}
+            else:
+                yield {"kind": job_kind, "url": url, "error": error}
+
+    def process(self, jobs: list[QueuedJob], stream: bool = False) -> None:
+        """Triggers (unless resuming), waits for and stores the results of one claimed unit."""
+        # Already loaded by the client; imported here so enqueueing and reading results never load it
+        import requests
+
+        kind = jobs[0].kind
+        dataset_env, filter_fn, label = KINDS[kind]
+        finished: set[int] = set()
+
+        try:
+            client = get_client()
+            snapshot_id = jobs[0].snapshot_id
+            if snapshot_id is None:
+                if kind == "search":
+                    payload = [{"url": build_search_url(jobs[0].url)}]
+                else:
+                    payload = [{"url": job.url} for job in jobs]
+                snapshot_id = client.trigger(require_dataset_id(dataset_env), payload)
+                self.mark_triggered(jobs, snapshot_id)
+
+            client.wait(snapshot_id, dataset=label)
+            records = client.iter_download(snapshot_id) if stream else client.download(snapshot_id)
+
+            if kind == "search":
+                self.complete(jobs[0], filter_search_results(records))
+                finished.add(jobs[0].id)
+                return
+
+            by_key: dict[str, list[QueuedJob]] = {}
+            for job in jobs:
+                by_key.setdefault(_job_key(kind, job.url), []).append(job)
+            for key, result in match_records(list(by_key), records, filter_fn):
+                for job in by_key[key]:
+                    if "error" in result:
+                        self.fail(job, result["error"])
+                    else:
+                        self.complete(job, result)
+                    finished.add(job.id)
+        except SnapshotFailed as e:
+            self.retry(jobs, str(e), retrigger=True)
+        except (PollTimeoutError, requests.exceptions.RequestException) as e:
+            self.retry([job for job in jobs if job.id not in finished], str(e), retrigger=False)
+        except Exception as e:
+            # Anything else (no snapshot id, missing credentials, a bad record) still counts as an
+            # attempt, so the unit ends up failed instead of crashing every worker that claims it
+            self.retry([job for job in jobs if job.id not in finished], repr(e), retrigger=True)
+
+
+def _job_key(kind: str, url: str) -> str:
+    if kind == "search":
+        return " ".join(url.lower().split())
+    return normalize_url(url)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def run_worker(path: str | None = None, chunk_size: int = DEFAULT_CHUNK_SIZE, stream: bool = False, idle_exit: bool = True) -> None:
+    """Processes queued jobs until the queue is drained (or forever without `idle_exit`)."""
+    queue = SnapshotQueue(path)
+    owner = f"{socket.gethostname()}:{os.getpid()}"
+    try:
+        while True:
+            jobs = queue.claim(owner, chunk_size)
+            if not jobs:
+                if idle_exit:
+                    return
+                time.sleep(5)
+                continue
+            queue.process(jobs, stream)
+    finally:
+        queue.close()
+
+
+def run_workers(processes: int, path: str | None = None, chunk_size: int = DEFAULT_CHUNK_SIZE, stream: bool = False, idle_exit: bool = True) -> None:
+    """Runs `processes` worker processes against one queue and waits for them."""
+    queue = SnapshotQueue(path)
+    released = queue.release_dead_leases()
+    queue.close()
+    if released:
+        print(f"Resuming {released} job(s) left behind by stopped workers")
+
+    if processes <= 1:
+        run_worker(path, chunk_size, stream, idle_exit)
+        return
+
+    workers = [
+        multiprocessing.Process(target=run_worker, args=(path, chunk_size, stream, idle_exit), name=f"scrapbook-worker-{i}")
+        for i in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Durable Bright Data scrape queue")
+    parser.add_argument("--queue", help=f"Queue database (default: $BRIGHTDATA_QUEUE_PATH or {DEFAULT_QUEUE_PATH})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    enqueue = commands.add_parser("enqueue", help="Queue URLs (or keywords) read from a file or stdin")
+    enqueue.add_argument("kind", choices=sorted(KINDS))
+    enqueue.add_argument("file", nargs="?", default="-")
+
+    work = commands.add_parser("work", help="Run worker processes until the queue is drained")
+    work.add_argument("-p", "--processes", type=int, default=os.cpu_count() or 1)
+    work.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    work.add_argument("--stream", action="store_true", help="Download snapshots as JSON lines")
+    work.add_argument("--forever", action="store_true", help="Keep waiting for new jobs")
+
+    commands.add_parser("status", help="Show job counts per state")
+
+    export = commands.add_parser("export", help="Write finished results as JSON lines")
+    export.add_argument("--kind", choices=sorted(KINDS))
+
+    args = parser.parse_args(argv)
+
+    if args.command == "enqueue":
+        source = sys.stdin if args.file == "-" else open(args.file, encoding="utf-8")
+        with source:
+            added = SnapshotQueue(args.queue).enqueue(args.kind, (line.strip() for line in source))
+        print(f"Queued {added} new {args.kind} job(s)")
+    elif args.command == "work":
+        run_workers(args.processes, args.queue, args.chunk_size, args.stream, not args.forever)
+    elif args.command == "status":
+        print(json.dumps(SnapshotQueue(args.queue).counts(), indent=2))
+    elif args.command == "export":
+        for row in SnapshotQueue(args.queue).results(args.kind):
+            print(json.dumps(row, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,18 @@
 import os
 import json
 import base64
-from dotenv import load_dotenv
-from composio import ComposioToolSet, App, Action
-
-load_dotenv()
+from config import get_config
+from pdf_service import build_params, resolve_pdf_action
 
 def test_toolkits():
-    if not os.environ.get("COMPOSIO_API_KEY"):
+    if not get_config().composio_api_key:
         print("❌ Error: COMPOSIO_API_KEY not found in environment.")
         print("Please add 'COMPOSIO_API_KEY=your_key_here' to your .env file.")
         return
 
     print("Initialize Composio toolset...")
+    # Imported only once there is a key to use it with
+    from composio import App, ComposioToolSet
     toolset = ComposioToolSet()
     
     html_path = "assets/resume.html"
@@ -30,63 +30,32 @@ def test_toolkits():
         print(f"🚀 Testing {app.name}")
         print("="*40)
         try:
-            # The `get_actions` method does not exist in new Composio SDK versions.
-            # Instead we should use `get_action_schemas` to find them, or just get them by App name.
+            # Action discovery is cached (see PDF_ACTION_CACHE), so later runs skip the schema calls.
+            # The `get_actions` method does not exist in new Composio SDK versions, so
+            # discovery goes through `get_action_schemas`.
             try:
-                schemas = toolset.get_action_schemas(apps=[app])
+                resolved = resolve_pdf_action(app.name, lambda: toolset)
+            except LookupError as e:
+                print(f"⚠️ Could not find an HTML to PDF action for {app.name}.")
+                print(e)
+                continue
             except Exception as e:
                 print(f"⚠️ Error fetching schemas for {app.name}: {e}")
                 continue
 
-            html_to_pdf_action_name = None
-            schema_for_action = None
-
-            # Find the action matching html and pdf
-            for schema in schemas:
-                name = schema.get("name", "").lower()
-                if "html" in name and "pdf" in name:
-                    html_to_pdf_action_name = schema.get("name")
-                    schema_for_action = schema
-                    break
-            
-            if not html_to_pdf_action_name:
-                print(f"⚠️ Could not find an HTML to PDF action for {app.name}.")
-                print(f"Available actions: {[s.get('name') for s in schemas]}")
-                continue
-                
+            html_to_pdf_action_name = resolved["action"]
             print(f"✅ Found action: {html_to_pdf_action_name}")
             
             # Show parameters
-            params_schema = schema_for_action.get("parameters", {})
+            params_schema = resolved["parameters"]
             print("\n📝 Expected Parameters Schema:")
             print(json.dumps(params_schema, indent=2))
             
-            # Try to build payload dynamically based on schema properties
-            params = {}
-            if params_schema and 'properties' in params_schema:
-                props = params_schema['properties']
-                # Common payload keys
-                for key in ['html', 'htmlCode', 'source', 'html_content', 'content']:
-                    if key in props:
-                        params[key] = html_content
-                        # Add a dummy name if required
-                        if 'name' in props:
-                            params['name'] = f"test_{app.name.lower()}.pdf"
-                        if 'fileName' in props:
-                            params['fileName'] = f"test_{app.name.lower()}.pdf"
-                        break
-                
-                # If API2PDF specific
-                if app == App.API2PDF and 'html' in props:
-                    params['html'] = html_content
-                
-                # Let's see if we successfully mapped
-                if not params:
-                    print(f"⚠️ Warning: Could not automatically map parameters. Keys found: {list(props.keys())}")
-                    # We will try a fallback with 'html' anyway
-                    params['html'] = html_content
-            else:
-                params['html'] = html_content
+            # Build the payload from the schema properties (falls back to 'html')
+            mapping = resolved["mapping"]
+            if mapping["html_key"] not in params_schema.get("properties", {}):
+                print(f"⚠️ Warning: Could not automatically map parameters. Keys found: {list(params_schema.get('properties', {}).keys())}")
+            params = build_params(mapping, html_content, f"test_{app.name}")
 
             print(f"\n⚙️ Executing {html_to_pdf_action_name}...")
             
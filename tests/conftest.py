@@ -0,0 +1,25 @@
+import pytest
+import brightdata_client
+import ratelimit
+from brightdata_client import BrightDataClient
+from fake_brightdata import FakeBrightData, FakeSettings
+from polling import FixedPolling
+
+@pytest.fixture(autouse=True)
+def fresh_rate_limiter(monkeypatch):
+    # Every test starts with full token buckets and no backoff
+    monkeypatch.delenv("BRIGHTDATA_RATE_LIMIT_PATH", raising=False)
+    monkeypatch.setattr(ratelimit, "_limiter", None)
+
+@pytest.fixture
+def fake_brightdata(monkeypatch):
+    # The local Bright Data stand-in, with the process-wide client polling it every 10 ms; tweak server.settings per test
+    monkeypatch.setenv("BRIGHTDATA_API_TOKEN", "fake_token")
+    monkeypatch.setenv("BRIGHTDATA_PROFILE_DATASET_ID", "fake_profile_id")
+    monkeypatch.setenv("BRIGHTDATA_JOB_DATASET_ID", "fake_job_id")
+    with FakeBrightData(FakeSettings(ready_after=0.02, payload_bytes=200, search_results=3)) as server:
+        monkeypatch.setenv("BRIGHTDATA_BASE_URL", server.base_url)
+        client = BrightDataClient(poll_strategy=FixedPolling(0.01))
+        monkeypatch.setattr(brightdata_client, "_client", client)
+        yield server
+        client.close()
@@ -0,0 +1,150 @@
+import json
+import os
+import threading
+import pytest
+import archive
+from archive import DATA_FILE, ArchiveReader, ArchiveWriter, compact
+from get_linkedin_profile import get_linkedin_profiles
+from main import main
+from search_jobs import iter_search_jobs
+
+@pytest.fixture(autouse=True)
+def no_cache(monkeypatch):
+    monkeypatch.delenv("BRIGHTDATA_CACHE_PATH", raising=False)
+    monkeypatch.delenv("BRIGHTDATA_JOB_INDEX_PATH", raising=False)
+
+def profile_url(i):
+    return f"https://www.linkedin.com/in/archived-{i}"
+
+def test_lookup_and_iteration(tmp_path):
+    path = str(tmp_path / "profiles")
+    with ArchiveWriter(path, block_records=7) as writer:
+        for i in range(50):
+            writer.add(profile_url(i), {"name": f"Person {i}"})
+
+    with ArchiveReader(path) as reader:
+        assert len(reader) == 50
+        # Lookups normalize the URL like the batch fetchers do
+        assert reader.get(profile_url(13) + "/?trk=feed") == {"name": "Person 13"}
+        assert reader.get(profile_url(49)) == {"name": "Person 49"}
+        assert reader.get(profile_url(50)) is None
+        assert [url for url, _ in reader] == [profile_url(i) for i in range(50)]
+    # Compressed blocks take far less room than the JSON
+    assert os.path.getsize(os.path.join(path, DATA_FILE)) < len(json.dumps({profile_url(i): {"name": f"Person {i}"} for i in range(50)}))
+
+def test_appends_supersede_and_compact(tmp_path):
+    path = str(tmp_path / "jobs")
+    with ArchiveWriter(path) as writer:
+        assert writer.add_many([(profile_url(1), {"v": 1}), (profile_url(2), {"error": "x"}), (None, {"job_url": profile_url(3), "v": 1})]) == 2
+    with ArchiveWriter(path) as writer:
+        writer.add(profile_url(1), {"v": 2})
+
+    with ArchiveReader(path) as reader:
+        assert reader.get(profile_url(1)) == {"v": 2}
+        assert profile_url(3) in reader and profile_url(2) not in reader
+        assert len(list(reader)) == 3
+
+    compact(path)
+    with ArchiveReader(path) as reader:
+        assert sorted(record["v"] for _, record in reader) == [1, 2]
+        assert reader.get(profile_url(1)) == {"v": 2}
+    assert sorted(os.listdir(path)) == ["LOCK", "SWAP", DATA_FILE, "index-000002.idx"]
+
+def test_interrupted_compaction_is_finished_on_open(tmp_path, monkeypatch):
+    path = str(tmp_path / "jobs")
+    for version in (1, 2):
+        with ArchiveWriter(path) as writer:
+            writer.add_many((profile_url(i), {"v": version}) for i in range(20))
+    # Junk left by a compaction that crashed while building must not leak into the next one
+    os.makedirs(path + ".compacting")
+    with ArchiveWriter(path + ".compacting") as writer:
+        writer.add(profile_url(99), {"v": "stale"})
+
+    replace = os.replace
+    def crash_after_data(src, dst):
+        if src.startswith(path + ".compacted") and dst.endswith(".idx"):
+            raise KeyboardInterrupt
+        replace(src, dst)
+    monkeypatch.setattr(archive.os, "replace", crash_after_data)
+    with pytest.raises(KeyboardInterrupt):
+        compact(path)
+    monkeypatch.setattr(archive.os, "replace", replace)
+
+    # The new data file is in place but its segment is not: opening finishes the swap
+    with ArchiveReader(path) as reader:
+        assert len(reader) == 20 and profile_url(99) not in reader
+        assert all(record == {"v": 2} for _, record in reader)
+    assert not os.path.exists(path + ".compacted") and not os.path.exists(path + ".compacting")
+    assert sorted(os.listdir(path)) == ["LOCK", "SWAP", DATA_FILE, "index-000002.idx"]
+
+def test_reader_waits_for_compaction_swap(tmp_path, monkeypatch):
+    path = str(tmp_path / "jobs")
+    for version in (1, 2):
+        with ArchiveWriter(path) as writer:
+            writer.add_many((profile_url(i), {"v": version}) for i in range(20))
+
+    # Pause the compaction with the new data file in place but not yet its segment
+    paused, resume = threading.Event(), threading.Event()
+    replace = os.replace
+    def pause_after_data(src, dst):
+        if src.startswith(path + ".compacted") and dst.endswith(".idx"):
+            paused.set()
+            resume.wait(5)
+        replace(src, dst)
+    monkeypatch.setattr(archive.os, "replace", pause_after_data)
+    compacting = threading.Thread(target=compact, args=(path,))
+    compacting.start()
+    assert paused.wait(5)
+
+    seen = []
+    def read():
+        with ArchiveReader(path) as reader:
+            seen.extend(record for _, record in reader)
+    reading = threading.Thread(target=read)
+    reading.start()
+    reading.join(0.2)
+    assert reading.is_alive()
+
+    resume.set()
+    compacting.join(5)
+    reading.join(5)
+    assert seen == [{"v": 2}] * 20
+
+def test_uncommitted_blocks_are_invisible_and_dropped(tmp_path):
+    path = str(tmp_path / "profiles")
+    with ArchiveWriter(path) as writer:
+        writer.add(profile_url(1), {"v": 1})
+    committed = os.path.getsize(os.path.join(path, DATA_FILE))
+
+    # A writer that dies after writing a block but before its index segment
+    crashed = ArchiveWriter(path, block_records=1)
+    crashed.add(profile_url(2), {"v": 2})
+    with ArchiveReader(path) as reader:
+        assert reader.get(profile_url(2)) is None
+        assert len(list(reader)) == 1
+    crashed._data.close()
+    crashed._lock_file.close()
+
+    ArchiveWriter(path).close()
+    assert os.path.getsize(os.path.join(path, DATA_FILE)) == committed
+
+def test_fetchers_write_into_archive(fake_brightdata, tmp_path):
+    path = str(tmp_path / "archive")
+    urls = [profile_url(i) for i in range(4)]
+    with ArchiveWriter(path) as writer:
+        profiles = get_linkedin_profiles(urls, chunk_size=2, archive=writer)
+        jobs = list(iter_search_jobs("python", archive=writer))
+
+    with ArchiveReader(path) as reader:
+        assert all(reader.get(url) == profiles[url] for url in urls)
+        assert [reader.get(job["job_url"]) for job in jobs] == jobs
+
+def test_cli_archive(fake_brightdata, tmp_path, capsys):
+    source = tmp_path / "keywords.txt"
+    source.write_text("python\n")
+    path = str(tmp_path / "archive")
+
+    assert main(["search", str(source), "-o", str(tmp_path / "out.jsonl"), "--archive", path]) == 0
+    [row] = [json.loads(line) for line in (tmp_path / "out.jsonl").read_text().splitlines()]
+    with ArchiveReader(path) as reader:
+        assert [record for _, record in reader] == row["result"]
@@ -0,0 +1,59 @@
+import asyncio
+import pytest
+import responses
+from brightdata_async import SnapshotScheduler
+from brightdata_client import BrightDataClient, SnapshotFailed
+from polling import FixedPolling
+from get_job_listing import async_get_job_listing
+from get_linkedin_profile import async_get_linkedin_profile, get_linkedin_profile
+from search_jobs import async_search_jobs
+
+@pytest.fixture(autouse=True)
+def mock_env_vars(monkeypatch):
+    monkeypatch.setenv("BRIGHTDATA_API_TOKEN", "fake_token")
+    monkeypatch.setenv("BRIGHTDATA_JOB_DATASET_ID", "fake_job_id")
+    monkeypatch.setenv("BRIGHTDATA_PROFILE_DATASET_ID", "fake_profile_id")
+
+def add_snapshot(dataset_id, snapshot_id, statuses, records):
+    status_url = f"https://api.brightdata.com/datasets/v3/snapshot/{snapshot_id}"
+    responses.add(
+        responses.POST,
+        f"https://api.brightdata.com/datasets/v3/trigger?dataset_id={dataset_id}",
+        json={"snapshot_id": snapshot_id},
+        status=200,
+    )
+    for status in statuses:
+        responses.add(responses.GET, status_url, json={"status": status}, status=200)
+    responses.add(responses.GET, f"{status_url}?format=json", json=records, status=200)
+
+@responses.activate
+def test_async_results_match_sync():
+    raw = [{"name": "John Doe", "certifications": [{"subtitle": "AWS"}], "followers": 10}]
+    add_snapshot("fake_profile_id", "snap_sync", ["ready"], raw)
+    expected = get_linkedin_profile("https://www.linkedin.com/in/johndoe")
+
+    responses.reset()
+    raw = [{"name": "John Doe", "certifications": [{"subtitle": "AWS"}], "followers": 10}]
+    add_snapshot("fake_profile_id", "snap_async", ["ready"], raw)
+    result = asyncio.run(async_get_linkedin_profile("https://www.linkedin.com/in/johndoe"))
+    assert result == expected == {"name": "John Doe", "certifications": [{"issuer": "AWS"}]}
+
+@responses.activate
+def test_scheduler_runs_snapshots_concurrently():
+    add_snapshot("fake_job_id", "snap_job", ["running", "running", "ready"], [{"job_title": "Engineer", "x": 1}])
+    add_snapshot("fake_job_id", "snap_search", ["running", "ready"], [{"job_title": "Dev", "job_url": "u"}])
+    add_snapshot("fake_profile_id", "snap_fail", ["running", "failed"], [])
+
+    async def run():
+        scheduler = SnapshotScheduler(client=BrightDataClient(), max_concurrency=10, poll_strategy=FixedPolling(0))
+        return await asyncio.gather(
+            async_get_job_listing("https://www.linkedin.com/jobs/view/1", scheduler),
+            async_search_jobs("python developer", scheduler),
+            async_get_linkedin_profile("https://www.linkedin.com/in/ghost", scheduler),
+            return_exceptions=True,
+        )
+
+    job, jobs, failure = asyncio.run(run())
+    assert job == {"job_title": "Engineer"}
+    assert jobs == [{"job_title": "Dev", "job_url": "u"}]
+    assert isinstance(failure, SnapshotFailed)
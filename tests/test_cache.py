@@ -0,0 +1,92 @@
+import threading
+import time
+import pytest
+import responses
+from cache import ResultCache, SingleFlight, cache_key, get_cache
+from get_job_listing import get_job_listings
+from get_linkedin_profile import get_linkedin_profile
+
+@pytest.fixture(autouse=True)
+def mock_env_vars(monkeypatch, tmp_path):
+    monkeypatch.setenv("BRIGHTDATA_API_TOKEN", "fake_token")
+    monkeypatch.setenv("BRIGHTDATA_JOB_DATASET_ID", "fake_job_id")
+    monkeypatch.setenv("BRIGHTDATA_PROFILE_DATASET_ID", "fake_profile_id")
+    monkeypatch.setenv("BRIGHTDATA_CACHE_PATH", str(tmp_path / "cache.sqlite"))
+
+def test_cache_key_normalizes():
+    assert cache_key("profile", "https://WWW.linkedin.com/in/JohnDoe/?trk=x") == cache_key("profile", "https://linkedin.com/in/JohnDoe")
+    assert cache_key("search", "  Python   Developer ") == "python developer"
+
+def test_entries_expire_per_type(tmp_path):
+    cache = ResultCache(str(tmp_path / "ttl.sqlite"), ttls={"profile": 60, "search": 0})
+    cache.set("profile", "a", {"name": "A"})
+    cache.set("search", "python", [{"job_title": "Dev"}])
+    time.sleep(0.01)
+    assert cache.get("profile", "a") == {"name": "A"}
+    assert cache.get("search", "python") is None
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ResultCache(str(tmp_path / "lru.sqlite"), max_entries=10)
+    for i in range(10):
+        cache.set("job", str(i), {"job_title": str(i)})
+    time.sleep(0.01)
+    cache.get("job", "0")
+    cache.set("job", "10", {"job_title": "10"})
+
+    assert len(cache) <= 10
+    assert cache.get("job", "0") is not None
+    assert cache.get("job", "1") is None
+
+@responses.activate
+def test_profile_is_served_from_cache():
+    status_url = "https://api.brightdata.com/datasets/v3/snapshot/snap_cached"
+    responses.add(responses.POST, "https://api.brightdata.com/datasets/v3/trigger?dataset_id=fake_profile_id", json={"snapshot_id": "snap_cached"})
+    responses.add(responses.GET, status_url, json={"status": "ready"})
+    responses.add(responses.GET, f"{status_url}?format=json", json=[{"name": "John Doe", "followers": 5}])
+
+    first = get_linkedin_profile("https://www.linkedin.com/in/johndoe/")
+    second = get_linkedin_profile("https://linkedin.com/in/johndoe")
+    assert first == second == {"name": "John Doe"}
+    assert len(responses.calls) == 3
+
+@responses.activate
+def test_batch_only_fetches_misses():
+    status_url = "https://api.brightdata.com/datasets/v3/snapshot/snap_misses"
+    responses.add(
+        responses.POST,
+        "https://api.brightdata.com/datasets/v3/trigger?dataset_id=fake_job_id",
+        json={"snapshot_id": "snap_misses"},
+        match=[responses.matchers.json_params_matcher([{"url": "https://www.linkedin.com/jobs/view/2"}])],
+    )
+    responses.add(responses.GET, status_url, json={"status": "ready"})
+    responses.add(responses.GET, f"{status_url}?format=json", json=[{"url": "https://www.linkedin.com/jobs/view/2", "job_title": "B"}])
+
+    get_cache().set("job", cache_key("job", "https://www.linkedin.com/jobs/view/1"), {"job_title": "A"})
+
+    result = get_job_listings(["https://www.linkedin.com/jobs/view/1", "https://www.linkedin.com/jobs/view/2"])
+    assert result == {
+        "https://www.linkedin.com/jobs/view/1": {"job_title": "A"},
+        "https://www.linkedin.com/jobs/view/2": {"job_title": "B"},
+    }
+
+def test_single_flight_shares_one_call():
+    flight = SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def fetch():
+        calls.append(1)
+        release.wait(1)
+        return {"name": "John Doe"}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do(("profile", "john"), fetch))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [{"name": "John Doe"}] * 5
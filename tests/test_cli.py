@@ -0,0 +1,71 @@
+import json
+import pytest
+from main import JsonlOutput, main
+
+@pytest.fixture(autouse=True)
+def fake_api(fake_brightdata, monkeypatch):
+    monkeypatch.delenv("BRIGHTDATA_CACHE_PATH", raising=False)
+    monkeypatch.delenv("BRIGHTDATA_JOB_INDEX_PATH", raising=False)
+    fake_brightdata.settings.search_results = 2
+    return fake_brightdata
+
+def read_rows(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+def test_fetch_profiles_resumes(fake_api, tmp_path):
+    urls = [f"https://www.linkedin.com/in/cli-{i}" for i in range(7)]
+    source = tmp_path / "urls.txt"
+    source.write_text("\n".join(["# profiles", *urls[:4], urls[0], ""]))
+    out = tmp_path / "profiles.jsonl"
+
+    assert main(["fetch-profiles", str(source), "-o", str(out), "-b", "2", "-c", "2"]) == 0
+    rows = read_rows(out)
+    assert sorted(row["url"] for row in rows) == sorted(urls[:4])
+    assert all(row["kind"] == "profile" and row["result"]["city"] == "Berlin" for row in rows)
+
+    # A crash mid-line leaves a partial line, which is dropped on resume
+    with open(out, "a") as f:
+        f.write('{"kind": "profile", "url": "https://www.linkedin.com/in/cli-')
+    fake_api.reset()
+    source.write_text("\n".join(urls))
+    assert main(["fetch-profiles", str(source), "-o", str(out), "-b", "2"]) == 0
+    assert sorted(row["url"] for row in read_rows(out)) == sorted(urls)
+    assert fake_api.stats["triggers"] == 2
+
+def test_search_writes_chunked_output(fake_api, tmp_path, capsys):
+    source = tmp_path / "keywords.txt"
+    source.write_text("python\ndjango\nrust\n")
+    out = tmp_path / "search.jsonl"
+
+    assert main(["search", str(source), "-o", str(out), "--output-chunk", "2"]) == 0
+    parts = sorted(tmp_path.glob("search.*.jsonl"))
+    assert [p.name for p in parts] == ["search.00000.jsonl", "search.00001.jsonl"]
+    rows = [row for part in parts for row in read_rows(part)]
+    assert sorted(row["url"] for row in rows) == ["django", "python", "rust"]
+    assert all(len(row["result"]) == 2 and "queries" not in row["result"][0] for row in rows)
+    # The keywords share one trigger
+    assert fake_api.stats["triggers"] == 1
+    # Progress goes to stderr
+    assert "Done: 3 ok" in capsys.readouterr().err
+
+    assert JsonlOutput(str(out), 2).done == {"django", "python", "rust"}
+
+def test_failures_are_reported_and_retried(fake_api, tmp_path, monkeypatch, capsys):
+    source = tmp_path / "jobs.txt"
+    source.write_text("https://www.linkedin.com/jobs/view/1\n")
+    out = tmp_path / "jobs.jsonl"
+
+    fake_api.settings.failure_rate = 1.0
+    assert main(["fetch-jobs", str(source), "-o", str(out)]) == 1
+    assert read_rows(out)[0]["error_code"] == "snapshot_failed"
+
+    fake_api.settings.failure_rate = 0.0
+    assert main(["fetch-jobs", str(source), "-o", str(out)]) == 0
+    assert [sorted(row) for row in read_rows(out)] == [["error", "error_code", "kind", "url"], ["kind", "result", "url"]]
+
+def test_stdout_output(fake_api, tmp_path, capsys):
+    source = tmp_path / "jobs.txt"
+    source.write_text("https://www.linkedin.com/jobs/view/2\n")
+    assert main(["fetch-jobs", str(source)]) == 0
+    [line] = capsys.readouterr().out.splitlines()
+    assert json.loads(line)["result"]["job_title"].startswith("Software Engineer")
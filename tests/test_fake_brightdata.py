@@ -0,0 +1,57 @@
+import json
+import pytest
+from brightdata_client import BrightDataClient, SnapshotFailed, get_client
+from get_linkedin_profile import get_linkedin_profile, get_linkedin_profiles
+
+@pytest.fixture(autouse=True)
+def mock_env_vars(monkeypatch):
+    monkeypatch.setenv("BRIGHTDATA_API_TOKEN", "fake_token")
+    monkeypatch.delenv("BRIGHTDATA_BASE_URL", raising=False)
+    monkeypatch.delenv("BRIGHTDATA_CACHE_PATH", raising=False)
+    monkeypatch.delenv("BRIGHTDATA_JOB_INDEX_PATH", raising=False)
+
+def test_base_url_is_configurable(monkeypatch):
+    assert BrightDataClient().base_url == "https://api.brightdata.com"
+    monkeypatch.setenv("BRIGHTDATA_BASE_URL", "http://127.0.0.1:8787/")
+    assert BrightDataClient().snapshot_url("s_1") == "http://127.0.0.1:8787/datasets/v3/snapshot/s_1"
+
+def test_collect_against_stand_in(fake_brightdata):
+    fake_brightdata.settings.payload_bytes = 500
+    url = "https://www.linkedin.com/jobs/view/4012345678"
+    records = get_client().collect("fake_job_id", [{"url": url}], ready_field="job_title")
+
+    assert len(records) == 1
+    assert records[0]["input"] == {"url": url}
+    assert len(json.dumps(records[0])) == 500
+    assert fake_brightdata.stats["triggers"] == 1
+    assert fake_brightdata.stats["downloads"] == 1
+    # Trigger, at least one "running" poll, the "ready" poll and the download
+    assert fake_brightdata.requests_per_snapshot() >= 4
+
+def test_streamed_download(fake_brightdata):
+    client = get_client()
+    snapshot_id = client.trigger("fake_job_id", [{"url": "https://www.linkedin.com/jobs/search?keywords=python"}])
+    client.wait(snapshot_id)
+    jobs = list(client.iter_download(snapshot_id))
+    assert [job["job_title"] for job in jobs] == ["Software Engineer 0", "Software Engineer 1", "Software Engineer 2"]
+
+def test_fetchers_run_end_to_end(fake_brightdata):
+    profile = get_linkedin_profile("https://www.linkedin.com/in/fake-single")
+    assert profile["city"] == "Berlin"
+    assert profile["certifications"] == [{"title": "Cloud Practitioner", "issuer": "AWS"}]
+
+    fake_brightdata.reset()
+    urls = [f"https://www.linkedin.com/in/fake-batch-{i}" for i in range(5)]
+    profiles = get_linkedin_profiles(urls, chunk_size=2)
+    assert all(profiles[url]["first_name"] == "Person" for url in urls)
+    assert fake_brightdata.stats["triggers"] == 3
+
+def test_failures_and_auth(fake_brightdata):
+    client = get_client()
+    fake_brightdata.settings.failure_rate = 1.0
+    with pytest.raises(SnapshotFailed):
+        client.collect("fake_job_id", [{"url": "https://www.linkedin.com/jobs/view/1"}])
+
+    client.session.headers.pop("Authorization")
+    with pytest.raises(Exception, match="401"):
+        client.trigger("fake_job_id", [{"url": "https://www.linkedin.com/jobs/view/1"}])
@@ -0,0 +1,74 @@
+import random
+import pytest
+import job_dedup
+from fake_brightdata import fake_records
+from get_job_listing import filter_job_data, get_job_listings
+from job_dedup import NearDuplicateIndex, company_key, lsh_bands
+from search_jobs import search_jobs
+
+@pytest.fixture(autouse=True)
+def mock_env_vars(monkeypatch):
+    monkeypatch.setenv("BRIGHTDATA_API_TOKEN", "fake_token")
+    monkeypatch.setenv("BRIGHTDATA_JOB_DATASET_ID", "fake_job_id")
+    monkeypatch.delenv("BRIGHTDATA_CACHE_PATH", raising=False)
+    monkeypatch.delenv("BRIGHTDATA_JOB_INDEX_PATH", raising=False)
+    monkeypatch.delenv("BRIGHTDATA_DEDUP_THRESHOLD", raising=False)
+
+WORDS = "python django backend services scalable api design team remote engineer cloud platform data".split()
+
+def posting(posting_id, seed, company="Acme Inc.", edits=()):
+    rng = random.Random(seed)
+    words = [rng.choice(WORDS + [f"term{rng.randrange(10000)}"]) for _ in range(150)]
+    for position, word in edits:
+        words[position] = word
+    return {
+        "job_title": "Python Developer",
+        "company_name": company,
+        "job_summary": " ".join(words[:50]),
+        "job_description_formatted": "<p>" + " ".join(words[50:]) + "</p>",
+        "job_url": f"https://www.linkedin.com/jobs/view/{posting_id}",
+    }
+
+def test_lsh_parameters():
+    assert lsh_bands(128, 0.8) == 16
+    assert company_key({"company_name": "Acme, Inc."}) == company_key({"company_name": "ACME"}) == "acme"
+
+def test_finds_edited_reposts():
+    index = NearDuplicateIndex()
+    originals = [posting(i, seed=i) for i in range(200)]
+    assert index.filter(originals) == originals
+
+    repost = posting(1000, seed=7, company="ACME", edits=[(3, "senior"), (90, "hybrid")])
+    assert index.add(repost) == originals[7]["job_url"]
+    url, similarity = index.find(repost)
+    assert url == originals[7]["job_url"] and 0.8 <= similarity < 1
+
+    # The same text at another company, or heavily rewritten, is a different posting
+    assert index.find(posting(1001, seed=7, company="Globex")) is None
+    assert index.find(posting(1002, seed=7, edits=[(i, "rewritten") for i in range(0, 150, 4)])) is None
+
+    # Seeing a stored posting again, even under tracking parameters, is not a duplicate
+    assert index.add({**originals[7], "job_url": originals[7]["job_url"] + "?trk=x"}) is None
+    assert len(index) == 200
+
+def test_pure_python_signatures_match_numpy(monkeypatch):
+    if job_dedup._load_numpy() is None:
+        pytest.skip("numpy not installed")
+    expected = NearDuplicateIndex().signature(posting(1, seed=1))
+    monkeypatch.setattr(job_dedup, "_numpy", False)
+    assert NearDuplicateIndex().signature(posting(1, seed=1)) == expected
+    assert NearDuplicateIndex().signature({"job_title": ""}) is None
+
+def test_inline_in_fetchers(fake_brightdata):
+    index = NearDuplicateIndex()
+    jobs = search_jobs("python", dedup=index)
+    assert len(jobs) == 3 and len(index) == 3
+    # Searching again returns the same postings, not duplicates of themselves
+    assert search_jobs("python", dedup=index) == jobs
+
+    url = "https://www.linkedin.com/jobs/view/501"
+    original = "https://www.linkedin.com/jobs/view/42"
+    index.add(filter_job_data(fake_records(url, fake_brightdata.settings)[0]), original)
+    listings = get_job_listings([url, "https://www.linkedin.com/jobs/view/502"], dedup=index)
+    assert listings[url]["duplicate_of"] == original
+    assert "duplicate_of" not in listings["https://www.linkedin.com/jobs/view/502"]
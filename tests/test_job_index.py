@@ -0,0 +1,86 @@
+import pytest
+import responses
+from get_job_listing import get_job_listing
+from job_index import JobIndex, get_job_index, match_query
+from search_jobs import search_jobs
+
+@pytest.fixture(autouse=True)
+def mock_env_vars(monkeypatch):
+    monkeypatch.setenv("BRIGHTDATA_API_TOKEN", "fake_token")
+    monkeypatch.setenv("BRIGHTDATA_JOB_DATASET_ID", "fake_job_id")
+    monkeypatch.delenv("BRIGHTDATA_CACHE_PATH", raising=False)
+    monkeypatch.delenv("BRIGHTDATA_JOB_INDEX_PATH", raising=False)
+
+JOBS = [
+    {"job_title": "Senior Python Developer", "company_name": "Acme Corp", "job_location": "Berlin, Germany",
+     "job_seniority_level": "Mid-Senior level", "job_employment_type": "Full-time",
+     "job_url": "https://www.linkedin.com/jobs/view/111"},
+    {"job_title": "Data Engineer", "company_name": "Beta Inc", "job_location": "Remote",
+     "job_summary": "Pipelines in Python and SQL", "job_seniority_level": "Entry level",
+     "job_employment_type": "Contract", "job_url": "https://www.linkedin.com/jobs/view/222"},
+    {"job_title": "Java Developer", "company_name": "Gamma", "job_location": "Berlin, Germany",
+     "job_url": "https://www.linkedin.com/jobs/view/333"},
+]
+
+def test_match_query():
+    assert match_query("Python  dev") == '"python" "dev"*'
+    assert match_query('"OR" (NEAR') == '"or" "near"*'
+    assert match_query("  ") is None
+
+def test_ranked_search_with_filters(tmp_path):
+    index = JobIndex(str(tmp_path / "jobs.sqlite"))
+    assert index.add_many((None, job) for job in JOBS) == 3
+
+    # Title matches rank above summary matches
+    assert [job["job_url"][-3:] for job in index.search("python")] == ["111", "222"]
+    assert sorted(job["job_url"][-3:] for job in index.search("develop")) == ["111", "333"]
+    assert sorted(job["job_url"][-3:] for job in index.search("developer", location="berlin")) == ["111", "333"]
+    assert [job["job_url"][-3:] for job in index.search("python", employment_type="contract")] == ["222"]
+    assert [job["job_url"][-3:] for job in index.search("python", seniority_level="Entry Level")] == ["222"]
+    assert index.search("rust") == []
+
+    # Re-indexing a posting replaces it
+    index.add({**JOBS[2], "job_title": "Rust Developer"}, "https://www.linkedin.com/jobs/view/333/?refId=x")
+    assert len(index) == 3
+    assert [job["job_title"] for job in index.search("rust")] == ["Rust Developer"]
+    assert index.search("java") == []
+    assert index.search("python", max_age=-1) == []
+
+@responses.activate
+def test_search_jobs_answers_from_index(tmp_path, monkeypatch):
+    monkeypatch.setenv("BRIGHTDATA_JOB_INDEX_PATH", str(tmp_path / "jobs.sqlite"))
+    monkeypatch.setenv("BRIGHTDATA_JOB_INDEX_MIN_RESULTS", "1")
+
+    trigger_url = "https://api.brightdata.com/datasets/v3/trigger?dataset_id=fake_job_id"
+    status_url = "https://api.brightdata.com/datasets/v3/snapshot/snap_indexed"
+    responses.add(responses.POST, trigger_url, json={"snapshot_id": "snap_indexed"}, status=200)
+    responses.add(responses.GET, status_url, json={"status": "ready"}, status=200)
+    responses.add(
+        responses.GET,
+        f"{status_url}?format=json",
+        json=[{"job_title": "Staff Python Engineer", "company_name": "Delta", "apply_link": "https://apply"}],
+        status=200,
+    )
+
+    # Fetched listings are indexed under the URL they were fetched from
+    job = get_job_listing("https://www.linkedin.com/jobs/view/444/")
+    assert job["job_title"] == "Staff Python Engineer"
+
+    result = search_jobs("python engineer")
+    assert result == [{
+        "job_title": "Staff Python Engineer",
+        "company_name": "Delta",
+        "job_url": "https://www.linkedin.com/jobs/view/444/",
+    }]
+    assert len(responses.calls) == 3
+
+@responses.activate
+def test_search_jobs_from_index_is_not_capped(tmp_path, monkeypatch):
+    monkeypatch.setenv("BRIGHTDATA_JOB_INDEX_PATH", str(tmp_path / "jobs.sqlite"))
+    monkeypatch.setenv("BRIGHTDATA_JOB_INDEX_MIN_RESULTS", "1")
+    jobs = [{**JOBS[0], "job_url": f"https://www.linkedin.com/jobs/view/{1000 + i}"} for i in range(40)]
+    get_job_index().add_many((None, job) for job in jobs)
+
+    # Answered without scraping (no responses are registered), with every match
+    assert len(search_jobs("python developer")) == 40
+    assert len(JobIndex(str(tmp_path / "jobs.sqlite")).search("python", limit=None)) == 40
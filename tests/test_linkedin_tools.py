@@ -1,9 +1,11 @@
 import os
 import pytest
+import requests
 import responses
-from get_job_listing import get_job_listing
-from get_linkedin_profile import get_linkedin_profile
-from search_jobs import search_jobs
+from brightdata_client import BrightDataClient
+from get_job_listing import get_job_listing, get_job_listings
+from get_linkedin_profile import get_linkedin_profile, get_linkedin_profiles
+from search_jobs import iter_search_jobs, search_jobs
 
 @pytest.fixture(autouse=True)
 def mock_env_vars(monkeypatch):
@@ -140,3 +142,146 @@ def test_search_jobs_success():
     assert "extra_field" not in result[0]
     assert "internal_id" not in result[1]
 
+@responses.activate
+def test_get_linkedin_profiles_batch():
+    trigger_url = "https://api.brightdata.com/datasets/v3/trigger?dataset_id=fake_profile_id"
+    status_url = "https://api.brightdata.com/datasets/v3/snapshot/snap_batch"
+    download_url = f"{status_url}?format=json"
+
+    # Mock trigger — one trigger carries every URL
+    responses.add(
+        responses.POST,
+        trigger_url,
+        json={"snapshot_id": "snap_batch"},
+        status=200,
+        match=[responses.matchers.json_params_matcher([
+            {"url": "https://www.linkedin.com/in/johndoe/"},
+            {"url": "https://www.linkedin.com/in/janedoe"},
+            {"url": "https://www.linkedin.com/in/ghost"},
+        ])],
+    )
+
+    # Mock status check
+    responses.add(
+        responses.GET,
+        status_url,
+        json={"status": "ready"},
+        status=200,
+    )
+
+    # Mock download — records come back out of order, one of them failed
+    responses.add(
+        responses.GET,
+        download_url,
+        json=[
+            {"input": {"url": "https://www.linkedin.com/in/ghost"}, "error": "Page not found", "error_code": "dead_page"},
+            {"input_url": "https://www.linkedin.com/in/janedoe", "name": "Jane Doe", "id": "jane"},
+            {"url": "https://linkedin.com/in/johndoe", "name": "John Doe"},
+        ],
+        status=200,
+    )
+
+    result = get_linkedin_profiles([
+        "https://www.linkedin.com/in/johndoe/",
+        "https://www.linkedin.com/in/janedoe",
+        "https://www.linkedin.com/in/ghost",
+    ])
+    assert result == {
+        "https://www.linkedin.com/in/johndoe/": {"name": "John Doe"},
+        "https://www.linkedin.com/in/janedoe": {"name": "Jane Doe"},
+        "https://www.linkedin.com/in/ghost": {"error": "Page not found", "error_code": "dead_page"},
+    }
+
+@responses.activate
+def test_get_job_listings_chunks():
+    trigger_url = "https://api.brightdata.com/datasets/v3/trigger?dataset_id=fake_job_id"
+
+    # Mock triggers — two chunks of at most two URLs
+    responses.add(responses.POST, trigger_url, json={"snapshot_id": "snap_a"}, status=200)
+    responses.add(responses.POST, trigger_url, json={"snapshot_id": "snap_b"}, status=200)
+
+    for snapshot_id, records in [
+        ("snap_a", [
+            {"url": "https://www.linkedin.com/jobs/view/1", "job_title": "A", "job_posting_id": "1"},
+            {"url": "https://www.linkedin.com/jobs/view/2", "job_title": "B"},
+        ]),
+        ("snap_b", []),
+    ]:
+        status_url = f"https://api.brightdata.com/datasets/v3/snapshot/{snapshot_id}"
+        responses.add(responses.GET, status_url, json={"status": "ready"}, status=200)
+        responses.add(responses.GET, f"{status_url}?format=json", json=records, status=200)
+
+    result = get_job_listings([
+        "https://www.linkedin.com/jobs/view/1",
+        "https://www.linkedin.com/jobs/view/2",
+        "https://www.linkedin.com/jobs/view/3",
+    ], chunk_size=2)
+    assert result["https://www.linkedin.com/jobs/view/1"] == {"job_title": "A"}
+    assert result["https://www.linkedin.com/jobs/view/2"] == {"job_title": "B"}
+    assert result["https://www.linkedin.com/jobs/view/3"]["error_code"] == "missing"
+    assert len([c for c in responses.calls if c.request.method == "POST"]) == 2
+
+@responses.activate
+def test_client_retries_server_errors():
+    status_url = "https://api.brightdata.com/datasets/v3/snapshot/snap_retry"
+
+    # Mock status check — two transient failures before the real answer
+    responses.add(responses.GET, status_url, status=502)
+    responses.add(responses.GET, status_url, status=503)
+    responses.add(responses.GET, status_url, json={"status": "ready"}, status=200)
+
+    client = BrightDataClient(backoff=0)
+    assert client.status("snap_retry") == {"status": "ready"}
+    assert len(responses.calls) == 3
+
+@responses.activate
+def test_client_does_not_retry_client_errors():
+    status_url = "https://api.brightdata.com/datasets/v3/snapshot/snap_missing"
+    responses.add(responses.GET, status_url, status=404)
+
+    client = BrightDataClient(backoff=0)
+    with pytest.raises(requests.exceptions.HTTPError):
+        client.status("snap_missing")
+    assert len(responses.calls) == 1
+
+@responses.activate
+def test_iter_search_jobs_streams_jsonl():
+    trigger_url = "https://api.brightdata.com/datasets/v3/trigger?dataset_id=fake_job_id"
+    status_url = "https://api.brightdata.com/datasets/v3/snapshot/snap_stream"
+
+    responses.add(responses.POST, trigger_url, json={"snapshot_id": "snap_stream"}, status=200)
+    responses.add(responses.GET, status_url, json={"status": "ready"}, status=200)
+
+    # Mock download — newline-delimited records
+    responses.add(
+        responses.GET,
+        f"{status_url}?format=jsonl",
+        body=(
+            '{"job_title": "Python Developer", "job_url": "https://linkedin.com/jobs/view/111", "extra_field": 1}\n'
+            '{"internal_id": "only unwanted fields"}\n'
+            '\n'
+            '{"job_title": "Senior Python Engineer", "job_url": "https://linkedin.com/jobs/view/222"}\n'
+        ),
+        status=200,
+    )
+
+    jobs = iter_search_jobs("python developer")
+    assert next(jobs) == {"job_title": "Python Developer", "job_url": "https://linkedin.com/jobs/view/111"}
+    assert list(jobs) == [{"job_title": "Senior Python Engineer", "job_url": "https://linkedin.com/jobs/view/222"}]
+
+@responses.activate
+def test_batch_streaming_download():
+    trigger_url = "https://api.brightdata.com/datasets/v3/trigger?dataset_id=fake_profile_id"
+    status_url = "https://api.brightdata.com/datasets/v3/snapshot/snap_batch_stream"
+
+    responses.add(responses.POST, trigger_url, json={"snapshot_id": "snap_batch_stream"}, status=200)
+    responses.add(responses.GET, status_url, json={"status": "ready"}, status=200)
+    responses.add(
+        responses.GET,
+        f"{status_url}?format=jsonl",
+        body='{"url": "https://www.linkedin.com/in/a", "name": "A", "id": 1}\n{"url": "https://www.linkedin.com/in/b", "name": "B"}\n',
+        status=200,
+    )
+
+    result = get_linkedin_profiles(["https://www.linkedin.com/in/a", "https://www.linkedin.com/in/b"], stream=True)
+    assert result == {"https://www.linkedin.com/in/a": {"name": "A"}, "https://www.linkedin.com/in/b": {"name": "B"}}
@@ -0,0 +1,87 @@
+import json
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("scipy")
+
+import matching  # noqa: E402
+from experience import merge_experience  # noqa: E402
+from matching import JobMatcher, profile_text  # noqa: E402
+
+PROFILE = {
+    "name": "Jane Doe",
+    "about": "Backend engineer who likes distributed systems",
+    "certifications": [{"title": "AWS Certified Developer"}],
+    "experience": [
+        {"title": "Software Engineer", "highlights": ["Built Django and Redis services in Python", "Tuned PostgreSQL queries"]},
+    ],
+}
+
+JOBS = [
+    {"job_title": "Python Backend Engineer", "job_url": "https://www.linkedin.com/jobs/view/1",
+     "job_description_formatted": "<p>Django, Redis and PostgreSQL on AWS</p>"},
+    {"job_title": "Pastry Chef", "job_url": "https://www.linkedin.com/jobs/view/2",
+     "job_description_formatted": "<p>Croissants and cakes</p>"},
+    {"job_title": "Java Developer", "job_url": "https://www.linkedin.com/jobs/view/3",
+     "job_summary": "Spring services, some Python scripting"},
+]
+
+def test_profile_text_fields():
+    text = profile_text(PROFILE)
+    assert text["titles"] == "Software Engineer"
+    assert "AWS Certified Developer" in text["skills"]
+    assert "Redis" in text["highlights"] and "distributed" in text["highlights"]
+
+def test_rank_returns_top_k_with_breakdown():
+    matcher = JobMatcher(n_features=2 ** 16)
+    assert matcher.add_jobs((None, job) for job in JOBS) == 3
+
+    ranked = matcher.rank(PROFILE, k=2)
+    assert [match["job"]["job_title"] for match in ranked] == ["Python Backend Engineer", "Java Developer"]
+    best = ranked[0]
+    assert set(best["breakdown"]) == {"title", "skills", "highlights"}
+    assert best["breakdown"]["title"] > 0
+    assert best["score"] == pytest.approx(
+        0.3 * best["breakdown"]["title"] + 0.3 * best["breakdown"]["skills"] + 0.4 * best["breakdown"]["highlights"],
+        rel=1e-5,
+    )
+    assert all(0 <= value <= 1.0001 for value in best["breakdown"].values())
+
+def test_bucket_memo_is_bounded(monkeypatch):
+    expected = JobMatcher(n_features=2 ** 16)
+    expected.add_jobs((None, job) for job in JOBS)
+    monkeypatch.setattr(matching, "BUCKET_MEMO_SIZE", 8)
+    matcher = JobMatcher(n_features=2 ** 16)
+    matcher.add_jobs((None, job) for job in JOBS)
+    matcher.add_jobs((None, {"job_title": f"Engineer {i}", "job_summary": f"token{i} other{i}"}) for i in range(50))
+    assert len(matcher._buckets) <= 8
+    assert [m["job"]["job_url"] for m in matcher.rank(PROFILE, k=2)] == [m["job"]["job_url"] for m in expected.rank(PROFILE, k=2)]
+
+def test_readding_a_job_replaces_it(tmp_path):
+    matcher = JobMatcher(n_features=2 ** 16)
+    matcher.add_jobs((None, job) for job in JOBS)
+    matcher.add_jobs([("https://www.linkedin.com/jobs/view/2/?refId=x", {"job_title": "Python Engineer"})])
+    assert len(matcher) == 3
+
+    ranked = matcher.rank(PROFILE, k=10)
+    assert len(ranked) == 3
+    assert "Pastry Chef" not in [match["job"]["job_title"] for match in ranked]
+
+    # Vectors round-trip through disk
+    matcher.save(str(tmp_path / "matcher"))
+    loaded = JobMatcher.load(str(tmp_path / "matcher"))
+    assert len(loaded) == 3
+    assert [m["job"] for m in loaded.rank(PROFILE, k=3)] == [m["job"] for m in ranked]
+    assert [m["score"] for m in loaded.rank(PROFILE, k=3)] == pytest.approx([m["score"] for m in ranked])
+
+def test_merge_experience(tmp_path):
+    path = tmp_path / "override.json"
+    path.write_text(json.dumps({"experience": PROFILE["experience"]}))
+    merged = merge_experience({"name": "Jane"}, str(path))
+    assert merged == {"name": "Jane", "experience": PROFILE["experience"]}
+
+def test_empty_matcher():
+    assert JobMatcher(n_features=2 ** 10).rank(PROFILE) == []
+    with pytest.raises(ValueError):
+        JobMatcher(n_features=1000)
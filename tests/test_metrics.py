@@ -0,0 +1,75 @@
+import io
+import json
+import pytest
+import responses
+import brightdata_client
+import metrics
+from brightdata_client import BrightDataClient
+from get_job_listing import get_job_listing
+from metrics import JsonlEventLog, Metrics
+from polling import FixedPolling
+
+@pytest.fixture(autouse=True)
+def registry(monkeypatch):
+    monkeypatch.setenv("BRIGHTDATA_API_TOKEN", "fake_token")
+    monkeypatch.setenv("BRIGHTDATA_JOB_DATASET_ID", "fake_job_id")
+    monkeypatch.delenv("BRIGHTDATA_BASE_URL", raising=False)
+    monkeypatch.delenv("BRIGHTDATA_CACHE_PATH", raising=False)
+    monkeypatch.delenv("BRIGHTDATA_JOB_INDEX_PATH", raising=False)
+    fresh = Metrics()
+    monkeypatch.setattr(metrics, "_metrics", fresh)
+    return fresh
+
+def series(registry, name, **labels):
+    return [s for s in registry.snapshot() if s["name"] == name and all(s["labels"].get(k) == v for k, v in labels.items())]
+
+def test_spans_hooks_and_exports(registry, tmp_path):
+    events = []
+    registry.add_hook(events.append)
+    registry.add_hook(lambda event: 1 / 0)  # ignored
+    with registry.span("trigger", dataset="job"):
+        pass
+    with pytest.raises(KeyError):
+        with registry.span("parse"):
+            raise KeyError("x")
+    registry.count("brightdata_requests_total", phase="trigger", status=200)
+    registry.count("brightdata_requests_total", phase="trigger", status=200)
+
+    assert [(e["phase"], e["labels"], e["error"]) for e in events] == [("trigger", {"dataset": "job"}, None), ("parse", {}, "KeyError")]
+    [counter] = series(registry, "brightdata_requests_total")
+    assert counter["value"] == 2
+
+    text = registry.prometheus()
+    assert "# TYPE brightdata_phase_seconds histogram" in text
+    assert 'brightdata_phase_seconds_bucket{dataset="job",phase="trigger",le="+Inf"} 1' in text
+    assert 'brightdata_requests_total{phase="trigger",status="200"} 2' in text
+
+    out = io.StringIO()
+    registry.write_jsonl(out)
+    lines = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert {line["name"] for line in lines} == {"brightdata_requests_total", "brightdata_phase_seconds"}
+
+    log = JsonlEventLog(str(tmp_path / "events.jsonl"))
+    log(events[0])
+    assert json.loads((tmp_path / "events.jsonl").read_text())["phase"] == "trigger"
+
+@responses.activate
+def test_fetch_records_every_phase(registry, monkeypatch):
+    client = BrightDataClient(poll_strategy=FixedPolling(0), backoff=0)
+    monkeypatch.setattr(brightdata_client, "_client", client)
+    status_url = "https://api.brightdata.com/datasets/v3/snapshot/snap_m"
+    responses.add(responses.POST, "https://api.brightdata.com/datasets/v3/trigger?dataset_id=fake_job_id", json={"snapshot_id": "snap_m"})
+    responses.add(responses.GET, status_url, json={"status": "running"})
+    responses.add(responses.GET, status_url, status=502)
+    responses.add(responses.GET, status_url, json={"status": "ready"})
+    responses.add(responses.GET, f"{status_url}?format=json", json=[{"job_title": "Engineer", "noise": 1}])
+
+    assert get_job_listing("https://www.linkedin.com/jobs/view/metrics-1") == {"job_title": "Engineer"}
+
+    phases = {s["labels"]["phase"]: s["count"] for s in series(registry, "brightdata_phase_seconds")}
+    assert phases == {"trigger": 1, "poll": 2, "wait": 1, "download": 1, "parse": 1, "filter": 1}
+    assert series(registry, "brightdata_retries_total", phase="status")[0]["value"] == 1
+    assert series(registry, "brightdata_requests_total", phase="status", status="502")[0]["value"] == 1
+    assert series(registry, "brightdata_polls_per_snapshot", dataset="job")[0]["sum"] == 2
+    assert series(registry, "brightdata_records_total")[0]["value"] == 1
+    assert series(registry, "brightdata_response_bytes", phase="download")[0]["sum"] > 0
@@ -0,0 +1,202 @@
+import json
+import os
+import threading
+import time
+
+import pytest
+import responses
+from composio_cache import ActionCache
+from pdf_cache import PdfStore, pdf_cache_key
+from pdf_service import PdfRenderError, PdfService, ProviderStats, is_stale_action_error, param_mapping, pdf_url, resolve_pdf_action
+
+@pytest.fixture(autouse=True)
+def cache_paths(tmp_path, monkeypatch):
+    monkeypatch.setenv("PDF_ACTION_CACHE", str(tmp_path / "actions.json"))
+    monkeypatch.setenv("PDF_CACHE_DIR", str(tmp_path / "pdf"))
+
+class FakeToolSet:
+    """Stands in for ComposioToolSet: each provider has a delay and an outcome."""
+
+    def __init__(self, behaviour):
+        self.behaviour = behaviour
+        self.schema_calls = []
+        self.executed = []
+        self._lock = threading.Lock()
+
+    def get_action_schemas(self, apps):
+        name = getattr(apps[0], "name", apps[0])
+        with self._lock:
+            self.schema_calls.append(name)
+        return [
+            {"name": f"{name}_LIST_FILES"},
+            {"name": f"{name}_HTML_TO_PDF", "parameters": {"properties": {"htmlCode": {}, "fileName": {}}}},
+        ]
+
+    def execute_action(self, action, params):
+        provider = action.removesuffix("_HTML_TO_PDF")
+        delay, ok = self.behaviour[provider]
+        with self._lock:
+            self.executed.append((provider, params))
+        time.sleep(delay)
+        if not ok:
+            return {"successful": False, "error": f"{provider} is down"}
+        return {"successful": True, "data": {"url": f"https://files.example.com/{provider}.pdf"}}
+
+def service(behaviour, **kwargs):
+    kwargs.setdefault("stats", ProviderStats(path=""))
+    return PdfService(toolset=FakeToolSet(behaviour), providers=list(behaviour), **kwargs)
+
+def test_param_mapping():
+    schema = {"parameters": {"properties": {"htmlCode": {}, "fileName": {}, "html_content": {}}}}
+    assert param_mapping(schema) == {"html_key": "htmlCode", "file_name_keys": ["fileName"]}
+    assert param_mapping({}) == {"html_key": "html", "file_name_keys": []}
+
+def test_hedges_slow_provider():
+    pdf = service({"PDF_API_IO": (1.0, True), "PDF_CO": (0.05, True)}, hedge_after=0.1)
+    start = time.monotonic()
+    result = pdf.convert("<p>hi</p>")
+
+    assert result.provider == "PDF_CO"
+    assert result.response["data"]["url"].endswith("PDF_CO.pdf")
+    assert time.monotonic() - start < 0.6
+    assert pdf.toolset.executed[1] == ("PDF_CO", {"htmlCode": "<p>hi</p>", "fileName": "pdf_co.pdf"})
+
+def test_failure_starts_next_provider_immediately():
+    pdf = service({"PDF_API_IO": (0.0, False), "PDF_CO": (0.0, True)}, hedge_after=10)
+    start = time.monotonic()
+    assert pdf.convert("<p>hi</p>").provider == "PDF_CO"
+    assert time.monotonic() - start < 1
+
+    # The failing provider now goes last, and schemas are not fetched again
+    assert pdf.stats.order(["PDF_API_IO", "PDF_CO"]) == ["PDF_CO", "PDF_API_IO"]
+    pdf.convert("<p>again</p>")
+    assert [name for name, _ in pdf.toolset.executed] == ["PDF_API_IO", "PDF_CO", "PDF_CO"]
+    assert sorted(pdf.toolset.schema_calls) == ["PDF_API_IO", "PDF_CO"]
+
+def test_all_at_once_and_all_failing():
+    pdf = service({"PDF_API_IO": (0.0, False), "PDF_CO": (0.0, False), "API2PDF": (0.0, False)}, hedge_after=0)
+    with pytest.raises(PdfRenderError) as info:
+        pdf.convert("<p>hi</p>")
+    assert set(info.value.errors) == {"PDF_API_IO", "PDF_CO", "API2PDF"}
+
+def test_timeout():
+    pdf = service({"PDF_API_IO": (0.5, True)}, timeout=0.1)
+    with pytest.raises(TimeoutError):
+        pdf.convert("<p>hi</p>")
+
+def test_stats_persist(tmp_path):
+    path = str(tmp_path / "stats.json")
+    stats = ProviderStats(path=path)
+    stats.record("PDF_CO", 2.0, ok=True)
+    stats.record("PDF_CO", 1.0, ok=False)
+    # The first call is written straight away, later ones at most every save_interval
+    assert json.load(open(path))["PDF_CO"]["calls"] == 1
+    stats.flush()
+    assert os.listdir(tmp_path) == ["stats.json"]
+    reloaded = ProviderStats(path=path)
+    assert reloaded.latency("PDF_CO") == 2.0
+    assert reloaded.stats["PDF_CO"]["calls"] == 2
+    assert reloaded.expected_cost("PDF_CO") > 2.0
+
+def test_action_cache_skips_schema_discovery(tmp_path):
+    path = str(tmp_path / "cached_actions.json")
+    toolset = FakeToolSet({"PDF_CO": (0.0, True)})
+    entry = resolve_pdf_action("PDF_CO", lambda: toolset, ActionCache(path))
+    assert entry["action"] == "PDF_CO_HTML_TO_PDF"
+    assert entry["mapping"] == {"html_key": "htmlCode", "file_name_keys": ["fileName"]}
+
+    # A later process finds everything in the cache without building a toolset
+    def no_toolset():
+        raise AssertionError("schema discovery should be skipped")
+
+    assert resolve_pdf_action("PDF_CO", no_toolset, ActionCache(path)) == entry
+    pdf = PdfService(toolset=toolset, providers=["PDF_CO"], stats=ProviderStats(path=""), action_cache=ActionCache(path))
+    pdf.convert("<p>hi</p>")
+    assert toolset.schema_calls == ["PDF_CO"]
+
+def test_action_cache_expiry_and_versioning(tmp_path, monkeypatch):
+    path = str(tmp_path / "cached_actions.json")
+    ActionCache(path).set("actions:PDF_CO", ["PDF_CO_HTML_TO_PDF"])
+    assert ActionCache(path).get("actions:PDF_CO") == ["PDF_CO_HTML_TO_PDF"]
+    assert ActionCache(path, ttl=-1).get("actions:PDF_CO") is None
+
+    monkeypatch.setattr("composio_cache.CACHE_VERSION", 2)
+    assert ActionCache(path).get("actions:PDF_CO") is None
+
+    # Valid JSON that isn't a cache file reads as empty
+    for junk in ("[]", "null", '{"version": 2, "entries": []}'):
+        with open(path, "w") as f:
+            f.write(junk)
+        assert ActionCache(path).get("actions:PDF_CO") is None
+
+def test_failed_execution_invalidates_cached_action(tmp_path):
+    class BrokenToolSet(FakeToolSet):
+        def execute_action(self, action, params):
+            raise RuntimeError("unknown action")
+
+    cache = ActionCache(str(tmp_path / "cached_actions.json"))
+    pdf = PdfService(toolset=BrokenToolSet({"PDF_CO": (0.0, True)}), providers=["PDF_CO"], stats=ProviderStats(path=""), action_cache=cache)
+    with pytest.raises(PdfRenderError):
+        pdf.convert("<p>hi</p>")
+    assert cache.get("pdf_action:PDF_CO") is None
+
+def test_transient_failure_keeps_cached_action(tmp_path):
+    class FlakyToolSet(FakeToolSet):
+        def execute_action(self, action, params):
+            raise RuntimeError("503 Service Unavailable")
+
+    cache = ActionCache(str(tmp_path / "cached_actions.json"))
+    pdf = PdfService(toolset=FlakyToolSet({"PDF_CO": (0.0, True)}), providers=["PDF_CO"], stats=ProviderStats(path=""), action_cache=cache)
+    for _ in range(2):
+        with pytest.raises(PdfRenderError):
+            pdf.convert("<p>hi</p>")
+    assert cache.get("pdf_action:PDF_CO")["action"] == "PDF_CO_HTML_TO_PDF"
+    assert "PDF_CO" in pdf._actions
+    assert is_stale_action_error(ValueError("Action PDF_CO_HTML_TO_PDF not found"))
+    assert not is_stale_action_error(TimeoutError("timed out"))
+    assert is_stale_action_error(type("EnumMetadataNotFound", (Exception,), {})("PDF_CO_HTML_TO_PDF"))
+    assert is_stale_action_error(ValueError("Unexpected parameter htmlCode"))
+    # Failures that only mention validation or a schema say nothing about the action
+    assert not is_stale_action_error(ValueError("HTML validation failed: unclosed <div>"))
+    assert not is_stale_action_error(RuntimeError("response schema mismatch from upstream"))
+
+def test_pdf_url():
+    assert pdf_url({"successful": True, "data": {"url": "https://files.example.com/a.pdf"}}) == "https://files.example.com/a.pdf"
+    assert pdf_url({"data": {"response_data": {"FileUrl": "https://storage.api2pdf.com/b.pdf"}}}) == "https://storage.api2pdf.com/b.pdf"
+    assert pdf_url({"data": {"url": "not a url"}}) is None
+
+def test_pdf_store_lru_and_mmap(tmp_path):
+    store = PdfStore(str(tmp_path / "pdf"), max_bytes=250, mmap_threshold=100)
+    keys = [pdf_cache_key(f"<p>{i}</p>", "PDF_CO") for i in range(3)]
+    store.put(keys[0], b"a" * 100)
+    store.put(keys[1], b"b" * 50)
+    assert pdf_cache_key("<p>0</p>", "PDF_CO") != pdf_cache_key("<p>0</p>", "PDF_CO", {"landscape": True})
+
+    # Large files are memory-mapped, small ones read
+    big = store.get(keys[0])
+    assert isinstance(big, memoryview) and bytes(big) == b"a" * 100
+    assert store.get(keys[1]) == b"b" * 50
+
+    # Make the first entry the least recently used, then overflow the store
+    os.utime(store._path(keys[0]), (0, 0))
+    store.put(keys[2], b"c" * 120)
+    assert keys[0] not in store
+    assert keys[1] in store and keys[2] in store
+    assert store.size == 170
+
+@responses.activate
+def test_render_serves_unchanged_html_from_cache(tmp_path):
+    for provider in ("PDF_API_IO", "PDF_CO"):
+        responses.add(responses.GET, f"https://files.example.com/{provider}.pdf", body=b"%PDF-1.7 fake", status=200)
+    store = PdfStore(str(tmp_path / "store"))
+    pdf = service({"PDF_API_IO": (0.0, True), "PDF_CO": (0.0, True)}, store=store)
+
+    assert pdf.render("<p>resume</p>") == b"%PDF-1.7 fake"
+    assert pdf.render("<p>resume</p>") == b"%PDF-1.7 fake"
+    assert len(pdf.toolset.executed) == 1
+    assert len(responses.calls) == 1
+
+    # Different settings are a different render
+    pdf.render("<p>resume</p>", {"landscape": True})
+    assert pdf.toolset.executed[-1][1]["landscape"] is True
+    assert len(pdf.toolset.executed) == 2
@@ -0,0 +1,48 @@
+import pytest
+import responses
+from brightdata_client import BrightDataClient
+from polling import AdaptivePolling, ExponentialBackoff, FixedPolling, PollTimeoutError, make_poll_strategy
+
+@pytest.fixture(autouse=True)
+def mock_env_vars(monkeypatch):
+    monkeypatch.setenv("BRIGHTDATA_API_TOKEN", "fake_token")
+
+def test_exponential_backoff_is_capped():
+    strategy = ExponentialBackoff(initial=1, factor=2, cap=5)
+    assert [strategy.interval("job", attempt, 0) for attempt in range(5)] == [1, 2, 4, 5, 5]
+
+def test_adaptive_polls_often_near_expected_finish(tmp_path):
+    stats_path = tmp_path / "poll_stats.json"
+    strategy = AdaptivePolling(min_interval=1, max_interval=30, stats_path=str(stats_path))
+
+    # No history yet: behaves like exponential backoff
+    assert strategy.interval("profile", 0, 0) == 1
+
+    strategy.record("profile", 40)
+    assert strategy.interval("profile", 0, 0) == 16
+    assert strategy.interval("profile", 3, 38) == 1
+    assert strategy.interval("profile", 9, 100) == 16
+    # Other datasets keep their own history
+    assert strategy.interval("search", 0, 0) == 1
+
+    # Averages are persisted for the next process
+    assert AdaptivePolling(stats_path=str(stats_path)).expected == {"profile": 40}
+
+def test_deadline_raises_timeout():
+    timer = FixedPolling(1, deadline=0).start("job", "snap_slow")
+    with pytest.raises(PollTimeoutError, match="snap_slow"):
+        timer.next_delay()
+
+def test_unknown_strategy():
+    with pytest.raises(ValueError):
+        make_poll_strategy("sometimes")
+
+@responses.activate
+def test_client_wait_stops_at_deadline():
+    status_url = "https://api.brightdata.com/datasets/v3/snapshot/snap_stuck"
+    responses.add(responses.GET, status_url, json={"status": "running"}, status=200)
+
+    client = BrightDataClient(poll_strategy=FixedPolling(0.01, deadline=0.05))
+    with pytest.raises(PollTimeoutError):
+        client.wait("snap_stuck")
+    assert len(responses.calls) > 1
@@ -0,0 +1,75 @@
+import pytest
+from get_linkedin_profile import refresh_linkedin_profiles
+from profile_changes import ProfileChange, ProfileChangeIndex, section_hashes
+
+@pytest.fixture(autouse=True)
+def mock_env_vars(monkeypatch):
+    monkeypatch.setenv("BRIGHTDATA_API_TOKEN", "fake_token")
+    monkeypatch.setenv("BRIGHTDATA_PROFILE_DATASET_ID", "fake_profile_id")
+    monkeypatch.delenv("BRIGHTDATA_CACHE_PATH", raising=False)
+
+URL = "https://www.linkedin.com/in/changing"
+
+def profile(**overrides):
+    return {
+        "name": "Ada Lovelace",
+        "about": "Analyst",
+        "education": [{"title": "Cambridge", "start_year": "1830"}],
+        "certifications": [{"title": "Engines", "issuer": "Royal Society"}],
+        **overrides,
+    }
+
+def test_section_hashes_ignore_key_order():
+    reordered = {"certifications": [{"issuer": "Royal Society", "title": "Engines"}], **profile()}
+    assert section_hashes(reordered) == section_hashes(profile())
+    assert "about" not in section_hashes(profile(about=None))
+
+def test_diffs_sections(tmp_path):
+    index = ProfileChangeIndex(str(tmp_path / "changes.sqlite"))
+
+    first = index.update([(URL, profile())])[URL]
+    assert first.new and sorted(first.added) == ["about", "certifications", "education", "name"]
+
+    # Tracking parameters don't make it a different profile
+    assert not index.update([(URL + "/?trk=feed", profile())])[URL + "/?trk=feed"]
+
+    change = index.update([(URL, profile(about=None, education=[{"title": "Cambridge", "start_year": "1831"}], projects=["Notes"]))])[URL]
+    assert change == ProfileChange(URL, added=("projects",), removed=("about",), changed=("education",))
+    assert change.touches(["education", "experience"]) and not change.touches(["certifications"])
+    assert set(index.hashes(URL)) == {"name", "education", "certifications", "projects"}
+
+    # Errors leave the stored hashes alone
+    assert index.update([(URL, {"error": "gone", "error_code": "dead_page"})]) == {}
+    assert URL in index and len(index) == 1
+
+def test_spellings_in_one_batch_share_a_change(tmp_path):
+    index = ProfileChangeIndex(str(tmp_path / "changes.sqlite"))
+    index.update([(URL, profile())])
+    tracked = URL + "/?trk=feed"
+    changes = index.update([(URL, profile()), (tracked, profile(about="Naturalist"))])
+    assert set(changes) == {URL, tracked}
+    assert changes[URL] is changes[tracked]
+    assert changes[URL].changed == ("about",) and len(index) == 1
+
+def test_subscribers_get_matching_changes(tmp_path):
+    index = ProfileChangeIndex(str(tmp_path / "changes.sqlite"))
+    index.update([(URL, profile()), ("https://www.linkedin.com/in/other", profile())])
+    education, everything = [], []
+    index.subscribe(lambda url, p, change: education.append(url), fields=["education"])
+    callback = index.subscribe(lambda url, p, change: everything.append((url, change.sections)))
+    index.subscribe(lambda url, p, change: 1 / 0)  # ignored
+
+    index.update([(URL, profile(about="Mathematician")), ("https://www.linkedin.com/in/other", profile())])
+    assert education == [] and everything == [(URL, {"about"})]
+
+    index.unsubscribe(callback)
+    index.update([(URL, profile(education=[]))])
+    assert education == [URL] and len(everything) == 1
+
+def test_refresh_rescrapes_and_reports(fake_brightdata, tmp_path):
+    index = ProfileChangeIndex(str(tmp_path / "changes.sqlite"))
+    urls = [f"https://www.linkedin.com/in/refresh-{i}" for i in range(3)]
+    assert all(change.new for change in refresh_linkedin_profiles(urls, index=index).values())
+    changes = refresh_linkedin_profiles(urls, index=index)
+    assert fake_brightdata.stats["triggers"] == 2
+    assert sorted(changes) == sorted(urls) and not any(changes.values())
@@ -0,0 +1,50 @@
+import pytest
+from projection import compile_projection, project_all, project_job, project_profile, project_search_job
+
+def test_profile_projection_reshapes_nested_lists():
+    raw = {
+        "name": "Jane Doe",
+        "followers": 300,
+        "education": [
+            {"title": "State University", "description": "x", "description_html": "<p>x</p>", "institute_logo_url": "u"},
+            {"title": "Second School"},
+        ],
+        "certifications": [
+            {"title": "AWS", "subtitle": "Amazon", "meta": "2023", "credential_id": "1", "issuer": "old"},
+            "not a dict",
+        ],
+        "projects": [None, {"title": "P"}],
+        "organizations": [{"title": "IEEE", "membership_number": "123"}],
+    }
+
+    result = project_profile(raw)
+
+    assert result == {
+        "name": "Jane Doe",
+        "organizations": [{"title": "IEEE"}],
+        "education": [{"title": "State University"}],
+        "certifications": [{"title": "AWS", "issuer": "Amazon", "notes": "2023"}],
+        "projects": [{"title": "P"}],
+    }
+    # The raw record is left untouched
+    assert raw["followers"] == 300
+    assert raw["certifications"][0]["credential_id"] == "1"
+
+def test_profile_projection_drops_empty_lists():
+    result = project_profile({"name": "Jane", "education": [], "certifications": ["x"], "projects": [None], "experience": None})
+    assert result == {"name": "Jane", "experience": None}
+    assert project_profile({}) == {}
+
+def test_job_and_search_projections():
+    raw = {"job_title": "Engineer", "job_url": "https://example.com/1", "apply_link": "https://apply"}
+    assert project_job(raw) == {"job_title": "Engineer"}
+    assert project_search_job(raw) == {"job_title": "Engineer", "job_url": "https://example.com/1"}
+    assert list(project_all(project_search_job, [raw, {"apply_link": "x"}], drop_empty=True)) == [
+        {"job_title": "Engineer", "job_url": "https://example.com/1"}
+    ]
+
+def test_invalid_specs():
+    with pytest.raises(ValueError):
+        compile_projection({"keep": ["a"], "fields": {"a": {"sort": True}}})
+    with pytest.raises(ValueError):
+        compile_projection({"keep": ["a"], "fields": {"b": {"drop_nulls": True}}})
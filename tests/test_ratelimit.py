@@ -0,0 +1,121 @@
+import sqlite3
+import subprocess
+import sys
+import time
+from email.utils import formatdate
+import pytest
+import requests
+import responses
+import brightdata_client
+from brightdata_client import BrightDataClient
+from fake_brightdata import FakeBrightData, FakeSettings
+from get_linkedin_profile import get_linkedin_profiles
+from polling import FixedPolling
+import ratelimit
+from ratelimit import EndpointLimit, RateLimiter, parse_retry_after
+
+@pytest.fixture(autouse=True)
+def mock_env_vars(monkeypatch):
+    monkeypatch.setenv("BRIGHTDATA_API_TOKEN", "fake_token")
+    monkeypatch.setenv("BRIGHTDATA_PROFILE_DATASET_ID", "fake_profile_id")
+    monkeypatch.delenv("BRIGHTDATA_BASE_URL", raising=False)
+    monkeypatch.delenv("BRIGHTDATA_CACHE_PATH", raising=False)
+
+def test_parse_retry_after():
+    assert parse_retry_after("3") == 3
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    assert 8 <= parse_retry_after(formatdate(time.time() + 10, usegmt=True)) <= 10
+
+def test_token_bucket_spaces_calls():
+    limiter = RateLimiter("", {"trigger": EndpointLimit(rate=20, burst=2, concurrency=0)})
+    start = time.monotonic()
+    for _ in range(4):
+        limiter.release("trigger", limiter.acquire("trigger"))
+    # Two calls ride the burst, the next two wait 1/20 s each
+    assert 0.09 <= time.monotonic() - start < 0.5
+
+def test_state_is_shared_between_processes(tmp_path):
+    path = str(tmp_path / "limits.sqlite")
+    limits = {"download": EndpointLimit(rate=0, burst=1, concurrency=1)}
+    first, second = RateLimiter(path, limits), RateLimiter(path, limits)
+
+    holder = first.acquire("download")
+    assert second._take("download", "other") > 0
+    first.release("download", holder)
+    assert second._take("download", "other") == 0
+
+    # Slots held by a process that has exited are reclaimed
+    dead = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead.wait()
+    second.release("download", "other")
+    with first._state.transaction():
+        first._state.add_holder("download", "ghost", dead.pid, time.time() + 600)
+    assert second._take("download", "other") == 0
+
+    first.backoff("status", 0.5)
+    assert 0.3 < second.delay("status") <= 0.5
+    assert second._state.bucket("status").scale == 0.5
+
+def test_waiting_callers_only_read(tmp_path):
+    path = str(tmp_path / "limits.sqlite")
+    limiter = RateLimiter(path, {"download": EndpointLimit(rate=0, burst=1, concurrency=1)})
+    holder = limiter.acquire("download")
+    limiter.backoff("status", 5)
+
+    # Another process holds the write lock; polling the limiter must not queue behind it
+    writer = sqlite3.connect(path, isolation_level=None)
+    writer.execute("BEGIN IMMEDIATE")
+    start = time.monotonic()
+    assert 4 < limiter.delay("status") <= 5
+    assert limiter._take("download", "other") == float("inf")
+    assert time.monotonic() - start < 0.5
+    writer.execute("ROLLBACK")
+    writer.close()
+    limiter.release("download", holder)
+
+def test_slot_retries_back_off(monkeypatch):
+    limiter = RateLimiter("", {"download": EndpointLimit(rate=0, burst=1, concurrency=1)})
+    holder = limiter.acquire("download")
+    sleeps = []
+    def sleep(seconds):
+        sleeps.append(seconds)
+        if len(sleeps) == 7:
+            limiter.release("download", holder)
+    monkeypatch.setattr(ratelimit.time, "sleep", sleep)
+    limiter.release("download", limiter.acquire("download"))
+
+    assert len(sleeps) == 7
+    assert all(later > earlier for earlier, later in zip(sleeps, sleeps[1:6]))
+    assert 0.05 <= sleeps[0] <= 0.06 and 1.0 <= sleeps[-1] <= 1.1
+
+@responses.activate
+def test_client_waits_out_429s():
+    client = BrightDataClient(backoff=0, limiter=RateLimiter("", {"status": EndpointLimit(rate=100, burst=1, concurrency=1)}))
+    url = "https://api.brightdata.com/datasets/v3/snapshot/snap_429"
+    responses.add(responses.GET, url, status=429, headers={"Retry-After": "0.1"})
+    responses.add(responses.GET, url, json={"status": "ready"})
+
+    start = time.monotonic()
+    assert client.status("snap_429") == {"status": "ready"}
+    assert time.monotonic() - start >= 0.1
+    assert client.limiter._state.bucket("status").scale == 0.5
+
+    client.max_throttle_retries = 2
+    responses.add(responses.GET, url, status=429, headers={"Retry-After": "0"})
+    with pytest.raises(requests.exceptions.HTTPError, match="429"):
+        client.status("snap_429")
+    assert len(responses.calls) == 5
+
+def test_throttled_batch_completes(monkeypatch):
+    settings = FakeSettings(ready_after=0.05, throttle_rate=0.3, retry_after=0.01, payload_bytes=200, seed=3)
+    with FakeBrightData(settings) as server:
+        monkeypatch.setenv("BRIGHTDATA_BASE_URL", server.base_url)
+        client = BrightDataClient(poll_strategy=FixedPolling(0.01))
+        monkeypatch.setattr(brightdata_client, "_client", client)
+        urls = [f"https://www.linkedin.com/in/throttled-{i}" for i in range(12)]
+
+        profiles = get_linkedin_profiles(urls, chunk_size=3)
+
+        assert all("error" not in profiles[url] for url in urls)
+        assert server.stats["throttled"] > 0
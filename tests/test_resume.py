@@ -0,0 +1,84 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+from resume import compile_template, load_template, render_resume_html, render_resumes
+
+PROFILE = {
+    "name": "Jane <Doe>",
+    "city": "Berlin",
+    "country_code": "DE",
+    "about": "Backend engineer & mentor",
+    "bio_links": [{"title": "GitHub", "link": "https://github.com/jane"}],
+    "education": [{"title": "State University", "degree": "BSc", "start_year": "2012", "end_year": "2016"}],
+    "certifications": [{"title": "AWS Developer", "issuer": "Amazon", "notes": "2023"}],
+    "projects": [{"title": "Scrapbook", "description": "Job search tooling"}],
+}
+
+@pytest.fixture
+def experience_file(tmp_path):
+    path = tmp_path / "experience.json"
+    path.write_text(json.dumps({"experience": [
+        {"title": "Software Engineer", "company": "Acme", "start_date": "2020", "end_date": "Present",
+         "location": "Remote", "highlights": ["Cut latency by 35%", "Built <fast> pipelines"]},
+    ]}))
+    return str(path)
+
+def test_compile_template():
+    render = compile_template("<h1>$name</h1><p>${about}</p> costs $$5")
+    assert render({"name": "A", "about": "B"}) == "<h1>A</h1><p>B</p> costs $5"
+    with pytest.raises(ValueError):
+        compile_template("broken $ placeholder")
+
+def test_template_is_compiled_once(tmp_path):
+    path = tmp_path / "template.html"
+    path.write_text("<p>$name</p>")
+    first = load_template(str(path))
+    assert load_template(str(path)) is first
+
+    # Editing the template recompiles it
+    os.utime(path, ns=(0, 0))
+    assert load_template(str(path)) is not first
+
+def test_render_resume_html(experience_file):
+    html = render_resume_html(PROFILE, experience_file)
+
+    assert "<h1>JANE &lt;DOE&gt;</h1>" in html
+    assert "<h2>Software Engineer</h2>" in html
+    assert '<a href="https://github.com/jane" target="_blank">GitHub</a>' in html
+    assert "Backend engineer &amp; mentor" in html
+    assert "<li>Built &lt;fast&gt; pipelines</li>" in html
+    assert '<span class="cert-badge">Amazon</span>' in html
+    assert "Languages" not in html
+    assert "$" not in html
+
+def test_render_resumes_in_parallel(tmp_path, experience_file):
+    profiles = [{**PROFILE, "name": f"Person {i}"} for i in range(4)]
+    paths = render_resumes(profiles, str(tmp_path / "out"), experience_file, pdf=False, workers=2)
+
+    assert [os.path.basename(path) for path in paths] == [f"000{i}-person-{i}.html" for i in range(4)]
+    with open(paths[3], encoding="utf-8") as f:
+        assert "PERSON 3" in f.read()
+
+def test_experience_override_is_opt_in(tmp_path, experience_file, monkeypatch):
+    # A stray override in the working directory is never merged into other people's resumes
+    monkeypatch.chdir(tmp_path)
+    os.replace(experience_file, "experience_override.json")
+    [path] = render_resumes([PROFILE], str(tmp_path / "out"), pdf=False)
+    with open(path, encoding="utf-8") as f:
+        assert "Software Engineer" not in f.read()
+    assert "Software Engineer" in render_resume_html(PROFILE, "experience_override.json")
+
+def test_render_workers_skip_the_fetch_stack():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    code = "import sys, resume; print(sorted(m for m in ('brightdata_client', 'get_linkedin_profile') if m in sys.modules))"
+    assert subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True).stdout.strip() == "[]"
+
+def test_render_pdf(tmp_path, experience_file, monkeypatch):
+    pytest.importorskip("weasyprint")
+    monkeypatch.setenv("PDF_CACHE_DIR", str(tmp_path / "pdf"))
+    [path] = render_resumes([PROFILE], str(tmp_path), experience_file)
+    with open(path, "rb") as f:
+        assert f.read(5) == b"%PDF-"
@@ -0,0 +1,77 @@
+import json
+import pytest
+import responses
+import brightdata_client
+import metrics
+from job_dedup import NearDuplicateIndex
+from metrics import Metrics
+from search_jobs import SearchQuery, build_search_url, search_jobs_many
+
+@pytest.fixture(autouse=True)
+def mock_env_vars(monkeypatch):
+    monkeypatch.setenv("BRIGHTDATA_API_TOKEN", "fake_token")
+    monkeypatch.setenv("BRIGHTDATA_JOB_DATASET_ID", "fake_job_id")
+    monkeypatch.delenv("BRIGHTDATA_BASE_URL", raising=False)
+    monkeypatch.delenv("BRIGHTDATA_CACHE_PATH", raising=False)
+    monkeypatch.delenv("BRIGHTDATA_JOB_INDEX_PATH", raising=False)
+
+def test_query_urls():
+    assert SearchQuery("c++ developer").url() == build_search_url("c++ developer")
+    query = SearchQuery("python", location="Berlin, Germany", posted_within="week", experience_level=["mid-senior", "entry"], remote=True)
+    assert query.url() == (
+        "https://www.linkedin.com/jobs/search/?keywords=python&location=Berlin%2C+Germany"
+        "&f_TPR=r604800&f_E=2%2C4&f_WT=2"
+    )
+    assert SearchQuery("python", posted_within=3600, remote=False).url().endswith("&f_TPR=r3600&f_WT=1%2C3")
+    assert SearchQuery("python", experience_level="director").as_dict() == {"keywords": "python", "experience_level": ["director"]}
+    with pytest.raises(ValueError, match="experience level"):
+        SearchQuery("python", experience_level="senior")
+    with pytest.raises(ValueError, match="posted_within"):
+        SearchQuery("python", posted_within="year")
+
+@responses.activate
+def test_packs_queries_and_merges_postings(monkeypatch):
+    # A fresh client on the default base URL, which responses answers
+    monkeypatch.setattr(brightdata_client, "_client", None)
+    berlin = SearchQuery("python", location="Berlin")
+    remote = SearchQuery("python", remote=True)
+    nothing = SearchQuery("cobol", posted_within="day")
+    snapshot_url = "https://api.brightdata.com/datasets/v3/snapshot/snap_many"
+    responses.add(responses.POST, "https://api.brightdata.com/datasets/v3/trigger?dataset_id=fake_job_id", json={"snapshot_id": "snap_many"})
+    responses.add(responses.GET, snapshot_url, json={"status": "ready"})
+    # Bright Data echoes the input URL, though not necessarily with the same parameter order
+    responses.add(responses.GET, f"{snapshot_url}?format=json", json=[
+        {"job_title": "Backend", "job_url": "https://www.linkedin.com/jobs/view/1?refId=a", "input": {"url": berlin.url()}},
+        {"job_title": "Backend", "job_url": "https://www.linkedin.com/jobs/view/1?refId=b", "company_name": "Acme",
+         "input": {"url": "https://www.linkedin.com/jobs/search/?f_WT=2&keywords=python"}},
+        {"job_title": "Platform", "job_url": "https://www.linkedin.com/jobs/view/2", "input": {"url": remote.url()}},
+        {"error": "No jobs found", "error_code": "dead_page", "input": {"url": nothing.url()}},
+        # Matches none of the searches, so it can't be attributed
+        {"job_title": "Stray", "job_url": "https://www.linkedin.com/jobs/view/3", "input": {"url": SearchQuery("rust").url()}},
+    ])
+    registry = Metrics()
+    monkeypatch.setattr(metrics, "_metrics", registry)
+
+    results = search_jobs_many([berlin, remote, "python", nothing])
+
+    trigger = json.loads(responses.calls[0].request.body)
+    assert [item["url"] for item in trigger] == [berlin.url(), remote.url(), SearchQuery("python").url(), nothing.url()]
+    assert len(responses.calls) == 3
+
+    [backend] = results[berlin]
+    assert results[remote][0] is backend
+    assert backend["company_name"] == "Acme"
+    assert backend["queries"] == [{"keywords": "python", "location": "Berlin"}, {"keywords": "python", "remote": True}]
+    assert [job["job_title"] for job in results[remote]] == ["Backend", "Platform"]
+    assert results[SearchQuery("python")] == []
+    assert all(job["job_title"] != "Stray" for jobs in results.values() if isinstance(jobs, list) for job in jobs)
+    [unattributed] = [s for s in registry.snapshot() if s["name"] == "brightdata_unattributed_records_total"]
+    assert unattributed["labels"] == {"dataset": "search"} and unattributed["value"] == 1
+    assert results[nothing] == {"error": "No jobs found", "error_code": "dead_page"}
+
+def test_sweep_against_fake_api(fake_brightdata):
+    queries = [SearchQuery(keywords, location=city) for keywords in ("python", "rust") for city in ("Berlin", "Paris", "Oslo")]
+    results = search_jobs_many(queries, chunk_size=4, dedup=NearDuplicateIndex())
+    assert fake_brightdata.stats["triggers"] == 2
+    assert all(len(results[query]) == 3 for query in queries)
+    assert all(job["queries"] == [query.as_dict()] for query in queries for job in results[query])
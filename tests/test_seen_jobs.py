@@ -0,0 +1,95 @@
+import pytest
+import responses
+from search_jobs import search_new_jobs
+from seen_jobs import BloomFilter, SeenJobsIndex, content_hash, job_id
+
+@pytest.fixture(autouse=True)
+def mock_env_vars(monkeypatch):
+    monkeypatch.setenv("BRIGHTDATA_API_TOKEN", "fake_token")
+    monkeypatch.setenv("BRIGHTDATA_JOB_DATASET_ID", "fake_job_id")
+    monkeypatch.delenv("BRIGHTDATA_CACHE_PATH", raising=False)
+
+def job(posting_id, title="Python Developer", tracking="abc"):
+    return {
+        "job_title": title,
+        "company_name": "Acme Corp",
+        "job_url": f"https://www.linkedin.com/jobs/view/python-developer-at-acme-{posting_id}?trackingId={tracking}",
+    }
+
+def test_job_id_parsing():
+    assert job_id("https://www.linkedin.com/jobs/view/4012345678/?refId=x") == "4012345678"
+    assert job_id("https://linkedin.com/jobs/view/python-developer-at-acme-4012345678") == "4012345678"
+    assert job_id("https://www.linkedin.com/jobs/search/?currentJobId=4012345678&keywords=python") == "4012345678"
+    assert job_id("https://example.com/careers/42/?utm=x") == "https://example.com/careers/42"
+
+def test_content_hash_ignores_url():
+    assert content_hash(job(1, tracking="a")) == content_hash(job(1, tracking="b"))
+    assert content_hash(job(1)) != content_hash(job(1, title="Senior Python Developer"))
+
+def test_returns_only_new_or_changed(tmp_path):
+    index = SeenJobsIndex(str(tmp_path / "seen.sqlite"))
+
+    assert index.update([job(1), job(2)], keyword="python") == [job(1), job(2)]
+    # Same postings with new tracking parameters are not new
+    assert index.update([job(1, tracking="x"), job(2, tracking="y"), job(3)], keyword="python") == [job(3)]
+    # Edited postings are reported again
+    edited = job(2, title="Senior Python Developer")
+    assert index.update([job(1), edited], keyword="python") == [edited]
+
+    # Other keywords only see postings new to the index, unless asked otherwise
+    assert index.update([job(1), job(4)], keyword="django") == [job(4)]
+    assert index.update([job(1), job(4)], keyword="flask", per_keyword=True) == [job(1), job(4)]
+    assert len(index) == 4
+    assert job(3)["job_url"] in index
+    assert "https://www.linkedin.com/jobs/view/999" not in index
+
+def test_bloom_filter_survives_reopen(tmp_path):
+    path = str(tmp_path / "seen.sqlite")
+    index = SeenJobsIndex(path, capacity=10)
+    # Outgrowing the capacity rebuilds a larger filter
+    index.update([job(i) for i in range(50)])
+    assert index._bloom.capacity >= 50
+    index.close()
+
+    reopened = SeenJobsIndex(path, capacity=10)
+    assert len(reopened) == 50
+    assert reopened.update([job(i) for i in range(51)]) == [job(50)]
+
+def test_bloom_filter_saved_on_close_and_rebuilt_after_crash(tmp_path):
+    path = str(tmp_path / "seen.sqlite")
+    index = SeenJobsIndex(path)
+    index.update([job(1), job(2)])
+    index.update([job(3)])
+    # Not written yet: a process dying here leaves a stale filter that reopening rebuilds
+    assert "bloom" not in dict(index._db.execute("SELECT name, value FROM meta"))
+    crashed = SeenJobsIndex(path)
+    assert job(3)["job_url"] in crashed and crashed.update([job(3), job(4)]) == [job(4)]
+    crashed.close()
+
+    reopened = SeenJobsIndex(path)
+    meta = dict(reopened._db.execute("SELECT name, value FROM meta"))
+    assert meta["bloom_count"] == len(reopened) == 4
+    assert all(job(i)["job_url"] in reopened for i in range(1, 5))
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(1000)
+    keys = [str(i) for i in range(1000)]
+    for key in keys:
+        bloom.add(key)
+    assert all(key in bloom for key in keys)
+    false_positives = sum(str(i) in bloom for i in range(1000, 11000))
+    assert false_positives < 300
+
+@responses.activate
+def test_search_new_jobs(tmp_path):
+    trigger_url = "https://api.brightdata.com/datasets/v3/trigger?dataset_id=fake_job_id"
+    responses.add(responses.POST, trigger_url, json={"snapshot_id": "snap_new_1"}, status=200)
+    responses.add(responses.POST, trigger_url, json={"snapshot_id": "snap_new_2"}, status=200)
+    for snapshot_id, records in [("snap_new_1", [job(1), job(2)]), ("snap_new_2", [job(2), job(3)])]:
+        status_url = f"https://api.brightdata.com/datasets/v3/snapshot/{snapshot_id}"
+        responses.add(responses.GET, status_url, json={"status": "ready"}, status=200)
+        responses.add(responses.GET, f"{status_url}?format=json", json=records, status=200)
+
+    index = SeenJobsIndex(str(tmp_path / "seen.sqlite"))
+    assert search_new_jobs("python developer", index=index) == [job(1), job(2)]
+    assert search_new_jobs("python developer", index=index) == [job(3)]
@@ -0,0 +1,91 @@
+import pytest
+import responses
+from snapshot_queue import SnapshotQueue, run_worker
+
+@pytest.fixture(autouse=True)
+def mock_env_vars(monkeypatch):
+    monkeypatch.setenv("BRIGHTDATA_API_TOKEN", "fake_token")
+    monkeypatch.setenv("BRIGHTDATA_JOB_DATASET_ID", "fake_job_id")
+    monkeypatch.setenv("BRIGHTDATA_PROFILE_DATASET_ID", "fake_profile_id")
+
+@pytest.fixture
+def queue_path(tmp_path):
+    return str(tmp_path / "queue.sqlite")
+
+def add_snapshot(snapshot_id, records):
+    status_url = f"https://api.brightdata.com/datasets/v3/snapshot/{snapshot_id}"
+    responses.add(responses.GET, status_url, json={"status": "ready"}, status=200)
+    responses.add(responses.GET, f"{status_url}?format=json", json=records, status=200)
+
+@responses.activate
+def test_worker_drains_queue(queue_path):
+    queue = SnapshotQueue(queue_path)
+    assert queue.enqueue("profile", ["https://www.linkedin.com/in/a", "https://www.linkedin.com/in/b", "https://linkedin.com/in/a/"]) == 2
+
+    responses.add(
+        responses.POST,
+        "https://api.brightdata.com/datasets/v3/trigger?dataset_id=fake_profile_id",
+        json={"snapshot_id": "snap_q"},
+        status=200,
+    )
+    add_snapshot("snap_q", [
+        {"url": "https://www.linkedin.com/in/a", "name": "A", "followers": 1},
+        {"input": {"url": "https://www.linkedin.com/in/b"}, "error": "Page not found"},
+    ])
+
+    run_worker(queue_path)
+
+    assert queue.counts() == {"done": 1, "failed": 1}
+    assert list(queue.results("profile")) == [
+        {"kind": "profile", "url": "https://www.linkedin.com/in/a", "result": {"name": "A"}},
+        {"kind": "profile", "url": "https://www.linkedin.com/in/b", "error": "Page not found"},
+    ]
+
+@responses.activate
+def test_resumes_triggered_snapshot_without_retriggering(queue_path):
+    queue = SnapshotQueue(queue_path)
+    queue.enqueue("job", ["https://www.linkedin.com/jobs/view/1"])
+
+    # A worker claims and triggers, then dies before the snapshot is ready
+    jobs = queue.claim("otherhost:1", chunk_size=10)
+    queue.mark_triggered(jobs, "snap_left_behind")
+    queue._db.execute("UPDATE jobs SET lease_until = 0")
+
+    add_snapshot("snap_left_behind", [{"url": "https://www.linkedin.com/jobs/view/1", "job_title": "Engineer"}])
+    run_worker(queue_path)
+
+    assert not [c for c in responses.calls if c.request.method == "POST"]
+    assert list(queue.results()) == [
+        {"kind": "job", "url": "https://www.linkedin.com/jobs/view/1", "result": {"job_title": "Engineer"}},
+    ]
+
+@responses.activate
+def test_failed_snapshot_is_retriggered_then_given_up(queue_path, monkeypatch):
+    monkeypatch.setenv("BRIGHTDATA_QUEUE_MAX_ATTEMPTS", "2")
+    queue = SnapshotQueue(queue_path)
+    queue.enqueue("search", ["python developer"])
+
+    trigger_url = "https://api.brightdata.com/datasets/v3/trigger?dataset_id=fake_job_id"
+    responses.add(responses.POST, trigger_url, json={"snapshot_id": "snap_bad"}, status=200)
+    responses.add(responses.GET, "https://api.brightdata.com/datasets/v3/snapshot/snap_bad", json={"status": "failed"}, status=200)
+
+    run_worker(queue_path)
+
+    assert len([c for c in responses.calls if c.request.method == "POST"]) == 2
+    assert queue.counts() == {"failed": 1}
+
+@responses.activate
+def test_unexpected_error_is_retried_then_given_up(queue_path, monkeypatch):
+    monkeypatch.setenv("BRIGHTDATA_QUEUE_MAX_ATTEMPTS", "2")
+    queue = SnapshotQueue(queue_path)
+    queue.enqueue("job", ["https://www.linkedin.com/jobs/view/1", "https://www.linkedin.com/jobs/view/2"])
+
+    # No snapshot id comes back: the worker gives up on the unit instead of crashing with it leased
+    trigger_url = "https://api.brightdata.com/datasets/v3/trigger?dataset_id=fake_job_id"
+    responses.add(responses.POST, trigger_url, json={"message": "no"}, status=200)
+
+    run_worker(queue_path)
+
+    assert len([c for c in responses.calls if c.request.method == "POST"]) == 2
+    assert queue.counts() == {"failed": 2}
+    assert all("Failed to get snapshot_id" in row["error"] for row in queue.results())
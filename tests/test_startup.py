@@ -0,0 +1,60 @@
+import json
+import os
+import subprocess
+import sys
+import pytest
+import config
+import scrapbook
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ["requests", "urllib3", "numpy", "composio", "asyncio", "dotenv"]
+
+def loaded_after(code):
+    # A fresh interpreter, so modules imported by other tests don't count
+    out = subprocess.run(
+        [sys.executable, "-c", f"import sys; {code}; print(__import__('json').dumps(sorted(sys.modules)))"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    ).stdout
+    return set(json.loads(out))
+
+@pytest.mark.parametrize("code, allowed", [
+    ("import scrapbook", set()),
+    ("import urls", set()),
+    ("import config", set()),
+    ("import scrapbook; scrapbook.ArchiveReader", {"asyncio", "dotenv"}),
+    ("import job_dedup", {"dotenv"}),
+    ("import search_jobs", {"asyncio", "dotenv"}),
+    ("import snapshot_queue", {"asyncio", "dotenv"}),
+    ("import main", {"asyncio", "dotenv"}),
+])
+def test_heavy_modules_load_on_first_use(code, allowed):
+    assert loaded_after(code) & set(HEAVY) <= allowed
+
+def test_storage_modules_skip_the_client():
+    loaded = loaded_after("import archive, cache, job_index, profile_changes, seen_jobs, urls")
+    assert not loaded & {"brightdata_client", "brightdata_batch", "requests"}
+
+def test_lazy_attributes():
+    from search_jobs import SearchQuery
+    assert scrapbook.SearchQuery is SearchQuery
+    assert "get_linkedin_profile" in dir(scrapbook) and "get_linkedin_profile" in scrapbook.__all__
+    with pytest.raises(AttributeError):
+        scrapbook.no_such_name
+
+def test_config_resolved_once(monkeypatch):
+    monkeypatch.setenv("BRIGHTDATA_API_TOKEN", "token_a")
+    monkeypatch.setenv("BRIGHTDATA_BASE_URL", "http://localhost:1234/")
+    first = config.get_config()
+    assert first is config.get_config()
+    assert first.api_token == "token_a" and first.base_url == "http://localhost:1234"
+
+    monkeypatch.setenv("BRIGHTDATA_API_TOKEN", "token_b")
+    assert config.get_config().api_token == "token_b"
+
+def test_missing_credentials(monkeypatch):
+    monkeypatch.setenv("BRIGHTDATA_API_TOKEN", "token")
+    monkeypatch.delenv("BRIGHTDATA_JOB_DATASET_ID", raising=False)
+    with pytest.raises(ValueError, match="Missing Bright Data API credentials"):
+        config.get_config().require_dataset_id("BRIGHTDATA_JOB_DATASET_ID")
+    monkeypatch.setenv("BRIGHTDATA_JOB_DATASET_ID", "jobs")
+    assert config.get_config().require_dataset_id("BRIGHTDATA_JOB_DATASET_ID") == "jobs"
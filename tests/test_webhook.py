@@ -0,0 +1,95 @@
+import asyncio
+import json
+import re
+import threading
+import urllib.parse
+import urllib.request
+import pytest
+import responses
+from brightdata_async import SnapshotScheduler
+from brightdata_client import BrightDataClient
+from polling import FixedPolling
+from webhook import WebhookReceiver
+
+@pytest.fixture(autouse=True)
+def mock_env_vars(monkeypatch):
+    monkeypatch.setenv("BRIGHTDATA_API_TOKEN", "fake_token")
+
+@pytest.fixture
+def receiver():
+    receiver = WebhookReceiver(host="127.0.0.1", port=0).start()
+    yield receiver
+    receiver.stop()
+
+def fake_brightdata_post(url, body, delay=0.1):
+    """Posts to the receiver from a background thread, the way Bright Data would."""
+    def send():
+        request = urllib.request.Request(
+            url, data=json.dumps(body).encode(), headers={"Content-Type": "application/json"}, method="POST"
+        )
+        urllib.request.urlopen(request).close()
+
+    timer = threading.Timer(delay, send)
+    timer.start()
+    return timer
+
+def mock_snapshot(snapshot_id, status="running"):
+    responses.add(
+        responses.POST,
+        re.compile(r"https://api\.brightdata\.com/datasets/v3/trigger\?.*"),
+        json={"snapshot_id": snapshot_id},
+        status=200,
+    )
+    responses.add(
+        responses.GET,
+        f"https://api.brightdata.com/datasets/v3/snapshot/{snapshot_id}",
+        json={"status": status},
+        status=200,
+    )
+    # Passed through so the fake can reach the local receiver
+    responses.add_passthru(re.compile(r"http://127\.0\.0\.1:\d+/.*"))
+
+@responses.activate
+def test_deliver_mode_uses_pushed_records(receiver):
+    mock_snapshot("snap_push")
+    client = BrightDataClient(completion="deliver", receiver=receiver, poll_strategy=FixedPolling(30, deadline=5))
+
+    fake_brightdata_post(f"{receiver.deliver_url}?snapshot_id=snap_push", [{"job_title": "Engineer"}])
+    assert client.collect("fake_job_id", [{"url": "https://www.linkedin.com/jobs/view/1"}]) == [{"job_title": "Engineer"}]
+
+    trigger_call = responses.calls[0].request
+    assert f"endpoint={urllib.parse.quote(receiver.deliver_url, safe='')}" in trigger_call.url
+    # One status poll before the webhook arrived, no download
+    assert [c.request.method for c in responses.calls] == ["POST", "GET"]
+
+@responses.activate
+def test_notify_mode_wakes_waiter(receiver):
+    mock_snapshot("snap_note")
+    client = BrightDataClient(completion="notify", receiver=receiver, poll_strategy=FixedPolling(30, deadline=5))
+
+    fake_brightdata_post(receiver.notify_url, {"snapshot_id": "snap_note", "status": "ready"})
+    snapshot_id = client.trigger("fake_job_id", [{"url": "https://www.linkedin.com/jobs/view/1"}])
+    assert client.wait(snapshot_id)["status"] == "ready"
+    assert "notify=" in responses.calls[0].request.url
+
+@responses.activate
+def test_falls_back_to_polling_without_notification(receiver):
+    mock_snapshot("snap_quiet", status="ready")
+    client = BrightDataClient(completion="notify", receiver=receiver, poll_strategy=FixedPolling(0.01, deadline=5))
+
+    assert client.wait("snap_quiet") == {"status": "ready"}
+
+@responses.activate
+def test_scheduler_wakes_on_webhook(receiver):
+    mock_snapshot("snap_async")
+    client = BrightDataClient(completion="deliver", receiver=receiver)
+    scheduler = SnapshotScheduler(client=client, poll_strategy=FixedPolling(30, deadline=5))
+
+    fake_brightdata_post(f"{receiver.deliver_url}?snapshot_id=snap_async", [{"name": "Jane"}], delay=0.2)
+    records = asyncio.run(scheduler.collect("fake_profile_id", [{"url": "https://www.linkedin.com/in/jane"}]))
+    assert records == [{"name": "Jane"}]
+
+    # Closing the scheduler stops the receiver from calling into it
+    assert len(receiver._listeners) == 1
+    scheduler.close()
+    assert receiver._listeners == []
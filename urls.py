@@ -0,0 +1,21 @@
+from urllib.parse import urlsplit, urlunsplit
+
+
+def normalize_url(url: str) -> str:
+    """Normalizes a LinkedIn URL so inputs and returned records can be matched."""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    path = parts.path.rstrip("/")
+    return urlunsplit((parts.scheme.lower() or "https", host, path, "", ""))
+
+
+def record_input_url(record: dict) -> str | None:
+    """Returns the input URL a downloaded Bright Data record belongs to."""
+    if not isinstance(record, dict):
+        return None
+    source = record.get("input")
+    if isinstance(source, dict) and source.get("url"):
+        return source["url"]
+    return record.get("input_url") or record.get("url")
@@ -0,0 +1,187 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable
+from urllib.parse import parse_qs, urlsplit
+
+from config import load_env
+
+load_env()
+
+# Completion modes: poll only, or have Bright Data notify us / deliver the data
+COMPLETION_MODES = ("poll", "notify", "deliver")
+
+# Notifications are kept for a while since they can arrive before trigger() returns
+MAX_NOTIFICATIONS = 10000
+NOTIFICATION_TTL = 3600
+
+
+class WebhookReceiver:
+    """
+    Small local HTTP server receiving Bright Data snapshot webhooks.
+
+    `POST /notify` takes the completion notice (`{"snapshot_id": ..., "status": ...}`);
+    `POST /deliver` takes the delivered records themselves, with the snapshot id
+    in the `snapshot_id` query parameter or a `snapshot-id` header. Waiting
+    callers are woken as soon as a notice for their snapshot arrives.
+    """
+
+    def __init__(
+        self,
+        host: str | None = None,
+        port: int | None = None,
+        public_url: str | None = None,
+        secret: str | None = None,
+    ):
+        self.host = host or os.environ.get("BRIGHTDATA_WEBHOOK_HOST", "127.0.0.1")
+        self.port = port if port is not None else int(os.environ.get("BRIGHTDATA_WEBHOOK_PORT", 0))
+        self.public_url = public_url or os.environ.get("BRIGHTDATA_WEBHOOK_PUBLIC_URL")
+        self.secret = secret if secret is not None else os.environ.get("BRIGHTDATA_WEBHOOK_SECRET")
+
+        self._notifications: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._records: dict[str, list] = {}
+        self._listeners: list[Callable[[str], None]] = []
+        self._changed = threading.Condition()
+        self._server: ThreadingHTTPServer | None = None
+
+    def start(self) -> "WebhookReceiver":
+        """Starts serving on a daemon thread; port 0 picks a free port."""
+        if self._server is not None:
+            return self
+        self._server = ThreadingHTTPServer((self.host, self.port), _handler_for(self))
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, name="brightdata-webhook", daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    @property
+    def base_url(self) -> str:
+        return (self.public_url or f"http://{self.host}:{self.port}").rstrip("/")
+
+    @property
+    def notify_url(self) -> str:
+        return f"{self.base_url}/notify"
+
+    @property
+    def deliver_url(self) -> str:
+        return f"{self.base_url}/deliver"
+
+    def add_listener(self, callback: Callable[[str], None]) -> None:
+        """Calls `callback(snapshot_id)` from the server thread on every notification."""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[str], None]) -> None:
+        """Stops calling a callback added with `add_listener`."""
+        try:
+            self._listeners.remove(callback)
+        except ValueError:
+            pass
+
+    def notification(self, snapshot_id: str) -> dict | None:
+        """Returns the status notice received for a snapshot, if any."""
+        with self._changed:
+            entry = self._notifications.get(snapshot_id)
+            return entry[1] if entry else None
+
+    def take_records(self, snapshot_id: str) -> list | None:
+        """Removes and returns records delivered for a snapshot, if any."""
+        with self._changed:
+            return self._records.pop(snapshot_id, None)
+
+    def wait(self, snapshot_ids: list[str], timeout: float) -> str | None:
+        """
+        Blocks until one of `snapshot_ids` has a notification or `timeout` passes.
+
+        Returns:
+            str | None: The notified snapshot id, or None on timeout.
+        """
+        deadline = time.monotonic() + timeout
+        with self._changed:
+            while True:
+                for snapshot_id in snapshot_ids:
+                    if snapshot_id in self._notifications:
+                        return snapshot_id
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._changed.wait(remaining)
+
+    def _receive(self, snapshot_id: str, info: dict, records: list | None = None) -> None:
+        now = time.monotonic()
+        with self._changed:
+            self._notifications[snapshot_id] = (now, info)
+            self._notifications.move_to_end(snapshot_id)
+            if records is not None:
+                self._records[snapshot_id] = records
+            while self._notifications:
+                oldest_id, (received, _) = next(iter(self._notifications.items()))
+                if len(self._notifications) <= MAX_NOTIFICATIONS and now - received < NOTIFICATION_TTL:
+                    break
+                self._notifications.popitem(last=False)
+                self._records.pop(oldest_id, None)
+            self._changed.notify_all()
+
+        for callback in list(self._listeners):
+            callback(snapshot_id)
+
+
+def _handler_for(receiver: WebhookReceiver):
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if receiver.secret and self.headers.get("Authorization") != receiver.secret:
+                self._reply(401)
+                return
+
+            parts = urlsplit(self.path)
+            length = int(self.headers.get("Content-Length") or 0)
+            try:
+                body = json.loads(self.rfile.read(length) or b"null")
+            except ValueError:
+                self._reply(400)
+                return
+
+            if parts.path == "/notify" and isinstance(body, dict) and body.get("snapshot_id"):
+                receiver._receive(body["snapshot_id"], body)
+            elif parts.path == "/deliver":
+                snapshot_id = parse_qs(parts.query).get("snapshot_id", [None])[0] or self.headers.get("snapshot-id")
+                if not snapshot_id:
+                    self._reply(400)
+                    return
+                records = body if isinstance(body, list) else [body] if body else []
+                receiver._receive(snapshot_id, {"snapshot_id": snapshot_id, "status": "ready"}, records)
+            else:
+                self._reply(404)
+                return
+            self._reply(200)
+
+        def _reply(self, code: int) -> None:
+            self.send_response(code)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+_receiver: WebhookReceiver | None = None
+_receiver_lock = threading.Lock()
+
+
+def get_receiver() -> WebhookReceiver:
+    """Returns the process-wide receiver, starting it on first use."""
+    global _receiver
+    with _receiver_lock:
+        if _receiver is None:
+            _receiver = WebhookReceiver().start()
+        return _receiver